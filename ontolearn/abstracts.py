@@ -51,11 +51,9 @@ class AbstractScorer(Generic[_N], metaclass=ABCMeta):
 
         from ontolearn.learning_problem import EncodedPosNegLPStandard
         if isinstance(learning_problem, EncodedPosNegLPStandard):
-            tp = len(learning_problem.kb_pos.intersection(instances))
-            tn = len(learning_problem.kb_neg.difference(instances))
-
-            fp = len(learning_problem.kb_neg.intersection(instances))
-            fn = len(learning_problem.kb_pos.difference(instances))
+            tp, fp = learning_problem.coverage(instances)
+            fn = len(learning_problem.kb_pos) - tp
+            tn = len(learning_problem.kb_neg) - fp
 
             return self.score2(tp=tp, tn=tn, fp=fp, fn=fn)
         else:
@@ -1,7 +1,11 @@
 import logging
+import multiprocessing
+import os
 import time
 from abc import ABCMeta, abstractmethod
-from typing import List, Tuple, Dict, Optional, Iterable, Generic, TypeVar, ClassVar, Final, cast, Callable, Type
+from itertools import islice, tee
+from typing import List, Tuple, Dict, Optional, Iterable, Iterator, Generic, TypeVar, ClassVar, Final, cast, \
+    Callable, Type
 
 import numpy as np
 import pandas as pd
@@ -20,6 +24,19 @@ Factory = Callable
 
 logger = logging.getLogger(__name__)
 
+# the learner and number of hypotheses of a worker process of fit_many, inherited by forking
+_fit_worker_state: Optional[Tuple['BaseConceptLearner', int]] = None
+
+
+def _init_fit_worker(learner: 'BaseConceptLearner', n: int):
+    global _fit_worker_state
+    _fit_worker_state = learner, n
+
+
+def _fit_in_worker(problem: AbstractLearningProblem) -> List[Tuple[OWLClassExpression, float]]:
+    learner, n = _fit_worker_state
+    return learner._fit_problem(problem, n)
+
 
 class BaseConceptLearner(Generic[_N], metaclass=ABCMeta):
     """
@@ -237,6 +254,53 @@ class BaseConceptLearner(Generic[_N], metaclass=ABCMeta):
     def number_of_tested_concepts(self):
         return self._number_of_tested_concepts
 
+    def fit_many(self, problems: Iterable[AbstractLearningProblem], n_jobs: int = 1, n: int = 1) \
+            -> Iterator[Tuple[AbstractLearningProblem, List[Tuple[OWLClassExpression, float]]]]:
+        """Fit a sequence of learning problems on the same knowledge base and stream the results
+
+        Only the search state is reset between the problems, the caches of the knowledge base and its reasoner and the
+        memo of the refinement operator stay warm.
+
+        Args:
+            problems: the learning problems
+            n_jobs: number of worker processes to fit the problems in. the workers are forked from the learner and
+                keep their own caches warm. -1 to use all cores
+            n: number of hypotheses per problem
+
+        Returns:
+            every problem with the concepts and qualities of its n best hypotheses, in the order of the problems
+        """
+        if n_jobs < 0:
+            n_jobs = os.cpu_count()
+        if n_jobs > 1 and 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Cannot fork worker processes on this platform, fitting the problems serially")
+            n_jobs = 1
+        if n_jobs <= 1:
+            for problem in problems:
+                yield problem, self._fit_problem(problem, n)
+            return
+
+        problems, sent = tee(problems)
+        pool = multiprocessing.get_context('fork').Pool(n_jobs, initializer=_init_fit_worker, initargs=(self, n))
+        try:
+            yield from zip(problems, pool.imap(_fit_in_worker, sent))
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _fit_problem(self, problem: AbstractLearningProblem, n: int) -> List[Tuple[OWLClassExpression, float]]:
+        """Fit one learning problem of `fit_many`
+
+        Args:
+            problem: the learning problem
+            n: number of hypotheses
+
+        Returns:
+            the concepts and qualities of the n best hypotheses
+        """
+        self.fit(learning_problem=problem)
+        return [(h.concept, h.quality) for h in islice(self.best_hypotheses(n), n)]
+
     def save_best_hypothesis(self, n: int = 10, path='Predictions', rdf_format='rdfxml') -> None:
         """Serialise the best hypotheses to a file
 
@@ -1,4 +1,4 @@
-from typing import FrozenSet, Iterable, List, Optional, Dict, Generator, Set
+from typing import FrozenSet, Iterable, List, Optional, Dict, Generator, Set, TypeVar
 
 from ontolearn.core.owl.hierarchy import ClassHierarchy, ObjectPropertyHierarchy, DatatypePropertyHierarchy
 from ontolearn.utils import parametrized_performance_debugger
@@ -8,12 +8,15 @@ from owlapy.model import OWLObjectMaxCardinality, OWLObjectMinCardinality, OWLOb
     OWLObjectExactCardinality, OWLDataAllValuesFrom, OWLDataPropertyExpression, OWLDataRange, OWLDataSomeValuesFrom, \
     OWLDataHasValue, OWLIndividual, OWLLiteral, OWLDataProperty, OWLObjectHasValue, NUMERIC_DATATYPES, TIME_DATATYPES, \
     BooleanOWLDatatype, OWLDatatype, OWLNamedIndividual
+from owlapy.util import hash_cons
+
+_CE = TypeVar('_CE', bound=OWLClassExpression)  #:
 
 
 class ConceptGenerator:
     """A class that can generate some sorts of OWL Class Expressions"""
     __slots__ = '_class_hierarchy', '_object_property_hierarchy', '_data_property_hierarchy', '_reasoner', \
-                '_op_domains', '_op_ranges', '_dp_domains', '_dp_ranges'
+                '_op_domains', '_op_ranges', '_dp_domains', '_dp_ranges', '_hash_consing'
 
     _class_hierarchy: ClassHierarchy
     _object_property_hierarchy: ObjectPropertyHierarchy
@@ -23,11 +26,13 @@ class ConceptGenerator:
     _op_ranges: Dict[OWLObjectProperty, OWLClassExpression]
     _dp_domains: Dict[OWLDataProperty, OWLClassExpression]
     _dp_ranges: Dict[OWLDataProperty, FrozenSet[OWLDataRange]]
+    _hash_consing: bool
 
     def __init__(self, reasoner: OWLReasoner,
                  class_hierarchy: Optional[ClassHierarchy] = None,
                  object_property_hierarchy: Optional[ObjectPropertyHierarchy] = None,
-                 data_property_hierarchy: Optional[DatatypePropertyHierarchy] = None):
+                 data_property_hierarchy: Optional[DatatypePropertyHierarchy] = None,
+                 hash_consing: bool = False):
         """Create a new Concept Generator
 
         Args:
@@ -38,8 +43,11 @@ class ConceptGenerator:
                 if not given
             data_property_hierarchy: Data property hierarchy. Created from the root ontology loaded in the reasoner
                 if not given
+            hash_consing: whether the generated class expressions are interned (see `owlapy.util.hash_cons`), so that
+                they are hashed and compared in constant time
         """
         self._reasoner = reasoner
+        self._hash_consing = hash_consing
 
         if class_hierarchy is None:
             class_hierarchy = ClassHierarchy(self._reasoner)
@@ -59,6 +67,14 @@ class ConceptGenerator:
         self._dp_domains = dict()
         self._dp_ranges = dict()
 
+    @property
+    def hash_consing(self) -> bool:
+        """Whether the generated class expressions are interned"""
+        return self._hash_consing
+
+    def _cons(self, ce: _CE) -> _CE:
+        return hash_cons(ce) if self._hash_consing else ce
+
     def get_leaf_concepts(self, concept: OWLClass):
         """Get leaf classes
 
@@ -87,9 +103,8 @@ class ConceptGenerator:
             assert isinstance(item, OWLClassExpression)
             yield self.negation(item)
 
-    @staticmethod
-    def intersect_from_iterables(a_operands: Iterable[OWLClassExpression], b_operands: Iterable[OWLClassExpression]) \
-            -> Iterable[OWLObjectIntersectionOf]:
+    def intersect_from_iterables(self, a_operands: Iterable[OWLClassExpression],
+                                 b_operands: Iterable[OWLClassExpression]) -> Iterable[OWLObjectIntersectionOf]:
         """ Create an intersection of each class expression in a_operands with each class expression in b_operands"""
         assert isinstance(a_operands, Generator) is False and isinstance(b_operands, Generator) is False
         seen = set()
@@ -98,13 +113,12 @@ class ConceptGenerator:
             for j in b_operands:
                 if (i, j) in seen:
                     continue
-                i_and_j = OWLObjectIntersectionOf((i, j))
+                i_and_j = self._cons(OWLObjectIntersectionOf((i, j)))
                 seen.add((i, j))
                 seen.add((j, i))
                 yield i_and_j
 
-    @staticmethod
-    def union_from_iterables(a_operands: Iterable[OWLClassExpression],
+    def union_from_iterables(self, a_operands: Iterable[OWLClassExpression],
                              b_operands: Iterable[OWLClassExpression]) -> Iterable[OWLObjectUnionOf]:
         """ Create an union of each class expression in a_operands with each class expression in b_operands"""
         assert (isinstance(a_operands, Generator) is False) and (isinstance(b_operands, Generator) is False)
@@ -114,7 +128,7 @@ class ConceptGenerator:
             for j in b_operands:
                 if (i, j) in seen:
                     continue
-                i_and_j = OWLObjectUnionOf((i, j))
+                i_and_j = self._cons(OWLObjectUnionOf((i, j)))
                 seen.add((i, j))
                 seen.add((j, i))
                 yield i_and_j
@@ -287,7 +301,7 @@ class ConceptGenerator:
         assert isinstance(filler, OWLClassExpression)
 
         for prop in self.most_general_object_properties(domain=domain):
-            yield OWLObjectSomeValuesFrom(property=prop, filler=filler)
+            yield self._cons(OWLObjectSomeValuesFrom(property=prop, filler=filler))
 
     def most_general_universal_restrictions(self, *,
                                             domain: OWLClassExpression, filler: Optional[OWLClassExpression] = None) \
@@ -306,7 +320,7 @@ class ConceptGenerator:
         assert isinstance(filler, OWLClassExpression)
 
         for prop in self.most_general_object_properties(domain=domain):
-            yield OWLObjectAllValuesFrom(property=prop, filler=filler)
+            yield self._cons(OWLObjectAllValuesFrom(property=prop, filler=filler))
 
     def most_general_existential_restrictions_inverse(self, *,
                                                       domain: OWLClassExpression,
@@ -326,7 +340,7 @@ class ConceptGenerator:
         assert isinstance(filler, OWLClassExpression)
 
         for prop in self.most_general_object_properties(domain=domain, inverse=True):
-            yield OWLObjectSomeValuesFrom(property=prop.get_inverse_property(), filler=filler)
+            yield self._cons(OWLObjectSomeValuesFrom(property=prop.get_inverse_property(), filler=filler))
 
     def most_general_universal_restrictions_inverse(self, *,
                                                     domain: OWLClassExpression,
@@ -346,9 +360,8 @@ class ConceptGenerator:
         assert isinstance(filler, OWLClassExpression)
 
         for prop in self.most_general_object_properties(domain=domain, inverse=True):
-            yield OWLObjectAllValuesFrom(property=prop.get_inverse_property(), filler=filler)
+            yield self._cons(OWLObjectAllValuesFrom(property=prop.get_inverse_property(), filler=filler))
 
-    # noinspection PyMethodMayBeStatic
     def intersection(self, ops: Iterable[OWLClassExpression]) -> OWLObjectIntersectionOf:
         """Create intersection of class expression
 
@@ -368,9 +381,8 @@ class ConceptGenerator:
                 assert isinstance(c, OWLClassExpression)
                 operands.append(c)
         # operands = _avoid_overly_redundand_operands(operands)
-        return OWLObjectIntersectionOf(operands)
+        return self._cons(OWLObjectIntersectionOf(operands))
 
-    # noinspection PyMethodMayBeStatic
     def union(self, ops: Iterable[OWLClassExpression]) -> OWLObjectUnionOf:
         """Create union of class expressions
 
@@ -388,7 +400,7 @@ class ConceptGenerator:
                 assert isinstance(c, OWLClassExpression)
                 operands.append(c)
         # operands = _avoid_overly_redundand_operands(operands)
-        return OWLObjectUnionOf(operands)
+        return self._cons(OWLObjectUnionOf(operands))
 
     def get_direct_parents(self, concept: OWLClassExpression) -> Iterable[OWLClass]:
         """Direct parent concepts
@@ -547,7 +559,6 @@ class ConceptGenerator:
         """
         yield from self._reasoner.data_property_values(ind, property_)
 
-    # noinspection PyMethodMayBeStatic
     def existential_restriction(self, filler: OWLClassExpression, property: OWLObjectPropertyExpression) \
             -> OWLObjectSomeValuesFrom:
         """Create existential restriction
@@ -560,9 +571,8 @@ class ConceptGenerator:
             existential restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectSomeValuesFrom(property=property, filler=filler)
+        return self._cons(OWLObjectSomeValuesFrom(property=property, filler=filler))
 
-    # noinspection PyMethodMayBeStatic
     def universal_restriction(self, filler: OWLClassExpression, property: OWLObjectPropertyExpression) \
             -> OWLObjectAllValuesFrom:
         """Create universal restriction
@@ -575,7 +585,7 @@ class ConceptGenerator:
             universal restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectAllValuesFrom(property=property, filler=filler)
+        return self._cons(OWLObjectAllValuesFrom(property=property, filler=filler))
 
     def has_value_restriction(self, individual: OWLIndividual, property: OWLObjectPropertyExpression) \
             -> OWLObjectHasValue:
@@ -589,7 +599,7 @@ class ConceptGenerator:
             object has value restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectHasValue(property=property, individual=individual)
+        return self._cons(OWLObjectHasValue(property=property, individual=individual))
 
     def min_cardinality_restriction(self, filler: OWLClassExpression,
                                     property: OWLObjectPropertyExpression, card: int) \
@@ -605,7 +615,7 @@ class ConceptGenerator:
             min cardinality restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectMinCardinality(cardinality=card, property=property, filler=filler)
+        return self._cons(OWLObjectMinCardinality(cardinality=card, property=property, filler=filler))
 
     def max_cardinality_restriction(self, filler: OWLClassExpression,
                                     property: OWLObjectPropertyExpression, card: int) \
@@ -621,7 +631,7 @@ class ConceptGenerator:
             max cardinality restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectMaxCardinality(cardinality=card, property=property, filler=filler)
+        return self._cons(OWLObjectMaxCardinality(cardinality=card, property=property, filler=filler))
 
     def exact_cardinality_restriction(self, filler: OWLClassExpression,
                                       property: OWLObjectPropertyExpression, card: int) \
@@ -637,7 +647,7 @@ class ConceptGenerator:
             exact cardinality restriction
         """
         assert isinstance(property, OWLObjectPropertyExpression)
-        return OWLObjectExactCardinality(cardinality=card, property=property, filler=filler)
+        return self._cons(OWLObjectExactCardinality(cardinality=card, property=property, filler=filler))
 
     def data_existential_restriction(self, filler: OWLDataRange, property: OWLDataPropertyExpression) \
             -> OWLDataSomeValuesFrom:
@@ -695,7 +705,7 @@ class ConceptGenerator:
         elif isinstance(concept, OWLObjectComplementOf):
             return concept.get_operand()
         else:
-            return concept.get_object_complement_of()
+            return self._cons(concept.get_object_complement_of())
 
     def contains_class(self, concept: OWLClassExpression) -> bool:
         """Check if an atomic class is contained within this concept generator
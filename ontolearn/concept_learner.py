@@ -1,11 +1,16 @@
+import gzip
 import logging
+import multiprocessing
 import operator
+import os
+import pickle
 import random
 import time
 from collections import deque
 from contextlib import contextmanager
 from itertools import islice, chain
-from typing import Any, Callable, Dict, FrozenSet, Set, List, Tuple, Iterable, Optional, Generator, SupportsFloat
+from typing import Any, Callable, Dict, FrozenSet, Set, List, Tuple, Iterable, Optional, Generator, SupportsFloat, \
+    Final
 
 import numpy as np
 import torch
@@ -22,33 +27,64 @@ from ontolearn.core.owl.utils import EvaluatedDescriptionSet, ConceptOperandSort
 from ontolearn.data_struct import PrepareBatchOfTraining, PrepareBatchOfPrediction
 from ontolearn.ea_algorithms import AbstractEvolutionaryAlgorithm, EASimple
 from ontolearn.ea_initialization import AbstractEAInitialization, EARandomInitialization, EARandomWalkInitialization
-from ontolearn.ea_utils import PrimitiveFactory, OperatorVocabulary, ToolboxVocabulary, Tree, escape, ind_to_string, \
+from ontolearn.ea_utils import PrimitiveFactory, OperatorVocabulary, ToolboxVocabulary, Tree, escape, compile_tree, \
     owlliteral_to_primitive_string
 from ontolearn.fitness_functions import LinearPressureFitness
 from ontolearn.heuristics import OCELHeuristic
 from ontolearn.knowledge_base import EvaluatedConcept
 from ontolearn.learning_problem import PosNegLPStandard, EncodedPosNegLPStandard
 from ontolearn.metrics import Accuracy, F1
-from ontolearn.refinement_operators import LengthBasedRefinement
-from ontolearn.search import EvoLearnerNode, HeuristicOrderedNode, OENode, TreeNode, LengthOrderedNode, \
-    QualityOrderedNode, RL_State, DRILLSearchTreePriorityQueue
+from ontolearn.refinement_operators import LengthBasedRefinement, ModifiedCELOERefinement
+from ontolearn.search import EvoLearnerNode, OENode, TreeNode, LengthOrderedNode, QualityOrderedNode, RL_State, \
+    DRILLSearchTreePriorityQueue, IndexedHeap, heuristic_key
 from ontolearn.utils import oplogging, create_experiment_folder
 from ontolearn.value_splitter import AbstractValueSplitter, BinningValueSplitter, EntropyValueSplitter
-from owlapy.model import OWLClassExpression, OWLDataProperty, OWLLiteral, OWLNamedIndividual
+from owlapy.abox_index import IndividualBitSet
+from owlapy.model import OWLClassExpression, OWLDataProperty, OWLLiteral, OWLNamedIndividual, \
+    OWLObjectComplementOf, OWLObjectIntersectionOf, OWLObjectUnionOf
 from owlapy.render import DLSyntaxObjectRenderer
-from owlapy.util import OrderedOWLObject
+from owlapy.util import LRUCache, OrderedOWLObject, hash_cons
 from sortedcontainers import SortedSet
 
 # pd.set_option('display.max_columns', 100)
 
 logger = logging.getLogger(__name__)
 
-_concept_operand_sorter = ConceptOperandSorter()
+
+# state of a refinement evaluation worker process, inherited from the learner on fork
+_worker_state: Optional[Tuple[KnowledgeBase, AbstractScorer, EncodedPosNegLPStandardKind, int]] = None
+
+
+def _init_worker(kb: KnowledgeBase, quality_func: AbstractScorer, learning_problem: EncodedPosNegLPStandardKind,
+                 index_size: int):
+    global _worker_state
+    _worker_state = kb, quality_func, learning_problem, index_size
+
+
+def _evaluate_in_worker(concept: OWLClassExpression):
+    """Evaluate a concept in a worker process
+
+    Returns:
+        the quality and the instances of the concept. the instances are sent back as the bits of the bitset if they
+        are a bitset over the individuals known at fork time
+    """
+    kb, quality_func, learning_problem, index_size = _worker_state
+    e = kb.evaluate_concept(concept, quality_func, learning_problem)
+    if isinstance(e.inds, IndividualBitSet) and e.inds.bits.bit_length() <= index_size:
+        return e.q, e.inds.bits
+    return e.q, frozenset(e.inds)
+
+
+def _quality_in_worker(concept: OWLClassExpression) -> float:
+    """Compute the quality of a concept in a worker process"""
+    kb, quality_func, learning_problem, _ = _worker_state
+    return kb.evaluate_concept(concept, quality_func, learning_problem).q
 
 
 class CELOE(RefinementBasedConceptLearner[OENode]):
     __slots__ = 'best_descriptions', 'max_he', 'min_he', 'best_only', 'calculate_min_max', 'heuristic_queue', \
-                'search_tree', '_learning_problem', '_max_runtime', '_seen_norm_concepts'
+                'search_tree', '_learning_problem', '_max_runtime', '_seen_norm_concepts', 'n_jobs', \
+                'eliminate_equivalent', 'equivalent_concepts', '_extension_index', '_iterations', '_operand_sorter'
 
     name = 'celoe_python'
 
@@ -58,12 +94,20 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
     min_he: int
     best_only: bool
     calculate_min_max: bool
+    n_jobs: int
+    eliminate_equivalent: bool
 
     search_tree: Dict[OWLClassExpression, TreeNode[OENode]]
+    equivalent_concepts: Dict[OWLClassExpression, OWLClassExpression]
+    _extension_index: Dict[Any, OENode]
     seen_norm_concepts: Set[OWLClassExpression]
-    heuristic_queue: 'SortedSet[OENode]'
+    heuristic_queue: IndexedHeap[OENode]
     best_descriptions: EvaluatedDescriptionSet[OENode, QualityOrderedNode]
     _learning_problem: Optional[EncodedPosNegLPStandardKind]
+    _iterations: int
+    _operand_sorter: ConceptOperandSorter
+
+    _CHECKPOINT_VERSION: Final = 1
 
     def __init__(self,
                  knowledge_base: KnowledgeBase,
@@ -76,7 +120,19 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
                  max_runtime: Optional[int] = None,
                  max_results: int = 10,
                  best_only: bool = False,
-                 calculate_min_max: bool = True):
+                 calculate_min_max: bool = True,
+                 n_jobs: int = 1,
+                 eliminate_equivalent: bool = False):
+        """Create a new CELOE concept learner
+
+        Args:
+            n_jobs: number of worker processes to evaluate the refinements of a node in. the workers are forked from
+                the learner and share its knowledge base, the result is the same as that of a serial run. -1 to use
+                all cores. see `RefinementBasedConceptLearner` for the other arguments
+            eliminate_equivalent: whether to report only the shortest of the concepts with the same individuals as
+                best hypotheses, see `equivalent_concepts`. the longer concepts are not expanded either, unless they
+                are refinements of the shortest one
+        """
         super().__init__(knowledge_base=knowledge_base,
                          refinement_operator=refinement_operator,
                          quality_func=quality_func,
@@ -87,12 +143,18 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
                          max_runtime=max_runtime)
 
         self.search_tree = dict()
-        self.heuristic_queue = SortedSet(key=HeuristicOrderedNode)
+        self.equivalent_concepts = dict()
+        self._extension_index = dict()
+        self.heuristic_queue = IndexedHeap(key=heuristic_key, reverse=True)
         self._seen_norm_concepts = set()
         self.best_descriptions = EvaluatedDescriptionSet(max_size=max_results, ordering=QualityOrderedNode)
 
         self.best_only = best_only
         self.calculate_min_max = calculate_min_max
+        self.n_jobs = n_jobs if n_jobs > 0 else os.cpu_count()
+        self.eliminate_equivalent = eliminate_equivalent
+        # the refinements are interned like the concepts of the knowledge base
+        self._operand_sorter = ConceptOperandSorter(hash_consing=self.kb.hash_consing)
 
         self.max_he = 0
         self.min_he = 1
@@ -100,17 +162,18 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         # TODO: CD: BaseConceptLearner
         self._learning_problem = None
         self._max_runtime = None
+        self._iterations = 0
 
     def next_node_to_expand(self, step: int) -> OENode:
         if not self.best_only:
-            for node in reversed(self.heuristic_queue):
+            for node in self.heuristic_queue:
                 if node.quality < 1.0:
                     return node
             else:
                 raise ValueError("No Node with lesser accuracy found")
         else:
             # from reimplementation, pick without quality criterion
-            return self.heuristic_queue[-1]
+            return self.heuristic_queue.peek()
 
         # Original reimplementation of CELOE: Sort search tree at each step. Quite inefficient.
         # self.search_tree.sort_search_tree_by_decreasing_order(key='heuristic')
@@ -129,8 +192,8 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
 
     @contextmanager
     def updating_node(self, node: OENode):
-        self.heuristic_queue.discard(node)
         yield node
+        # re-prioritise in place
         self.heuristic_queue.add(node)
 
     def downward_refinement(self, node: OENode) -> Iterable[OENode]:
@@ -139,7 +202,7 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         with self.updating_node(node):
             # TODO: NNF
             refinements = SortedSet(
-                map(_concept_operand_sorter.sort,
+                map(self._operand_sorter.sort,
                     self.operator.refine(
                         node.concept,
                         max_length=node.h_exp,
@@ -173,48 +236,218 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         else:
             self._max_runtime = self.max_runtime
 
-        root = self.make_node(_concept_operand_sorter.sort(self.start_class), is_root=True)
+        root = self.make_node(self._operand_sorter.sort(self.start_class), is_root=True)
         self._add_node(root, None)
         assert len(self.heuristic_queue) == 1
         # TODO:CD:suggest to add another assert,e.g. assert #. of instance in root > 1
 
         self.start_time = time.time()
-        for j in range(1, self.iter_bound):
-            most_promising = self.next_node_to_expand(j)
-            tree_parent = self.tree_node(most_promising)
-            minimum_length = most_promising.h_exp
-            if logger.isEnabledFor(oplogging.TRACE):
-                logger.debug("now refining %s", most_promising)
-            for ref in self.downward_refinement(most_promising):
+        return self._search()
+
+    def _search(self):
+        """Expand the nodes of the search until one of the bounds is reached, starting from the current state"""
+        with self._worker_pool() as workers:
+            for j in range(self._iterations + 1, self.iter_bound):
+                self._iterations = j
+                most_promising = self.next_node_to_expand(j)
+                tree_parent = self.tree_node(most_promising)
+                minimum_length = most_promising.h_exp
+                if logger.isEnabledFor(oplogging.TRACE):
+                    logger.debug("now refining %s", most_promising)
                 # we ignore all refinements with lower length
                 # (this also avoids duplicate node children)
+                # and those that have been refined from another parent
                 # TODO: ignore too high depth
-                if ref.len < minimum_length:
-                    # ignoring refinement, it does not satisfy minimum_length condition
-                    continue
+                refs = [ref for ref in self.downward_refinement(most_promising)
+                        if ref.len >= minimum_length and ref.concept not in self.search_tree]
+                for ref, eval_ in zip(refs, self._evaluate_refinements(workers, refs)):
+                    # note: tree_parent has to be equal to node_tree_parent(ref.parent_node)!
+                    added = self._add_node_evald(ref, eval_, tree_parent)
 
-                # note: tree_parent has to be equal to node_tree_parent(ref.parent_node)!
-                added = self._add_node(ref, tree_parent)
+                    goal_found = added and ref.quality == 1.0
 
-                goal_found = added and ref.quality == 1.0
+                    if goal_found and self.terminate_on_goal:
+                        return self.terminate()
 
-                if goal_found and self.terminate_on_goal:
+                if self.calculate_min_max:
+                    # This is purely a statistical function, it does not influence CELOE
+                    self.update_min_max_horiz_exp(most_promising)
+
+                if time.time() - self.start_time > self._max_runtime:
                     return self.terminate()
 
-            if self.calculate_min_max:
-                # This is purely a statistical function, it does not influence CELOE
-                self.update_min_max_horiz_exp(most_promising)
+                if self.number_of_tested_concepts >= self.max_num_of_concepts_tested:
+                    return self.terminate()
 
-            if time.time() - self.start_time > self._max_runtime:
-                return self.terminate()
+                if logger.isEnabledFor(oplogging.TRACE) and j % 100 == 0:
+                    self._log_current_best(j)
 
-            if self.number_of_tested_concepts >= self.max_num_of_concepts_tested:
-                return self.terminate()
+        return self.terminate()
 
-            if logger.isEnabledFor(oplogging.TRACE) and j % 100 == 0:
-                self._log_current_best(j)
+    def checkpoint(self, path: str) -> None:
+        """Save the state of the search to a file, so that it can be continued with `resume`, also by another learner
+        on the same ontology
 
-        return self.terminate()
+        The file contains the search tree with the state of its nodes, the nodes in the search queue, the best
+        descriptions, the memo of the refinement operator and the examples of the learning problem.
+
+        Args:
+            path: file to write to
+        """
+        if self._learning_problem is None:
+            raise ValueError("Nothing to save, the learner was not fit")
+        positions = {concept: i for i, concept in enumerate(self.search_tree)}
+        nodes = []
+        for tn in self.search_tree.values():
+            n = tn.node
+            parent = None if n.is_root else positions[n.parent_node.concept]
+            nodes.append((n.concept, n.len, n.quality, n.heuristic, n.h_exp, n.refinement_count, n.individuals_count,
+                          parent))
+        operator_memo = None
+        if isinstance(self.operator, ModifiedCELOERefinement):
+            operator_memo = list(self.operator._refinement_cache.items())  # performance hack
+        lp = self._learning_problem
+        state = {
+            'version': self._CHECKPOINT_VERSION,
+            'key': self._checkpoint_key(),
+            'start_class': self.start_class,
+            'examples': (frozenset(lp.kb_pos), frozenset(lp.kb_neg), frozenset(lp.kb_all)),
+            'nodes': nodes,
+            'queue': [positions[n.concept] for n in self.heuristic_queue],
+            'best': [positions[n.concept] for n in self.best_descriptions.items],
+            'seen_norm_concepts': list(self._seen_norm_concepts),
+            'equivalent_concepts': list(self.equivalent_concepts.items()),
+            'operator_memo': operator_memo,
+            'number_of_tested_concepts': self._number_of_tested_concepts,
+            'iterations': self._iterations,
+            'min_max_he': (self.min_he, self.max_he),
+        }
+        with gzip.open(path, 'wb') as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def resume(self, path: str, extra_runtime: Optional[int] = None) -> 'CELOE':
+        """Restore the state of the search from a file written by `checkpoint` and continue the search
+
+        Args:
+            path: file to read from
+            extra_runtime: runtime of the continued search in seconds, max_runtime of the learner by default. the
+                other bounds apply to the whole search, e.g. the concepts tested before the checkpoint count towards
+                max_num_of_concepts_tested
+
+        Returns:
+            the concept learner object itself
+        """
+        with gzip.open(path, 'rb') as f:
+            state = pickle.load(f)
+        if state['version'] != self._CHECKPOINT_VERSION or state['key'] != self._checkpoint_key():
+            raise ValueError("Checkpoint was written for another ontology or reasoner", path)
+        if state['start_class'] != self.start_class:
+            raise ValueError("Checkpoint was written for another start class", state['start_class'])
+
+        self.clean()
+        pos, neg, all_instances = state['examples']
+        self._learning_problem = PosNegLPStandard(pos=set(pos), neg=set(neg),
+                                                  all_instances=set(all_instances)).encode_kb(self.kb)
+        self._max_runtime = extra_runtime if extra_runtime is not None else self.max_runtime
+
+        nodes: List[OENode] = []
+        tree_nodes: List[TreeNode[OENode]] = []
+        for concept, length, quality, heuristic, h_exp, refinement_count, individuals_count, parent in state['nodes']:
+            is_root = parent is None
+            n = OENode(concept, length, parent_node=None if is_root else nodes[parent], is_root=is_root)
+            n.quality = quality
+            for _ in range(h_exp - length):
+                n.increment_h_exp()
+            n.refinement_count = refinement_count
+            n.heuristic = heuristic
+            n.individuals_count = individuals_count
+            nodes.append(n)
+            tn = TreeNode(n, None if is_root else tree_nodes[parent], is_root=is_root)
+            tree_nodes.append(tn)
+            self.search_tree[concept] = tn
+        for i in state['queue']:
+            self.heuristic_queue.add(nodes[i])
+        for i in state['best']:
+            self.best_descriptions.maybe_add(nodes[i])
+        self._seen_norm_concepts.update(state['seen_norm_concepts'])
+        self.equivalent_concepts.update(state['equivalent_concepts'])
+        if self.eliminate_equivalent:
+            # the individuals are indexed by their bits, which are not portable
+            for n in nodes:
+                if n.quality and n.concept not in self.equivalent_concepts:
+                    inds = self.kb.individuals_set(n.concept)
+                    self._extension_index[inds.bits if isinstance(inds, IndividualBitSet) else inds] = n
+        if state['operator_memo'] is not None and isinstance(self.operator, ModifiedCELOERefinement):
+            for key, value in state['operator_memo']:
+                self.operator._refinement_cache[key] = value  # performance hack
+        self._number_of_tested_concepts = state['number_of_tested_concepts']
+        self._iterations = state['iterations']
+        self.min_he, self.max_he = state['min_max_he']
+
+        self.start_time = time.time()
+        return self._search()
+
+    def _checkpoint_key(self) -> Optional[str]:
+        """Hash of the ontology content and the reasoner, if the reasoner can compute it"""
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        reasoner = self.kb.reasoner()
+        if isinstance(reasoner, OWLReasoner_FastInstanceChecker):
+            return reasoner._index_key()
+        return None
+
+    @contextmanager
+    def _worker_pool(self):
+        """Fork the worker processes to evaluate refinements in, yields the pool and the index of the reasoner or None
+
+        The workers inherit the knowledge base, including the instance caches and the index of the reasoner, and the
+        encoded learning problem. They have to be forked after the learning problem was encoded.
+        """
+        if self.n_jobs <= 1 or multiprocessing.current_process().daemon:
+            # the workers of fit_many are daemons, which can not have child processes
+            yield None
+            return
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Cannot fork worker processes on this platform, evaluating refinements serially")
+            yield None
+            return
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        reasoner = self.kb.reasoner()
+        index = None
+        if isinstance(reasoner, OWLReasoner_FastInstanceChecker):
+            index = reasoner._ind_index  # performance hack, None if the reasoner does not use bitsets
+        index_size = len(index) if index is not None else -1
+        pool = multiprocessing.get_context('fork').Pool(
+            self.n_jobs, initializer=_init_worker,
+            initargs=(self.kb, self.quality_func, self._learning_problem, index_size))
+        try:
+            yield pool, index
+        finally:
+            pool.terminate()
+            pool.join()
+
+    def _evaluate_refinements(self, workers, refs: List[OENode]) -> Iterable[EvaluatedConcept]:
+        """Evaluate a batch of refinements, in the worker processes if there are any
+
+        Args:
+            workers: the worker pool and the index of the reasoner, as given by `_worker_pool`
+            refs: the refinements to evaluate
+
+        Returns:
+            the evaluated concepts, in the order of the refinements
+        """
+        if workers is None or len(refs) < 2 * self.n_jobs:
+            # not worth the communication
+            yield from self.kb.evaluate_concepts((ref.concept for ref in refs), self.quality_func,
+                                                 self._learning_problem)
+            return
+        pool, index = workers
+        chunksize = max(1, len(refs) // (4 * self.n_jobs))
+        for q, inds in pool.imap(_evaluate_in_worker, [ref.concept for ref in refs], chunksize):
+            e = EvaluatedConcept()
+            e.inds = IndividualBitSet(index, inds) if isinstance(inds, int) else inds
+            e.ic = len(e.inds)
+            e.q = q
+            yield e
 
     async def fit_async(self, *args, **kwargs):
         """
@@ -232,7 +465,7 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         else:
             self._max_runtime = self.max_runtime
 
-        root = self.make_node(_concept_operand_sorter.sort(self.start_class), is_root=True)
+        root = self.make_node(self._operand_sorter.sort(self.start_class), is_root=True)
         self._add_node(root, None)
         assert len(self.heuristic_queue) == 1
         # TODO:CD:suggest to add another assert,e.g. assert #. of instance in root > 1
@@ -320,12 +553,14 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         if ref.quality == 0:  # > too weak
             return False
         assert 0 <= ref.quality <= 1.0
+        redundant = self.eliminate_equivalent and self._is_redundant(ref, e.inds)
         # TODO: expression rewriting
         self.heuristic_func.apply(ref, e.inds, self._learning_problem)
-        if not norm_seen and self.best_descriptions.maybe_add(ref):
+        if not norm_seen and not redundant and self.best_descriptions.maybe_add(ref):
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Better description found: %s", ref)
-        self.heuristic_queue.add(ref)
+        if not redundant or self._is_expanded_equivalent(ref):
+            self.heuristic_queue.add(ref)
         # TODO: implement noise
         return True
 
@@ -353,15 +588,76 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         if ref.quality == 0:  # > too weak
             return False
         assert 0 <= ref.quality <= 1.0
+        redundant = self.eliminate_equivalent and self._is_redundant(ref, eval_.inds)
         # TODO: expression rewriting
         self.heuristic_func.apply(ref, eval_.inds, self._learning_problem)
-        if not norm_seen and self.best_descriptions.maybe_add(ref):
+        if not norm_seen and not redundant and self.best_descriptions.maybe_add(ref):
             if logger.isEnabledFor(logging.DEBUG):
                 logger.debug("Better description found: %s", ref)
-        self.heuristic_queue.add(ref)
+        if not redundant or self._is_expanded_equivalent(ref):
+            self.heuristic_queue.add(ref)
         # TODO: implement noise
         return True
 
+    def _is_redundant(self, ref: OENode, inds: Optional[FrozenSet[OWLNamedIndividual]]) -> bool:
+        """Check whether a node of the search has the same individuals as ref and is not longer
+
+        A longer node with the same individuals is replaced by ref as the representative of these individuals, it is
+        removed from the best descriptions, and from the search queue unless `_is_expanded_equivalent`.
+
+        Args:
+            ref: the evaluated refinement
+            inds: the individuals of ref, None if they are unknown
+
+        Returns:
+            True if ref is redundant and must not be reported
+        """
+        if inds is None:
+            return False
+        # bitsets are indexed by their bits, hashing them as sets would iterate the individuals
+        key = inds.bits if isinstance(inds, IndividualBitSet) else inds
+        representative = self._extension_index.get(key)
+        if representative is not None and representative.len <= ref.len:
+            self.equivalent_concepts[ref.concept] = representative.concept
+            return True
+        if representative is not None:
+            self.best_descriptions.items.discard(representative)
+            self.equivalent_concepts[representative.concept] = ref.concept
+            if not self._is_expanded_equivalent(representative):
+                self.heuristic_queue.discard(representative)
+        self._extension_index[key] = ref
+        return False
+
+    def _is_expanded_equivalent(self, node: OENode) -> bool:
+        """Check whether a node that was eliminated as equivalent is still expanded
+
+        The node is expanded if its representative is not shorter, or if the representative is one of its ancestors.
+        The refinements that keep the individuals of a node, e.g. Grandfather ⊓ ∃ hasChild.⊤ of Grandfather, are the
+        steps to its longer refinements.
+        """
+        representative = self.search_tree[self.equivalent_concepts[node.concept]].node
+        if representative.len >= node.len:
+            return True
+        ancestor = node.parent_node
+        while ancestor is not None:
+            if ancestor is representative:
+                return True
+            ancestor = ancestor.parent_node
+        return False
+
+    def representative_concept(self, concept: OWLClassExpression) -> OWLClassExpression:
+        """The concept that represents a concept of the search tree, after redundant concepts were eliminated
+
+        Args:
+            concept: a concept of the search tree
+
+        Returns:
+            the shortest concept found with the same individuals, concept itself if it was not eliminated
+        """
+        while concept in self.equivalent_concepts:
+            concept = self.equivalent_concepts[concept]
+        return concept
+
     def _log_current_best(self, heading_step, top_n: int = 10) -> None:
         logger.debug('######## %s step Best Hypotheses ###########', heading_step)
 
@@ -380,14 +676,13 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
 
         print('######## ', heading_step, 'step Search Tree ###########')
 
+        heur_ranks = {n: i + 1 for i, n in enumerate(self.heuristic_queue)}
+
         def tree_node_as_length_ordered_concept(tn: TreeNode[OENode]):
             return LengthOrderedNode(tn.node, tn.node.len)
 
         def print_partial_tree_recursive(tn: TreeNode[OENode], depth: int = 0):
-            if tn.node.heuristic is not None:
-                heur_idx = len(self.heuristic_queue) - self.heuristic_queue.index(tn.node)
-            else:
-                heur_idx = None
+            heur_idx = heur_ranks.get(tn.node)
 
             if tn.node in self.best_descriptions:
                 best_idx = len(self.best_descriptions.items) - self.best_descriptions.items.index(tn.node)
@@ -430,7 +725,7 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         if self.min_he == he - 1:
             threshold_score = node.heuristic + 1 - node.quality
 
-            for n in reversed(self.heuristic_queue):
+            for n in self.heuristic_queue:
                 if n == node:
                     continue
                 if n.h_exp == self.min_he:
@@ -449,11 +744,14 @@ class CELOE(RefinementBasedConceptLearner[OENode]):
         self.heuristic_queue.clear()
         self.best_descriptions.clean()
         self.search_tree.clear()
+        self.equivalent_concepts.clear()
+        self._extension_index.clear()
         self._seen_norm_concepts.clear()
         self.max_he = 0
         self.min_he = 1
         self._learning_problem = None
         self._max_runtime = None
+        self._iterations = 0
         super().clean()
 
 
@@ -654,6 +952,10 @@ class Drill(AbstractDrill, RefinementBasedConceptLearner):
     def terminate_training(self):
         ValueError('terminate_training')
 
+    def _fit_problem(self, problem: PosNegLPStandard, n: int) -> List[Tuple[OWLClassExpression, float]]:
+        self.fit(set(problem.pos), set(problem.neg))
+        return [(h.concept, h.quality) for h in self.best_hypotheses(n)]
+
     def fit_from_iterable(self,
                           dataset: List[Tuple[object, Set[OWLNamedIndividual], Set[OWLNamedIndividual]]],
                           max_runtime: int = None) -> List:
@@ -1261,7 +1563,8 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
     __slots__ = 'fitness_func', 'init_method', 'algorithm', 'value_splitter', 'tournament_size',  \
                 'population_size', 'num_generations', 'height_limit', 'use_data_properties', 'pset', 'toolbox', \
                 '_learning_problem', '_result_population', 'mut_uniform_gen', '_dp_to_prim_type', '_dp_splits', \
-                '_split_properties', '_cache', 'use_card_restrictions', 'card_limit', 'use_inverse'
+                '_split_properties', '_cache', 'use_card_restrictions', 'card_limit', 'use_inverse', 'n_jobs', \
+                '_workers', 'fitness_cache_size', '_nnf_cache_keys', 'subtree_cache_size', '_subtree_cache'
 
     name = 'evolearner'
 
@@ -1279,6 +1582,9 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
     population_size: int
     num_generations: int
     height_limit: int
+    n_jobs: int
+    fitness_cache_size: Optional[int]
+    subtree_cache_size: Optional[int]
 
     pset: gp.PrimitiveSetTyped
     toolbox: base.Toolbox
@@ -1287,7 +1593,13 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
     _dp_to_prim_type: Dict[OWLDataProperty, Any]
     _dp_splits: Dict[OWLDataProperty, List[OWLLiteral]]
     _split_properties: List[OWLDataProperty]
-    _cache: Dict[str, Tuple[float, float]]
+    _cache: LRUCache[OWLClassExpression, float]
+    _nnf_cache_keys: bool
+    _subtree_cache: LRUCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
+    _workers: Optional['multiprocessing.pool.Pool']
+
+    # how many concepts per worker are evaluated between the checks of max_runtime
+    _FITNESS_CHUNK_SIZE: Final = 64
 
     def __init__(self,
                  knowledge_base: KnowledgeBase,
@@ -1306,7 +1618,25 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
                  card_limit: int = 10,
                  population_size: int = 800,
                  num_generations: int = 200,
-                 height_limit: int = 17):
+                 height_limit: int = 17,
+                 n_jobs: int = 1,
+                 fitness_cache_size: Optional[int] = 2 ** 16,
+                 subtree_cache_size: Optional[int] = 2 ** 14):
+        """Create a new EvoLearner concept learner
+
+        Args:
+            n_jobs: number of worker processes to evaluate the fitness of the individuals of a generation in. the
+                workers are forked from the learner and share its knowledge base, the individuals get the same fitness
+                as in a serial run. -1 to use all cores
+            fitness_cache_size: how many qualities of class expressions to cache, None for no bound. the trees are
+                looked up by their normalised class expression, so that trees which only differ in the order or
+                duplicates of the operands or in ⊤ operands of intersections share an entry. with a closed world
+                reasoner the class expressions are also converted to negation normal form, which removes double
+                negations
+            subtree_cache_size: how many individuals of subtrees to cache, None for no bound. the trees are retrieved
+                bottom-up, so that the offspring of crossover and mutation only retrieve the subtrees along the
+                modified path
+        """
 
         if quality_func is None:
             quality_func = Accuracy()
@@ -1329,6 +1659,9 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
         self.population_size = population_size
         self.num_generations = num_generations
         self.height_limit = height_limit
+        self.n_jobs = n_jobs if n_jobs > 0 else os.cpu_count()
+        self.fitness_cache_size = fitness_cache_size
+        self.subtree_cache_size = subtree_cache_size
 
         self.__setup()
 
@@ -1351,8 +1684,15 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
         self._result_population = None
         self._dp_to_prim_type = dict()
         self._dp_splits = dict()
-        self._cache = dict()
+        self._cache = LRUCache(maxsize=self.fitness_cache_size)
+        self._subtree_cache = LRUCache(maxsize=self.subtree_cache_size)
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        reasoner = self.kb.reasoner()
+        # without negation_default the fast instance checker does not retrieve complements, so ¬¬C is not C
+        self._nnf_cache_keys = isinstance(reasoner, OWLReasoner_FastInstanceChecker) \
+            and reasoner._negation_default  # performance hack
         self._split_properties = []
+        self._workers = None
 
         self.pset = self.__build_primitive_set()
         self.toolbox = self.__build_toolbox()
@@ -1446,9 +1786,10 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
         toolbox = base.Toolbox()
         toolbox.register(ToolboxVocabulary.INIT_POPULATION, self.init_method.get_population,
                          creator.Individual, self.pset)
-        toolbox.register(ToolboxVocabulary.COMPILE, gp.compile, pset=self.pset)
+        toolbox.register(ToolboxVocabulary.COMPILE, compile_tree, pset=self.pset)
 
         toolbox.register(ToolboxVocabulary.FITNESS_FUNCTION, self._fitness_func)
+        toolbox.register(ToolboxVocabulary.FITNESS_BATCH, self._fitness_batch)
         toolbox.register(ToolboxVocabulary.SELECTION, tools.selTournament, tournsize=self.tournament_size)
         toolbox.register(ToolboxVocabulary.CROSSOVER, gp.cxOnePoint)
         toolbox.register("create_tree_mut", self.mut_uniform_gen.get_expression)
@@ -1465,6 +1806,8 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
         toolbox.register("terminate_on_goal", lambda: self.terminate_on_goal)
         toolbox.register("max_runtime", lambda: self.max_runtime)
         toolbox.register("pset", lambda: self.pset)
+        toolbox.register("island_state", lambda: (self._number_of_tested_concepts, self._cache.items()))
+        toolbox.register("merge_island_states", self._merge_island_states)
 
         return toolbox
 
@@ -1498,13 +1841,34 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
 
         population = self._initialize(learning_problem.pos, learning_problem.neg)
         self.start_time = time.time()
-        self._goal_found, self._result_population = self.algorithm.evolve(self.toolbox,
-                                                                          population,
-                                                                          self.num_generations,
-                                                                          self.start_time,
-                                                                          verbose=verbose)
+        with self._worker_pool():
+            self._goal_found, self._result_population = self.algorithm.evolve(self.toolbox,
+                                                                              population,
+                                                                              self.num_generations,
+                                                                              self.start_time,
+                                                                              verbose=verbose)
         return self.terminate()
 
+    @contextmanager
+    def _worker_pool(self):
+        """Fork the worker processes to evaluate the fitness in, see `CELOE._worker_pool`"""
+        if self.n_jobs <= 1 or multiprocessing.current_process().daemon:
+            yield
+            return
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            logger.warning("Cannot fork worker processes on this platform, evaluating the fitness serially")
+            yield
+            return
+        self._workers = multiprocessing.get_context('fork').Pool(
+            self.n_jobs, initializer=_init_worker,
+            initargs=(self.kb, self.quality_func, self._learning_problem, -1))
+        try:
+            yield
+        finally:
+            self._workers.terminate()
+            self._workers.join()
+            self._workers = None
+
     def _initialize(self, pos: FrozenSet[OWLNamedIndividual], neg: FrozenSet[OWLNamedIndividual]) -> List[Tree]:
         if self.use_data_properties:
             if isinstance(self.value_splitter, BinningValueSplitter):
@@ -1539,27 +1903,149 @@ class EvoLearner(BaseConceptLearner[EvoLearnerNode]):
     def _get_top_hypotheses(self, population: List[Tree], n: int = 5, key: str = 'fitness') \
             -> Iterable[EvoLearnerNode]:
         best_inds = tools.selBest(population, k=n, fit_attr=key)
-        best_concepts = [gp.compile(ind, self.pset) for ind in best_inds]
+        best_concepts = [compile_tree(ind, self.pset) for ind in best_inds]
 
         for con, ind in zip(best_concepts, best_inds):
             individuals_count = len(self.kb.individuals_set(con))
             yield EvoLearnerNode(con, self.kb.concept_len(con), individuals_count, ind.quality.values[0],
                                  len(ind), ind.height)
 
+    def fitness_cache_info(self):
+        """Report the statistics of the fitness cache"""
+        return self._cache.cache_info()
+
+    def _cache_key(self, individual: Tree) -> OWLClassExpression:
+        """The normalised class expression of a tree, which is evaluated in place of the tree"""
+        return self._normalised_subtrees(individual)[0][0]
+
+    def _normalised_subtrees(self, individual: Tree) -> Tuple[List[Any], List[List[int]]]:
+        """Normalise the class expressions of all subtrees of a tree bottom-up, the expression of a node is built from
+        the already normalised and interned expressions of its children
+
+        Returns:
+            the class expression (or terminal value) of the subtree at every position of the tree, and the positions of
+            the children of every node
+        """
+        context = self.pset.context
+        exprs: List[Any] = [None] * len(individual)
+        children: List[List[int]] = [[]] * len(individual)
+        stack: List[int] = []
+        # see compile_tree
+        for i in range(len(individual) - 1, -1, -1):
+            node = individual[i]
+            if node.arity == 0:
+                value = context[node.value] if node.conv_fct is str else node.value
+                exprs[i] = hash_cons(value) if isinstance(value, OWLClassExpression) else value
+            else:
+                children[i] = [stack.pop() for _ in range(node.arity)]
+                exprs[i] = self._normalise(context[node.name](*[exprs[c] for c in children[i]]))
+            stack.append(i)
+        return exprs, children
+
+    def _normalise(self, ce: OWLClassExpression) -> OWLClassExpression:
+        """Normalise a class expression whose operands are already normalised, like
+        OperandSetTransform.simplify_operands"""
+        if isinstance(ce, OWLObjectIntersectionOf):
+            operands = set(ce.operands())
+            operands.discard(self.kb.thing)
+            if not operands:
+                return self.kb.thing
+            if len(operands) == 1:
+                return operands.pop()
+            ce = OWLObjectIntersectionOf(sorted(operands, key=OrderedOWLObject))
+        elif isinstance(ce, OWLObjectUnionOf):
+            operands = set(ce.operands())
+            if self.kb.thing in operands:
+                return self.kb.thing
+            if len(operands) == 1:
+                return operands.pop()
+            ce = OWLObjectUnionOf(sorted(operands, key=OrderedOWLObject))
+        elif self._nnf_cache_keys and isinstance(ce, OWLObjectComplementOf):
+            ce = OperandSetTransform().simplify_operands(ce, nnf=True)
+        return hash_cons(ce)
+
+    def _subtree_individuals(self, exprs: List[Any], children: List[List[int]], i: int) \
+            -> FrozenSet[OWLNamedIndividual]:
+        """Individuals of the subtree at position i, retrieving only the subtrees that are not cached yet
+
+        Args:
+            exprs: the class expressions of the subtrees, see _normalised_subtrees
+            children: the positions of the children of every node
+            i: position of the subtree
+        """
+        ce = exprs[i]
+        if ce in self._subtree_cache:
+            return self._subtree_cache[ce]
+        known = {exprs[c]: self._subtree_individuals(exprs, children, c)
+                 for c in children[i] if isinstance(exprs[c], OWLClassExpression)}
+        inds = self.kb.individuals_set_given(ce, known)
+        self._subtree_cache[ce] = inds
+        return inds
+
+    def _apply_quality(self, individual: Tree, quality: float):
+        individual.quality.values = (quality,)
+        # the fitness is not cached, it can depend on the tree and not only on its class expression
+        self.fitness_func.apply(individual)
+
     def _fitness_func(self, individual: Tree):
-        ind_str = ind_to_string(individual)
-        # experimental
-        if ind_str in self._cache:
-            individual.quality.values = (self._cache[ind_str][0],)
-            individual.fitness.values = (self._cache[ind_str][1],)
+        exprs, children = self._normalised_subtrees(individual)
+        concept = exprs[0]
+        if concept in self._cache:
+            quality = self._cache[concept]
         else:
-            concept = gp.compile(individual, self.pset)
-            e = self.kb.evaluate_concept(concept, self.quality_func, self._learning_problem)
-            individual.quality.values = (e.q,)
-            self.fitness_func.apply(individual)
-            self._cache[ind_str] = (e.q, individual.fitness.values[0])
+            _, quality = self.quality_func.score_elp(self._subtree_individuals(exprs, children, 0),
+                                                     self._learning_problem)
+            self._cache[concept] = quality
             self._number_of_tested_concepts += 1
+        self._apply_quality(individual, quality)
+
+    def _merge_island_states(self, states: List[Tuple[int, List[Tuple[OWLClassExpression, float]]]]):
+        """Merge the fitness caches and tested concepts of the island workers, which were forked from this learner"""
+        forked_count = self._number_of_tested_concepts
+        for count, cache_items in states:
+            self._number_of_tested_concepts += count - forked_count
+            for concept, quality in cache_items:
+                self._cache[concept] = quality
+
+    def _fitness_batch(self, individuals: List[Tree]):
+        """Apply the fitness function to a batch of individuals, evaluating the concepts that are not cached yet in the
+        worker processes if there are any
+
+        The concepts are dispatched in chunks. Once max_runtime is exceeded no more chunks are dispatched, and the
+        individuals of the remaining concepts get the worst quality, without caching it.
+        """
+        if self._workers is None or multiprocessing.current_process().daemon:
+            # the island workers of MultiPopulation can not use the pool of the learner
+            for ind in individuals:
+                self.toolbox.apply_fitness(ind)
+            return
+        concepts = [self._cache_key(ind) for ind in individuals]
+        # the qualities of this batch are kept aside, so that they survive evictions from a small cache
+        qualities: Dict[OWLClassExpression, Optional[float]] = dict()
+        pending: List[OWLClassExpression] = []
+        for concept in concepts:
+            if concept in qualities:
+                continue
+            if concept in self._cache:
+                qualities[concept] = self._cache[concept]
+            else:
+                qualities[concept] = None
+                pending.append(concept)
+        step = self._FITNESS_CHUNK_SIZE * self.n_jobs
+        for i in range(0, len(pending), step):
+            if i > 0 and time.time() - self.start_time > self.max_runtime:
+                break
+            chunk = pending[i:i + step]
+            for concept, quality in zip(chunk, self._workers.map(_quality_in_worker, chunk)):
+                qualities[concept] = quality
+                self._cache[concept] = quality
+                self._number_of_tested_concepts += 1
+        for concept, ind in zip(concepts, individuals):
+            quality = qualities[concept]
+            self._apply_quality(ind, 0.0 if quality is None else quality)
 
     def clean(self):
         self._result_population = None
+        self._cache.cache_clear()
+        self._subtree_cache.cache_clear()
         super().clean()
@@ -1,6 +1,6 @@
 from collections import Counter
 from functools import singledispatchmethod
-from typing import Iterable, Generic, TypeVar, Callable, List
+from typing import Iterable, Generic, TypeVar, Callable, List, Optional
 
 from owlapy.model import OWLDataRange, OWLLiteral, OWLObject, OWLClass, OWLObjectProperty, OWLObjectSomeValuesFrom, \
     OWLObjectAllValuesFrom, OWLObjectUnionOf, OWLObjectIntersectionOf, OWLObjectComplementOf, OWLObjectInverseOf, \
@@ -8,9 +8,10 @@ from owlapy.model import OWLDataRange, OWLLiteral, OWLObject, OWLClass, OWLObjec
     OWLObjectMinCardinality, OWLObjectExactCardinality, OWLObjectMaxCardinality, OWLClassExpression, OWLThing, \
     OWLDataSomeValuesFrom, OWLDataOneOf, OWLDatatypeRestriction, OWLDataComplementOf, OWLDataAllValuesFrom, \
     OWLDataCardinalityRestriction, OWLDatatype, OWLDataHasValue, OWLDataUnionOf, OWLDataIntersectionOf, \
-    OWLDataExactCardinality, OWLDataMaxCardinality, OWLDataMinCardinality, OWLDataProperty
+    OWLDataExactCardinality, OWLDataMaxCardinality, OWLDataMinCardinality, OWLDataProperty, \
+    OWLNaryBooleanClassExpression, OWLQuantifiedObjectRestriction
 
-from owlapy.util import OrderedOWLObject, iter_count
+from owlapy.util import LRUCache, OrderedOWLObject, hash_cons, iter_count
 from sortedcontainers import SortedSet
 
 
@@ -40,6 +41,7 @@ class OWLClassExpressionLengthMetric:
         data_complement_length: Data Complement: ¬datatype
         data_intersection_length: Data Intersection: datatype ⨅ datatype
         data_union_length: Data Union: datatype ⨆ datatype
+        cache_size: how many lengths of class expressions and data ranges to memoise
     """
 
     __slots__ = 'class_length', 'object_intersection_length', 'object_union_length', 'object_complement_length', \
@@ -48,7 +50,7 @@ class OWLClassExpressionLengthMetric:
                 'data_some_values_length', 'data_all_values_length', 'data_has_value_length', \
                 'data_cardinality_length', 'object_property_length', 'object_inverse_length', 'data_property_length', \
                 'datatype_length', 'data_one_of_length', 'data_complement_length', 'data_intersection_length', \
-                'data_union_length'
+                'data_union_length', '_lengths'
 
     class_length: int
     object_intersection_length: int
@@ -72,6 +74,7 @@ class OWLClassExpressionLengthMetric:
     data_complement_length: int
     data_intersection_length: int
     data_union_length: int
+    _lengths: LRUCache[OWLObject, int]
 
     def __init__(self, *,
                  class_length: int,
@@ -96,6 +99,7 @@ class OWLClassExpressionLengthMetric:
                  data_complement_length: int,
                  data_intersection_length: int,
                  data_union_length: int,
+                 cache_size: Optional[int] = 2 ** 16,
                  ):
         self.class_length = class_length
         self.object_intersection_length = object_intersection_length
@@ -119,6 +123,7 @@ class OWLClassExpressionLengthMetric:
         self.data_complement_length = data_complement_length
         self.data_intersection_length = data_intersection_length
         self.data_union_length = data_union_length
+        self._lengths = LRUCache(maxsize=cache_size)
 
     @staticmethod
     def get_default() -> 'OWLClassExpressionLengthMetric':
@@ -147,32 +152,91 @@ class OWLClassExpressionLengthMetric:
             data_union_length=1,
         )
 
+    def length(self, o: OWLObject) -> int:
+        """The length of a class expression or data range, the lengths of it and its parts are memoised
+
+        Args:
+            o: class expression, data range or property
+
+        Returns:
+            length of o
+        """
+        if type(o) is OWLClass:
+            return self.class_length
+        length = self._lengths[o]
+        if length is None:
+            length = self._length(o)
+            self._lengths[o] = length
+        return length
+
+    def nary_length(self, c: OWLNaryBooleanClassExpression, lengths: Iterable[int]) -> int:
+        """The length of a union or intersection that was built from class expressions of known length, without
+        walking them. Operands that are unions or intersections of the same type count with their own length
+
+        Args:
+            c: union or intersection
+            lengths: lengths of the class expressions that c was built from
+
+        Returns:
+            length of c, which is memoised
+        """
+        lengths = list(lengths)
+        op_length = self.object_union_length if isinstance(c, OWLObjectUnionOf) else self.object_intersection_length
+        length = sum(lengths) + (len(lengths) - 1) * op_length
+        self._lengths[c] = length
+        return length
+
+    def restriction_length(self, e: OWLQuantifiedObjectRestriction, filler_length: int) -> int:
+        """The length of an object restriction whose filler has a known length, without walking the filler
+
+        Args:
+            e: existential, universal or cardinality restriction
+            filler_length: length of the filler of e
+
+        Returns:
+            length of e, which is memoised
+        """
+        if isinstance(e, OWLObjectSomeValuesFrom):
+            length = self.object_some_values_length
+        elif isinstance(e, OWLObjectAllValuesFrom):
+            length = self.object_all_values_length
+        else:
+            assert isinstance(e, OWLObjectCardinalityRestriction)
+            length = self.object_cardinality_length
+        length += self.length(e.get_property()) + filler_length
+        self._lengths[e] = length
+        return length
+
+    def cache_clear(self):
+        """Clear the memoised lengths"""
+        self._lengths.cache_clear()
+
     # single dispatch is still not implemented in mypy, see https://github.com/python/mypy/issues/2904
     @singledispatchmethod
-    def length(self, o: OWLObject) -> int:
+    def _length(self, o: OWLObject) -> int:
         raise NotImplementedError
 
-    @length.register
+    @_length.register
     def _(self, o: OWLClass) -> int:
         return self.class_length
 
-    @length.register
+    @_length.register
     def _(self, p: OWLObjectProperty) -> int:
         return self.object_property_length
 
-    @length.register
+    @_length.register
     def _(self, e: OWLObjectSomeValuesFrom) -> int:
         return self.object_some_values_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, e: OWLObjectAllValuesFrom) -> int:
         return self.object_all_values_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, c: OWLObjectUnionOf) -> int:
         length = -self.object_union_length
         for op in c.operands():
@@ -180,7 +244,7 @@ class OWLClassExpressionLengthMetric:
 
         return length
 
-    @length.register
+    @_length.register
     def _(self, c: OWLObjectIntersectionOf) -> int:
         length = -self.object_intersection_length
         for op in c.operands():
@@ -188,85 +252,85 @@ class OWLClassExpressionLengthMetric:
 
         return length
 
-    @length.register
+    @_length.register
     def _(self, n: OWLObjectComplementOf) -> int:
         return self.length(n.get_operand()) + self.object_complement_length
 
-    @length.register
+    @_length.register
     def _(self, p: OWLObjectInverseOf) -> int:
         return self.object_inverse_length
 
-    @length.register
+    @_length.register
     def _(self, e: OWLObjectCardinalityRestriction) -> int:
         return self.object_cardinality_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, s: OWLObjectHasSelf) -> int:
         return self.object_has_self_length + self.length(s.get_property())
 
-    @length.register
+    @_length.register
     def _(self, v: OWLObjectHasValue) -> int:
         return self.object_has_value_length + self.length(v.get_property())
 
-    @length.register
+    @_length.register
     def _(self, o: OWLObjectOneOf) -> int:
         return self.object_one_of_length
 
-    @length.register
+    @_length.register
     def _(self, p: OWLDataProperty) -> int:
         return self.data_property_length
 
-    @length.register
+    @_length.register
     def _(self, e: OWLDataSomeValuesFrom) -> int:
         return self.data_some_values_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, e: OWLDataAllValuesFrom) -> int:
         return self.data_all_values_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, e: OWLDataCardinalityRestriction) -> int:
         return self.data_cardinality_length \
                + self.length(e.get_property()) \
                + self.length(e.get_filler())
 
-    @length.register
+    @_length.register
     def _(self, v: OWLDataHasValue) -> int:
         return self.data_has_value_length + self.length(v.get_property())
 
-    @length.register
+    @_length.register
     def _(self, o: OWLDataOneOf) -> int:
         return self.data_one_of_length
 
-    @length.register
+    @_length.register
     def _(self, n: OWLDatatypeRestriction) -> int:
         return iter_count(n.get_facet_restrictions())
 
-    @length.register
+    @_length.register
     def _(self, n: OWLDataComplementOf) -> int:
         return self.data_complement_length + self.length(n.get_data_range())
 
-    @length.register
+    @_length.register
     def _(self, c: OWLDataUnionOf) -> int:
         length = -self.data_union_length
         for op in c.operands():
             length += self.length(op) + self.data_union_length
         return length
 
-    @length.register
+    @_length.register
     def _(self, c: OWLDataIntersectionOf) -> int:
         length = -self.data_intersection_length
         for op in c.operands():
             length += self.length(op) + self.data_intersection_length
         return length
 
-    @length.register
+    @_length.register
     def _(self, t: OWLDatatype) -> int:
         return self.datatype_length
 
@@ -330,48 +394,64 @@ def _sort_by_ordered_owl_object(i: Iterable[_O]) -> Iterable[_O]:
 
 
 class ConceptOperandSorter:
+    __slots__ = '_hash_consing',
+
+    _hash_consing: bool
+
+    def __init__(self, hash_consing: bool = False):
+        """Sorts the operands of class expressions
+
+        Args:
+            hash_consing: whether the sorted class expressions are interned (see `owlapy.util.hash_cons`)
+        """
+        self._hash_consing = hash_consing
+
+    def sort(self, o: _O) -> _O:
+        o = self._sort(o)
+        return hash_cons(o) if self._hash_consing else o
+
     # single dispatch is still not implemented in mypy, see https://github.com/python/mypy/issues/2904
     @singledispatchmethod
-    def sort(self, o: _O) -> _O:
+    def _sort(self, o: _O) -> _O:
         raise NotImplementedError(o)
 
-    @sort.register
+    @_sort.register
     def _(self, o: OWLClass) -> OWLClass:
         return o
 
-    @sort.register
+    @_sort.register
     def _(self, p: OWLObjectProperty) -> OWLObjectProperty:
         return p
 
-    @sort.register
+    @_sort.register
     def _(self, p: OWLDataProperty) -> OWLDataProperty:
         return p
 
-    @sort.register
+    @_sort.register
     def _(self, i: OWLNamedIndividual) -> OWLNamedIndividual:
         return i
 
-    @sort.register
+    @_sort.register
     def _(self, i: OWLLiteral) -> OWLLiteral:
         return i
 
-    @sort.register
+    @_sort.register
     def _(self, e: OWLObjectSomeValuesFrom) -> OWLObjectSomeValuesFrom:
-        t = OWLObjectSomeValuesFrom(property=e.get_property(), filler=self.sort(e.get_filler()))
+        t = OWLObjectSomeValuesFrom(property=e.get_property(), filler=self._sort(e.get_filler()))
         if t == e:
             return e
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, e: OWLObjectAllValuesFrom) -> OWLObjectAllValuesFrom:
-        t = OWLObjectAllValuesFrom(property=e.get_property(), filler=self.sort(e.get_filler()))
+        t = OWLObjectAllValuesFrom(property=e.get_property(), filler=self._sort(e.get_filler()))
         if t == e:
             return e
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, c: OWLObjectUnionOf) -> OWLObjectUnionOf:
         t = OWLObjectUnionOf(_sort_by_ordered_owl_object(c.operands()))
         if t == c:
@@ -379,7 +459,7 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, c: OWLObjectIntersectionOf) -> OWLObjectIntersectionOf:
         t = OWLObjectIntersectionOf(_sort_by_ordered_owl_object(c.operands()))
         if t == c:
@@ -387,50 +467,50 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, n: OWLObjectComplementOf) -> OWLObjectComplementOf:
         return n
 
-    @sort.register
+    @_sort.register
     def _(self, p: OWLObjectInverseOf) -> OWLObjectInverseOf:
         return p
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectMinCardinality) -> OWLObjectMinCardinality:
         t = OWLObjectMinCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                    filler=self.sort(r.get_filler()))
+                                    filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectExactCardinality) -> OWLObjectExactCardinality:
         t = OWLObjectExactCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                      filler=self.sort(r.get_filler()))
+                                      filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectMaxCardinality) -> OWLObjectMaxCardinality:
         t = OWLObjectMaxCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                    filler=self.sort(r.get_filler()))
+                                    filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectHasSelf) -> OWLObjectHasSelf:
         return r
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectHasValue) -> OWLObjectHasValue:
         return r
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLObjectOneOf) -> OWLObjectOneOf:
         t = OWLObjectOneOf(_sort_by_ordered_owl_object(r.individuals()))
         if t == r:
@@ -438,23 +518,23 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, e: OWLDataSomeValuesFrom) -> OWLDataSomeValuesFrom:
-        t = OWLDataSomeValuesFrom(property=e.get_property(), filler=self.sort(e.get_filler()))
+        t = OWLDataSomeValuesFrom(property=e.get_property(), filler=self._sort(e.get_filler()))
         if t == e:
             return e
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, e: OWLDataAllValuesFrom) -> OWLDataAllValuesFrom:
-        t = OWLDataAllValuesFrom(property=e.get_property(), filler=self.sort(e.get_filler()))
+        t = OWLDataAllValuesFrom(property=e.get_property(), filler=self._sort(e.get_filler()))
         if t == e:
             return e
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, c: OWLDataUnionOf) -> OWLDataUnionOf:
         t = OWLDataUnionOf(_sort_by_ordered_owl_object(c.operands()))
         if t == c:
@@ -462,7 +542,7 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, c: OWLDataIntersectionOf) -> OWLDataIntersectionOf:
         t = OWLDataIntersectionOf(_sort_by_ordered_owl_object(c.operands()))
         if t == c:
@@ -470,11 +550,11 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, n: OWLDataComplementOf) -> OWLDataComplementOf:
         return n
 
-    @sort.register
+    @_sort.register
     def _(self, n: OWLDatatypeRestriction) -> OWLDatatypeRestriction:
         t = OWLDatatypeRestriction(n.get_datatype(), _sort_by_ordered_owl_object(n.get_facet_restrictions()))
         if t == n:
@@ -482,42 +562,42 @@ class ConceptOperandSorter:
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, d: OWLDatatype) -> OWLDatatype:
         return d
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLDataMinCardinality) -> OWLDataMinCardinality:
         t = OWLDataMinCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                  filler=self.sort(r.get_filler()))
+                                  filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLDataExactCardinality) -> OWLDataExactCardinality:
         t = OWLDataExactCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                    filler=self.sort(r.get_filler()))
+                                    filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLDataMaxCardinality) -> OWLDataMaxCardinality:
         t = OWLDataMaxCardinality(cardinality=r.get_cardinality(), property=r.get_property(),
-                                  filler=self.sort(r.get_filler()))
+                                  filler=self._sort(r.get_filler()))
         if t == r:
             return r
         else:
             return t
 
-    @sort.register
+    @_sort.register
     def _(self, r: OWLDataHasValue) -> OWLDataHasValue:
         return r
 
-    @sort.register
+    @_sort.register
     def _(self, n: OWLDataOneOf) -> OWLDataOneOf:
         t = OWLDataOneOf(_sort_by_ordered_owl_object(n.values()))
         if t == n:
@@ -530,6 +610,20 @@ class OperandSetTransform:
     def simplify(self, o: OWLClassExpression) -> OWLClassExpression:
         return self._simplify(o).get_nnf()
 
+    def simplify_operands(self, o: OWLClassExpression, nnf: bool = False) -> OWLClassExpression:
+        """Sort and deduplicate the operands of the nary expressions and drop the ⊤ operands of intersections, like
+        simplify but without converting the result to negation normal form
+
+        Args:
+            o: class expression
+            nnf: whether to convert o to negation normal form first, which only preserves its instances if negation is
+                interpreted as the complement
+
+        Returns:
+            the simplified class expression
+        """
+        return self._simplify(o.get_nnf() if nnf else o)
+
     # single dispatch is still not implemented in mypy, see https://github.com/python/mypy/issues/2904
     @singledispatchmethod
     def _simplify(self, o: _O) -> _O:
@@ -1,17 +1,51 @@
 from abc import ABCMeta, abstractmethod
 from typing import ClassVar, Final, List, Optional, Tuple
+from deap import gp
 from deap.algorithms import varAnd
 from deap.base import Toolbox
 from heapq import nlargest
+import multiprocessing
+import queue
+import random
 import time
 import logging
 import itertools
 
-from ontolearn.ea_utils import Tree
+from ontolearn.ea_utils import ToolboxVocabulary, Tree
 
 logger = logging.getLogger(__name__)
 
 
+def _apply_fitness(toolbox: Toolbox, individuals: List[Tree]):
+    """Apply the fitness function to the individuals, to all of them at once if the toolbox supports it"""
+    if hasattr(toolbox, ToolboxVocabulary.FITNESS_BATCH):
+        toolbox.apply_fitness_batch(individuals)
+    else:
+        for ind in individuals:
+            toolbox.apply_fitness(ind)
+
+
+# individuals are sent to other processes as the names of their nodes, their primitive set can contain local classes
+# that can not be pickled. the nodes are rebuilt from the mapping of the primitive set instead of parsing the string of
+# the tree, which would depend on how the names are rendered
+_TransferredTree = Tuple[List[str], Tuple[float, ...], Tuple[float, ...]]
+
+
+def _transfer(individuals: List[Tree]) -> List[_TransferredTree]:
+    return [([node.name for node in ind], ind.quality.values, ind.fitness.values) for ind in individuals]
+
+
+def _receive(toolbox: Toolbox, individual_type: type, transferred: List[_TransferredTree]) -> List[Tree]:
+    mapping = toolbox.pset().mapping
+    individuals = []
+    for names, quality, fitness in transferred:
+        ind = individual_type(gp.PrimitiveTree([mapping[name] for name in names]))
+        ind.quality.values = quality
+        ind.fitness.values = fitness
+        individuals.append(ind)
+    return individuals
+
+
 class AbstractEvolutionaryAlgorithm(metaclass=ABCMeta):
     """
     An abstract class for evolutionary algorithms.
@@ -55,8 +89,7 @@ class BaseEvolutionaryAlgorithm(AbstractEvolutionaryAlgorithm):
                start_time: float,
                verbose: int = 0) -> Tuple[bool, List[Tree]]:
 
-        for ind in population:
-            toolbox.apply_fitness(ind)
+        _apply_fitness(toolbox, population)
 
         gen = 1
         goal_found = False
@@ -113,11 +146,9 @@ class EASimple(BaseEvolutionaryAlgorithm):
         offspring = toolbox.select(population, k=num_selections)
         offspring = varAnd(offspring, toolbox, self.crossover_pr, self.mutation_pr)
 
-        for off in offspring:
-            if not off.fitness.valid:
-                toolbox.apply_fitness(off)
-                if off.quality.values[0] == 1.0:
-                    goal_found = True
+        invalid = [off for off in offspring if not off.fitness.valid]
+        _apply_fitness(toolbox, invalid)
+        goal_found = any(off.quality.values[0] == 1.0 for off in invalid)
 
         population[:] = offspring + elite
         return goal_found, population
@@ -145,7 +176,7 @@ class RegularizedEvolution(BaseEvolutionaryAlgorithm):
 
 
 class MultiPopulation(AbstractEvolutionaryAlgorithm):
-    __slots__ = 'base_algorithm', 'migration_size', 'num_populations', 'iso_generations', 'boost'
+    __slots__ = 'base_algorithm', 'migration_size', 'num_populations', 'iso_generations', 'boost', 'parallel_islands'
 
     name: Final = 'MultiPopulation'
 
@@ -154,18 +185,28 @@ class MultiPopulation(AbstractEvolutionaryAlgorithm):
     num_populations: int
     iso_generations: float
     boost: float
+    parallel_islands: bool
 
     def __init__(self,
                  base_algorithm: Optional[BaseEvolutionaryAlgorithm] = None,
                  migration_size: float = 0.1,
                  num_populations: int = 4,
                  iso_generations: float = 0.1,
-                 boost: float = 0.0):
+                 boost: float = 0.0,
+                 parallel_islands: bool = False):
+        """Create a new multi population algorithm
+
+        Args:
+            parallel_islands: whether every population evolves in its own forked worker process. the islands exchange
+                their migrants with their neighbour in a ring instead of keeping their own, and all islands stop once
+                one of them found the goal or the maximum runtime is exceeded
+        """
         self.migration_size = migration_size
         self.num_populations = num_populations
         self.iso_generations = iso_generations
         self.base_algorithm = base_algorithm
         self.boost = boost
+        self.parallel_islands = parallel_islands
 
         if self.base_algorithm is None:
             self.base_algorithm = EASimple()
@@ -185,8 +226,12 @@ class MultiPopulation(AbstractEvolutionaryAlgorithm):
         num_migration = int(population_size*self.migration_size)
 
         for p in populations:
-            for ind in p:
-                toolbox.apply_fitness(ind)
+            _apply_fitness(toolbox, p)
+
+        if self.parallel_islands and self.num_populations > 1 and not multiprocessing.current_process().daemon \
+                and 'fork' in multiprocessing.get_all_start_methods():
+            return self._evolve_islands(toolbox, populations, num_generations, iso_ngen, num_migration,
+                                        population_size, start_time, verbose)
 
         gen = 1
         goal_found = [False] * self.num_populations
@@ -206,13 +251,7 @@ class MultiPopulation(AbstractEvolutionaryAlgorithm):
 
         while gen <= num_generations and not (any(goal_found) and toolbox.terminate_on_goal()):
 
-            migrate_inds = []
-            for idx, p in enumerate(populations):
-                mig = nlargest(num_migration, p, key=lambda ind: ind.fitness.values[0])
-                migrate_inds.append([toolbox.clone(ind) for ind in mig])
-                if self.boost > 0.0:
-                    for ind in migrate_inds[idx]:
-                        ind.fitness.values = (ind.fitness.values[0] + self.boost, )
+            migrate_inds = [self._migrants(toolbox, p, num_migration) for p in populations]
 
             for idx, p in enumerate(populations):
                 goal_found[idx], population = self.base_algorithm.generation(toolbox,
@@ -230,6 +269,93 @@ class MultiPopulation(AbstractEvolutionaryAlgorithm):
 
         return self._finalize(goal_found, populations, toolbox)
 
+    def _migrants(self, toolbox: Toolbox, population: List[Tree], num_migration: int) -> List[Tree]:
+        mig = nlargest(num_migration, population, key=lambda ind: ind.fitness.values[0])
+        migrants = [toolbox.clone(ind) for ind in mig]
+        if self.boost > 0.0:
+            for ind in migrants:
+                ind.fitness.values = (ind.fitness.values[0] + self.boost, )
+        return migrants
+
+    def _evolve_islands(self, toolbox: Toolbox, populations: List[List[Tree]], num_generations: int, iso_ngen: int,
+                        num_migration: int, population_size: int, start_time: float, verbose: int) \
+            -> Tuple[bool, List[Tree]]:
+        """Evolve every population in its own forked worker process
+
+        If the toolbox has island_state and merge_island_states, the states of the workers are merged back into the
+        parent at the end.
+        """
+        ctx = multiprocessing.get_context('fork')
+        individual_type = type(populations[0][0])
+        inboxes = [ctx.Queue() for _ in populations]
+        results = ctx.Queue()
+        stop = ctx.Event()
+        # the islands draw from different random streams
+        seeds = [random.random() for _ in populations]
+        workers = [ctx.Process(target=self._island, daemon=True,
+                               args=(toolbox, idx, p, individual_type, num_generations, iso_ngen, num_migration,
+                                     population_size, start_time, verbose, seeds[idx], inboxes, results, stop))
+                   for idx, p in enumerate(populations)]
+        for w in workers:
+            w.start()
+        try:
+            island_results = []
+            while len(island_results) < len(workers):
+                try:
+                    island_results.append(results.get(timeout=1.0))
+                except queue.Empty:
+                    if any(w.exitcode not in (None, 0) for w in workers):
+                        raise RuntimeError("An island worker process failed")
+        finally:
+            stop.set()
+            for w in workers:
+                w.join(timeout=1.0)
+                if w.is_alive():
+                    w.terminate()
+
+        island_results.sort(key=lambda r: r[0])
+        goal_found = [r[1] for r in island_results]
+        populations = [_receive(toolbox, individual_type, r[2]) for r in island_results]
+        if hasattr(toolbox, 'merge_island_states'):
+            toolbox.merge_island_states([r[3] for r in island_results])
+        return self._finalize(goal_found, populations, toolbox)
+
+    def _island(self, toolbox: Toolbox, idx: int, population: List[Tree], individual_type: type, num_generations: int,
+                iso_ngen: int, num_migration: int, population_size: int, start_time: float, verbose: int, seed: float,
+                inboxes: List[multiprocessing.Queue], results: multiprocessing.Queue, stop):
+        random.seed(seed)
+        for inbox in inboxes:
+            # migrants that are never received must not block the exit of the process
+            inbox.cancel_join_thread()
+        neighbour = inboxes[(idx + 1) % len(inboxes)]
+
+        gen = 1
+        goal_found = False
+        while gen <= num_generations and not stop.is_set():
+            migrants = []
+            if gen > iso_ngen:
+                neighbour.put(_transfer(self._migrants(toolbox, population, num_migration)))
+                while True:
+                    try:
+                        migrants = _receive(toolbox, individual_type, inboxes[idx].get(timeout=0.1))
+                        break
+                    except queue.Empty:
+                        if stop.is_set():
+                            break
+                if stop.is_set():
+                    break
+
+            goal_found, population = self.base_algorithm.generation(toolbox, population + migrants, population_size)
+            if verbose > 0:
+                self._log_generation_info(toolbox, gen, population, idx)
+
+            if (goal_found and toolbox.terminate_on_goal()) or (time.time() - start_time) > toolbox.max_runtime():
+                stop.set()
+            gen += 1
+
+        state = toolbox.island_state() if hasattr(toolbox, 'island_state') else None
+        results.put((idx, goal_found, _transfer(population), state))
+
     def _log_generation_info(self, toolbox: Toolbox, gen: int, population: List[Tree], idx: int = 0):
         logger.info(f'Population {idx}:')
         logger.info(f'Generation: {gen}')
@@ -242,6 +368,5 @@ class MultiPopulation(AbstractEvolutionaryAlgorithm):
         # If boost was used we need to compute the actual fitness values once more, so there is
         # no individual left which has the boost applied
         if self.boost > 0:
-            for ind in population:
-                toolbox.apply_fitness(ind)
+            _apply_fitness(toolbox, population)
         return any(goal_found), population
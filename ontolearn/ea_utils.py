@@ -1,7 +1,7 @@
 from enum import Enum
 from typing import Callable, Final, List, Optional, Tuple, Union
 
-from deap.gp import Primitive, Terminal
+from deap.gp import Primitive, PrimitiveSetTyped, Terminal
 from owlapy.model import OWLObjectPropertyExpression, OWLObjectSomeValuesFrom, OWLObjectUnionOf, \
     OWLClassExpression, OWLDataHasValue, OWLDataPropertyExpression, OWLDataSomeValuesFrom, OWLLiteral, \
     OWLObjectAllValuesFrom, OWLObjectIntersectionOf, NUMERIC_DATATYPES, OWLDataProperty, OWLObjectProperty, \
@@ -119,6 +119,7 @@ class ToolboxVocabulary(str, Enum):
     COMPILE: Final = "compile"  #:
     INIT_POPULATION: Final = "population"  #:
     FITNESS_FUNCTION: Final = "apply_fitness"  #:
+    FITNESS_BATCH: Final = "apply_fitness_batch"  #:
     HEIGHT_KEY: Final = "height"  #:
 
 
@@ -131,6 +132,29 @@ def ind_to_string(ind: List[Tree]) -> str:
     return ''.join([prim.name for prim in ind])
 
 
+def compile_tree(tree: Tree, pset: PrimitiveSetTyped) -> OWLClassExpression:
+    """Compile a tree to its class expression like gp.compile, without rendering the tree as Python code and
+    evaluating it
+
+    Args:
+        tree: the tree to compile
+        pset: the primitive set of the tree, which has no arguments
+
+    Returns:
+        the class expression of the tree
+    """
+    context = pset.context
+    stack = []
+    # the arguments of a primitive are on top of the stack when the tree is walked in reverse prefix order
+    for node in reversed(tree):
+        if node.arity == 0:
+            stack.append(context[node.value] if node.conv_fct is str else node.value)
+        else:
+            args = [stack.pop() for _ in range(node.arity)]
+            stack.append(context[node.name](*args))
+    return stack.pop()
+
+
 # TODO: Ugly hack for now
 def owlliteral_to_primitive_string(lit: OWLLiteral, pe: Optional[Union[OWLDataProperty, OWLObjectProperty]] = None) \
         -> str:
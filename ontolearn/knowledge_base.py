@@ -1,12 +1,14 @@
 import logging
+import os
 import random
+import weakref
 from functools import singledispatchmethod
-from typing import Iterable, Optional, Callable, overload, Union, FrozenSet
+from typing import Dict, Iterable, List, Optional, Callable, overload, Union, FrozenSet
 
 from owlapy.model import OWLOntologyManager, OWLOntology, OWLReasoner, OWLClassExpression, OWLNamedIndividual, \
-    OWLObjectProperty, OWLClass, OWLDataProperty, IRI
+    OWLObjectProperty, OWLClass, OWLDataProperty, IRI, OWLIndividualAxiom
 from owlapy.render import DLSyntaxObjectRenderer
-from owlapy.util import iter_count, LRUCache
+from owlapy.util import iter_count, SignatureLRUCache, class_expression_signature
 from .abstracts import AbstractKnowledgeBase, AbstractScorer, EncodedLearningProblem, AbstractLearningProblem
 from .concept_generator import ConceptGenerator
 from .core.owl.utils import OWLClassExpressionLengthMetric
@@ -57,9 +59,13 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         length_metric_factory: see `length_metric`
         length_metric: length metric that is used in calculation of class expresion lengths
         individuals_cache_size: how many individuals of class expressions to cache
+        index_path: file with a snapshot of the instance checker caches (see
+            `OWLReasoner_FastInstanceChecker.save_index`). It is loaded if it matches the ontology, otherwise all
+            classes and properties are cached and the snapshot is written to this file
+        hash_consing: whether the generated class expressions are interned (see `ConceptGenerator`)
     """
     __slots__ = '_manager', '_ontology', '_reasoner', '_length_metric', \
-                '_ind_set', '_ind_cache', 'path', 'use_individuals_cache'
+                '_ind_set', '_ind_cache', '_shared_ind_caches', 'path', 'use_individuals_cache'
 
     _manager: OWLOntologyManager
     _ontology: OWLOntology
@@ -68,7 +74,10 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
     _length_metric: OWLClassExpressionLengthMetric
 
     _ind_set: FrozenSet[OWLNamedIndividual]
-    _ind_cache: LRUCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]  # class expression => individuals
+    # class expression => individuals, indexed by the entities used in the class expression
+    _ind_cache: SignatureLRUCache[FrozenSet[OWLNamedIndividual]]
+    # the individuals caches of all knowledge bases that share the reasoner, see ignore_and_copy
+    _shared_ind_caches: 'weakref.WeakSet[SignatureLRUCache[FrozenSet[OWLNamedIndividual]]]'
 
     path: str
     use_individuals_cache: bool
@@ -80,7 +89,9 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
                  length_metric: Optional[OWLClassExpressionLengthMetric] = None,
                  length_metric_factory: Optional[Factory[[], OWLClassExpressionLengthMetric]] = None,
                  individuals_cache_size=128,
-                 backend_store: bool = False):
+                 backend_store: bool = False,
+                 index_path: Optional[str] = None,
+                 hash_consing: bool = False):
         ...
 
     @overload
@@ -89,7 +100,9 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
                  reasoner: OWLReasoner,
                  length_metric: Optional[OWLClassExpressionLengthMetric] = None,
                  length_metric_factory: Optional[Factory[[], OWLClassExpressionLengthMetric]] = None,
-                 individuals_cache_size=128):
+                 individuals_cache_size=128,
+                 index_path: Optional[str] = None,
+                 hash_consing: bool = False):
         ...
 
     def __init__(self, *,
@@ -104,7 +117,9 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
                  length_metric: Optional[OWLClassExpressionLengthMetric] = None,
 
                  individuals_cache_size=128,
-                 backend_store: bool = False):
+                 backend_store: bool = False,
+                 index_path: Optional[str] = None,
+                 hash_consing: bool = False):
         AbstractKnowledgeBase.__init__(self)
         self.path = path
         if ontology is not None:
@@ -144,9 +159,14 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         else:
             self._length_metric = _Default_ClassExpressionLengthMetricFactory()
 
-        ConceptGenerator.__init__(self, reasoner=self._reasoner)
+        ConceptGenerator.__init__(self, reasoner=self._reasoner, hash_consing=hash_consing)
 
         from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        if index_path is not None:
+            if not isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
+                raise TypeError("index_path requires OWLReasoner_FastInstanceChecker as reasoner")
+            self._load_index(index_path)
+
         if isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
             self._ind_set = self._reasoner._ind_set  # performance hack
         else:
@@ -154,11 +174,22 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
             self._ind_set = frozenset(individuals)
 
         self.use_individuals_cache = individuals_cache_size > 0
+        self._shared_ind_caches = weakref.WeakSet()
         if self.use_individuals_cache:
-            self._ind_cache = LRUCache(maxsize=individuals_cache_size)
+            self._ind_cache = SignatureLRUCache(maxsize=individuals_cache_size)
+            self._shared_ind_caches.add(self._ind_cache)
 
         self.describe()
 
+    def _load_index(self, index_path: str):
+        reasoner = self._reasoner
+        if os.path.exists(index_path) and reasoner.load_index(index_path):
+            logger.debug("Loaded index from %s", index_path)
+            return
+        reasoner.materialise()
+        reasoner.save_index(index_path)
+        logger.debug("Saved index to %s", index_path)
+
     def ontology(self) -> OWLOntology:
         """Root Ontology loaded in this knowledge base
 
@@ -175,6 +206,14 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         """
         return self._reasoner
 
+    def length_metric(self) -> OWLClassExpressionLengthMetric:
+        """Length metric of the class expressions in this knowledge base, see `concept_len`
+
+        Returns:
+            length metric
+        """
+        return self._length_metric
+
     def ignore_and_copy(self, ignored_classes: Optional[Iterable[OWLClass]] = None,
                         ignored_object_properties: Optional[Iterable[OWLObjectProperty]] = None,
                         ignored_data_properties: Optional[Iterable[OWLDataProperty]] = None) -> 'KnowledgeBase':
@@ -198,9 +237,15 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         new._ind_set = self._ind_set
         new.path = self.path
         new.use_individuals_cache = self.use_individuals_cache
+        new._shared_ind_caches = self._shared_ind_caches
 
-        if self.use_individuals_cache:
-            new._ind_cache = LRUCache(maxsize=self._ind_cache.maxsize)
+        ignored_entities = set()
+        if ignored_object_properties is not None:
+            ignored_object_properties = list(ignored_object_properties)
+            ignored_entities.update(ignored_object_properties)
+        if ignored_data_properties is not None:
+            ignored_data_properties = list(ignored_data_properties)
+            ignored_entities.update(ignored_data_properties)
 
         if ignored_classes is not None:
             owl_concepts_to_ignore = set()
@@ -215,9 +260,20 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
                 r = DLSyntaxObjectRenderer()
                 logger.info('Concepts to ignore: {0}'.format(' '.join(map(r.render, owl_concepts_to_ignore))))
             class_hierarchy = self._class_hierarchy.restrict_and_copy(remove=owl_concepts_to_ignore)
+            ignored_entities.update(owl_concepts_to_ignore)
         else:
             class_hierarchy = self._class_hierarchy
 
+        if self.use_individuals_cache:
+            # the instances do not depend on the hierarchies, so the copy starts with the entries of this knowledge
+            # base that do not use an ignored entity. assertion updates through either of them invalidate the affected
+            # entries of both caches
+            new._ind_cache = SignatureLRUCache(maxsize=self._ind_cache.maxsize)
+            for ce, inds in self._ind_cache.items():
+                if ignored_entities.isdisjoint(class_expression_signature(ce)):
+                    new._ind_cache[ce] = inds
+            self._shared_ind_caches.add(new._ind_cache)
+
         if ignored_object_properties is not None:
             object_property_hierarchy = self._object_property_hierarchy.restrict_and_copy(
                 remove=ignored_object_properties)
@@ -233,7 +289,8 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
                                   reasoner=self._reasoner,
                                   class_hierarchy=class_hierarchy,
                                   object_property_hierarchy=object_property_hierarchy,
-                                  data_property_hierarchy=data_property_hierarchy)
+                                  data_property_hierarchy=data_property_hierarchy,
+                                  hash_consing=self._hash_consing)
 
         return new
 
@@ -255,6 +312,48 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         if self.use_individuals_cache:
             self._ind_cache.cache_clear()
 
+    def add_assertions(self, assertions: Iterable[OWLIndividualAxiom]):
+        """Add class and property assertions to the ontology. The cached instances are updated instead of reset, so
+        that learning can continue with warm caches
+
+        Args:
+            assertions: class, object property and data property assertions to add
+        """
+        assertions = list(assertions)
+        for axiom in assertions:
+            self._manager.add_axiom(self._ontology, axiom)
+        self._update_assertions(added=assertions)
+
+    def remove_assertions(self, assertions: Iterable[OWLIndividualAxiom]):
+        """Remove class and property assertions from the ontology. The cached instances are updated instead of reset,
+        so that learning can continue with warm caches
+
+        Args:
+            assertions: class, object property and data property assertions to remove
+        """
+        assertions = list(assertions)
+        for axiom in assertions:
+            self._manager.remove_axiom(self._ontology, axiom)
+        self._update_assertions(removed=assertions)
+
+    def _update_assertions(self, added: Iterable[OWLIndividualAxiom] = (),
+                           removed: Iterable[OWLIndividualAxiom] = ()):
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        if isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
+            changed = self._reasoner.update_assertions(added=added, removed=removed)
+            self._ind_set = self._reasoner._ind_set  # performance hack
+        else:
+            self._reasoner.flush()
+            changed = None
+            self._ind_set = frozenset(self._ontology.individuals_in_signature())
+
+        # the reasoner and the ontology are shared with the copies of this knowledge base
+        for cache in list(self._shared_ind_caches):
+            if changed is None:
+                cache.cache_clear()
+            else:
+                cache.discard_dependents(changed)
+
     def _cache_individuals(self, ce: OWLClassExpression) -> None:
         if not self.use_individuals_cache:
             raise TypeError
@@ -329,6 +428,26 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         else:
             return frozenset(arg)
 
+    def individuals_set_given(self, concept: OWLClassExpression,
+                              known: Dict[OWLClassExpression, FrozenSet[OWLNamedIndividual]]) \
+            -> FrozenSet[OWLNamedIndividual]:
+        """Individuals of a class expression, where the individuals of some of its subexpressions are already known
+
+        The known individuals are only reused by the fast instance checker, with other reasoners this is the same as
+        individuals_set. The result is not stored in the individuals cache.
+
+        Args:
+            concept: class expression
+            known: individuals of subexpressions of concept, as returned by this method
+
+        Returns:
+            individuals of concept
+        """
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        if isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
+            return self._reasoner._find_instances_given(concept, known)  # performance hack
+        return self.individuals_set(concept)
+
     def all_individuals_set(self):
         if self._ind_set is not None:
             return self._ind_set
@@ -380,11 +499,18 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         if lp.neg:
             assert len(kb_neg) == len(lp.neg)
 
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        if isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
+            index = self._reasoner._ind_index  # performance hack, None if the reasoner does not use bitsets
+        else:
+            index = None
+
         return EncodedPosNegLPStandard(
             kb_pos=kb_pos,
             kb_neg=kb_neg,
             kb_all=kb_all,
-            kb_diff=kb_all.difference(kb_pos.union(kb_neg)))
+            kb_diff=kb_all.difference(kb_pos.union(kb_neg)),
+            index=index)
 
     def evaluate_concept(self, concept: OWLClassExpression, quality_func: AbstractScorer,
                          encoded_learning_problem: EncodedLearningProblem) -> EvaluatedConcept:
@@ -394,6 +520,43 @@ class KnowledgeBase(AbstractKnowledgeBase, ConceptGenerator):
         _, e.q = quality_func.score_elp(e.inds, encoded_learning_problem)
         return e
 
+    def evaluate_concepts(self, concepts: Iterable[OWLClassExpression], quality_func: AbstractScorer,
+                          encoded_learning_problem: EncodedLearningProblem) -> List[EvaluatedConcept]:
+        """Evaluate a batch of concepts, the subexpressions they share are only retrieved once
+
+        Args:
+            concepts: the concepts to evaluate
+            quality_func: quality measure
+            encoded_learning_problem: the encoded learning problem
+
+        Returns:
+            the evaluated concepts, in the order of concepts
+        """
+        concepts = list(concepts)
+        result = []
+        for concept, inds in zip(concepts, self._individuals_sets(concepts)):
+            e = EvaluatedConcept()
+            e.inds = inds
+            e.ic = len(inds)
+            _, e.q = quality_func.score_elp(inds, encoded_learning_problem)
+            result.append(e)
+        return result
+
+    def _individuals_sets(self, concepts: List[OWLClassExpression]) -> List[FrozenSet[OWLNamedIndividual]]:
+        from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+        if not isinstance(self._reasoner, OWLReasoner_FastInstanceChecker):
+            return [self.individuals_set(concept) for concept in concepts]
+        if not self.use_individuals_cache:
+            return [frozenset(inds) for inds in self._reasoner._find_instances_many(concepts)]  # performance hack
+        found = dict()
+        for concept in concepts:
+            if concept not in found and concept in self._ind_cache:
+                found[concept] = self._ind_cache[concept]
+        missing = [concept for concept in dict.fromkeys(concepts) if concept not in found]
+        for concept, inds in zip(missing, self._reasoner._find_instances_many(missing)):  # performance hack
+            self._ind_cache[concept] = found[concept] = inds
+        return [found[concept] for concept in concepts]
+
     async def evaluate_concept_async(self, concept: OWLClassExpression, quality_func: AbstractScorer,
                                      encoded_learning_problem: EncodedLearningProblem) -> EvaluatedConcept:
         raise NotImplementedError
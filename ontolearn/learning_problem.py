@@ -1,27 +1,57 @@
 import logging
-from typing import Set, Optional, TYPE_CHECKING
+from typing import Set, Optional, Tuple, TYPE_CHECKING
 
 if TYPE_CHECKING:
     from ontolearn import KnowledgeBase
 from ontolearn.abstracts import AbstractLearningProblem, EncodedLearningProblem, EncodedPosNegLPStandardKind
+from owlapy.abox_index import IndividualBitSet, IndividualIndex, popcount
 from owlapy.model import OWLNamedIndividual
 
 logger = logging.getLogger(__name__)
 
 
 class EncodedPosNegLPStandard(EncodedPosNegLPStandardKind):
-    __slots__ = 'kb_pos', 'kb_neg', 'kb_diff', 'kb_all'
+    __slots__ = 'kb_pos', 'kb_neg', 'kb_diff', 'kb_all', '_index', '_pos_bits', '_neg_bits'
 
     kb_pos: set
     kb_neg: set
     kb_diff: set
     kb_all: set
+    _index: Optional[IndividualIndex]  # index of the instances that are retrieved as bitsets, if it knows all examples
+    _pos_bits: int  # kb_pos as bitset of _index
+    _neg_bits: int  # kb_neg as bitset of _index
 
-    def __init__(self, kb_pos, kb_neg, kb_diff, kb_all):
+    def __init__(self, kb_pos, kb_neg, kb_diff, kb_all, index: Optional[IndividualIndex] = None):
         self.kb_pos = kb_pos
         self.kb_neg = kb_neg
         self.kb_diff = kb_diff
         self.kb_all = kb_all
+        self._index = None
+        if index is not None:
+            # the index is shared with the reasoner, examples that it does not know are not interned
+            pos_bits, pos_unknown = index.bits_of(kb_pos)
+            neg_bits, neg_unknown = index.bits_of(kb_neg)
+            if pos_unknown or neg_unknown:
+                logger.debug("Not all examples are individuals of the index, counting them on sets")
+            else:
+                self._index = index
+                self._pos_bits = pos_bits
+                self._neg_bits = neg_bits
+
+    def coverage(self, instances) -> Tuple[int, int]:
+        """Count the positive and negative examples among a set of instances. Bitsets of the individual index of this
+        learning problem are counted with two AND-popcounts, without creating any set
+
+        Args:
+            instances: set of individuals
+
+        Returns:
+            number of true positives and number of false positives
+        """
+        if self._index is not None and isinstance(instances, IndividualBitSet) and instances.index is self._index:
+            bits = instances.bits
+            return popcount(bits & self._pos_bits), popcount(bits & self._neg_bits)
+        return len(self.kb_pos.intersection(instances)), len(self.kb_neg.intersection(instances))
 
 
 class PosNegLPStandard(AbstractLearningProblem):
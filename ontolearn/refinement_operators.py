@@ -1,8 +1,11 @@
+from bisect import bisect_right
 from collections import defaultdict
 import copy
+from functools import reduce
+import operator
 from itertools import chain, tee
 import random
-from typing import DefaultDict, Dict, Set, Optional, Iterable, List, Type, Final, Generator
+from typing import DefaultDict, Dict, FrozenSet, Set, Optional, Iterable, List, Tuple, Type, Final, Generator
 from ontolearn.value_splitter import AbstractValueSplitter, BinningValueSplitter
 from owlapy.model.providers import OWLDatatypeMaxInclusiveRestriction, OWLDatatypeMinInclusiveRestriction
 from owlapy.vocab import OWLFacet
@@ -13,8 +16,12 @@ from owlapy.model import OWLObjectPropertyExpression, OWLObjectSomeValuesFrom, O
     OWLObjectIntersectionOf, OWLClassExpression, OWLNothing, OWLThing, OWLNaryBooleanClassExpression, \
     OWLObjectUnionOf, OWLClass, OWLObjectComplementOf, OWLObjectMaxCardinality, OWLObjectMinCardinality, \
     OWLDataSomeValuesFrom, OWLDatatypeRestriction, OWLLiteral, OWLObjectInverseOf, OWLDataProperty, \
-    OWLDataHasValue, OWLDataPropertyExpression
+    OWLDataHasValue, OWLDataPropertyExpression, OWLNamedIndividual
 from .search import Node, OENode
+from owlapy.abox_index import IndividualBitSet
+from owlapy.util import LRUCache
+
+_FINGERPRINT_MASK = 1023  # individuals are hashed to one of 1024 bits of the fingerprint
 
 
 class LengthBasedRefinement(BaseRefinement):
@@ -200,13 +207,48 @@ class LengthBasedRefinement(BaseRefinement):
             raise ValueError
 
 
+class _ExtensionSignature:
+    """Signature of the extension of a concept, to decide containment and disjointness of two extensions in O(1)
+    in most cases
+
+    The fingerprint of a bitset is the bitset itself, and the checks are exact. Otherwise every individual sets one
+    bit of the fingerprint, so that a set can only be a subset of (or overlap with) another set if its fingerprint is;
+    the exact check is only done if the fingerprints and the counts do not decide.
+    """
+    __slots__ = 'individuals', 'count', 'fingerprint', 'exact'
+
+    individuals: FrozenSet[OWLNamedIndividual]
+    count: int
+    fingerprint: int
+    exact: bool
+
+    def __init__(self, individuals: FrozenSet[OWLNamedIndividual]):
+        self.individuals = individuals
+        self.count = len(individuals)
+        self.exact = isinstance(individuals, IndividualBitSet)
+        if self.exact:
+            self.fingerprint = individuals.bits
+        else:
+            self.fingerprint = reduce(operator.or_, (1 << (hash(ind) & _FINGERPRINT_MASK) for ind in individuals), 0)
+
+    def is_subset(self, other: '_ExtensionSignature') -> bool:
+        if self.count > other.count or self.fingerprint & ~other.fingerprint:
+            return False
+        return self.exact or self.individuals <= other.individuals
+
+    def is_disjoint(self, other: '_ExtensionSignature') -> bool:
+        if not self.fingerprint & other.fingerprint:
+            return True
+        return not self.exact and self.individuals.isdisjoint(other.individuals)
+
+
 class ModifiedCELOERefinement(BaseRefinement[OENode]):
     """
      A top down/downward refinement operator refinement operator in SHIQ(D).
     """
     __slots__ = 'max_child_length', 'use_negation', 'use_all_constructor', 'use_inverse', 'use_card_restrictions', \
                 'max_nr_fillers', 'card_limit', 'use_numeric_datatypes', 'use_boolean_datatype', 'dp_splits', \
-                'value_splitter', 'use_time_datatypes'
+                'value_splitter', 'use_time_datatypes', '_refinement_cache'
 
     _Node: Final = OENode
 
@@ -223,6 +265,9 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
 
     max_nr_fillers: DefaultDict[OWLObjectPropertyExpression, int]
     dp_splits: Dict[OWLDataPropertyExpression, List[OWLLiteral]]
+    # (atomic concept, max_length, current_domain) => refinements, combinations of the refinements
+    _refinement_cache: LRUCache[Tuple[OWLClass, int, OWLClassExpression],
+                                Tuple[Tuple[OWLClassExpression, ...], Tuple[OWLClassExpression, ...]]]
 
     def __init__(self,
                  knowledge_base: KnowledgeBase,
@@ -235,7 +280,14 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
                  use_numeric_datatypes: bool = True,
                  use_time_datatypes: bool = True,
                  use_boolean_datatype: bool = True,
-                 card_limit: int = 10):
+                 card_limit: int = 10,
+                 refinement_cache_size: int = 1024):
+        """Create a new CELOE refinement operator
+
+        Args:
+            refinement_cache_size: number of (atomic concept, max_length, current_domain) refinements to memoise.
+                the memo is not invalidated by changes to the assertions of the knowledge base
+        """
         # self.topRefinementsCumulative = dict()
         # self.topRefinementsLength = 0
         # self.combos = dict()
@@ -251,6 +303,7 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
         self.use_time_datatypes = use_time_datatypes
         self.use_boolean_datatype = use_boolean_datatype
         self.card_limit = card_limit
+        self._refinement_cache = LRUCache(maxsize=refinement_cache_size)
 
         super().__init__(knowledge_base)
         self.__setup()
@@ -345,6 +398,27 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
         if current_domain is None:
             current_domain = OWLThing
 
+        key = ce, max_length, current_domain
+        if key in self._refinement_cache:
+            refs, combinations = self._refinement_cache[key]
+        else:
+            refs = tuple(self._atomic_refinements(ce, max_length, current_domain))
+            previous_key = ce, max_length - 1, current_domain
+            if previous_key in self._refinement_cache:
+                # the learner raised the maximum length, only compute the new combinations
+                previous_refs, previous_combinations = self._refinement_cache[previous_key]
+                combinations = previous_combinations + tuple(self._combinations(refs, max_length, previous_refs,
+                                                                                 max_length - 1))
+            else:
+                combinations = tuple(self._combinations(refs, max_length))
+            self._refinement_cache[key] = refs, combinations
+        yield from refs
+        yield from combinations
+
+    def _atomic_refinements(self, ce: OWLClass, max_length: int, current_domain: OWLClassExpression) \
+            -> Iterable[OWLClassExpression]:
+        """The refinements of an atomic concept, without the unions and intersections of them, see
+        `refine_atomic_concept`"""
         iter_container: List[Iterable[OWLClassExpression]] = []
         # (1) Generate all_sub_concepts. Note that originally CELOE obtains only direct subconcepts
         iter_container.append(self.kb.get_direct_sub_concepts(ce))
@@ -400,46 +474,68 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
             iter_container.append(card_res)
 
         # a, b = tee(chain.from_iterable(iter_container))
-        refs = []
-        for i in chain.from_iterable(iter_container):
-            yield i
-            refs.append(i)
+        return chain.from_iterable(iter_container)
 
-        # Compute all possible combinations of the disjunction and conjunctions.
-        mem = set()
-        for i in refs:
-            # assert i is not None
-            # yield i
-            i_inds = None
-            for j in refs:
-                # assert j is not None
-                if (i, j) in mem or i == j:
-                    continue
-                mem.add((j, i))
-                mem.add((i, j))
-                length = self.len(i) + self.len(j) + 1
-
-                if (max_length >= length) and (self.max_child_length >= length + 1):
-                    if not i.is_owl_thing() and not j.is_owl_thing():
-                        # TODO: remove individuals_set calls
-                        if i_inds is None:
-                            i_inds = self.kb.individuals_set(i)
-                        j_inds = self.kb.individuals_set(j)
-                        if not j_inds.difference(i_inds):
-                            # already contained
-                            continue
-                        else:
-                            yield self.kb.union((i, j))
-                        # if self.kb.individuals_count(temp_union) < self.kb.individuals_count():
-                        #     yield temp_union
+    def _combinations(self, refs: Iterable[OWLClassExpression], max_length: int,
+                      known_refs: Iterable[OWLClassExpression] = (), known_max_length: int = 0) \
+            -> Iterable[OWLClassExpression]:
+        """Compute all possible combinations of the disjunction and conjunctions
 
-                        if not j_inds.intersection(i_inds):
-                            # empty
-                            continue
-                        else:
-                            yield self.kb.intersection((i, j))
-                        # temp_intersection = self.kb.intersection((i, j))
-                        # if self.kb.individuals_count(temp_intersection) > 0:
+        Only the pairs that are short enough are visited. A union is skipped if the second refinement is contained in
+        the first, and an intersection if they are disjoint. Most pairs are decided on the signatures of their
+        extensions, see `_ExtensionSignature`.
+
+        Args:
+            refs: the refinements of an atomic concept
+            max_length: maximum length of the combinations
+            known_refs: refinements whose combinations up to known_max_length were already computed
+            known_max_length: maximum length of the known combinations
+
+        Returns:
+            the unions and intersections of the pairs of refs
+        """
+        known_refs = frozenset(known_refs)
+        refs = [i for i in dict.fromkeys(refs) if not i.is_owl_thing()]
+        lengths = [self.len(i) for i in refs]
+        known = [i in known_refs for i in refs]
+        max_length = min(max_length, self.max_child_length - 1)
+        # positions of the refinements by their length
+        positions_by_length: DefaultDict[int, List[int]] = defaultdict(list)
+        for a, length in enumerate(lengths):
+            positions_by_length[length].append(a)
+
+        signatures: Dict[int, _ExtensionSignature] = dict()
+        metric = self.kb.length_metric()
+
+        def signature(pos: int) -> _ExtensionSignature:
+            sig = signatures.get(pos)
+            if sig is None:
+                sig = signatures[pos] = _ExtensionSignature(self.kb.individuals_set(refs[pos]))
+            return sig
+
+        for a, i in enumerate(refs):
+            for j_length, positions in positions_by_length.items():
+                length = lengths[a] + j_length + 1
+                if length > max_length:
+                    continue
+                # every pair is visited once, with the refinement that comes first as i
+                for b in positions[bisect_right(positions, a):]:
+                    if known_max_length >= length and known[a] and known[b]:
+                        continue
+                    sig_i, sig_j = signature(a), signature(b)
+                    if sig_j.is_subset(sig_i):
+                        # already contained
+                        continue
+                    j = refs[b]
+                    union = self.kb.union((i, j))
+                    metric.nary_length(union, (lengths[a], j_length))
+                    yield union
+                    if sig_i.is_disjoint(sig_j):
+                        # empty
+                        continue
+                    intersection = self.kb.intersection((i, j))
+                    metric.nary_length(intersection, (lengths[a], j_length))
+                    yield intersection
 
     def refine_complement_of(self, ce: OWLObjectComplementOf) -> Iterable[OWLClassExpression]:
         assert isinstance(ce, OWLObjectComplementOf)
@@ -457,9 +553,12 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
 
         # rule 1: EXISTS r.D = > EXISTS r.E
         domain = self._get_current_domain(ce.get_property())
+        metric = self.kb.length_metric()
         for i in self.refine(ce.get_filler(), max_length=max_length - 2, current_domain=domain):
             if i is not None:
-                yield self.kb.existential_restriction(i, ce.get_property())
+                ref = self.kb.existential_restriction(i, ce.get_property())
+                metric.restriction_length(ref, self.len(i))
+                yield ref
 
         for more_special_op in self.kb.object_property_hierarchy(). \
                 more_special_roles(ce.get_property().get_named_property()):
@@ -480,9 +579,12 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
         if self.use_all_constructor:
             # rule 1: Forall r.D = > Forall r.E
             domain = self._get_current_domain(ce.get_property())
+            metric = self.kb.length_metric()
             for i in self.refine(ce.get_filler(), max_length=max_length - 2, current_domain=domain):
                 if i is not None:
-                    yield self.kb.universal_restriction(i, ce.get_property())
+                    ref = self.kb.universal_restriction(i, ce.get_property())
+                    metric.restriction_length(ref, self.len(i))
+                    yield ref
             # if not concept.get_filler().is_owl_nothing() and concept.get_filler().isatomic and (len(refs) == 0):
             #    # TODO find a way to include nothing concept
             #    refs.update(self.kb.universal_restriction(i, concept.get_property()))
@@ -535,16 +637,19 @@ class ModifiedCELOERefinement(BaseRefinement[OENode]):
         """
         assert isinstance(ce, OWLObjectUnionOf)
 
+        metric = self.kb.length_metric()
         operands: List[OWLClassExpression] = list(ce.operands())
         for i in range(len(operands)):
             concept_left, concept, concept_right = operands[:i], operands[i], operands[i + 1:]
             concept_length = self.len(concept)
+            # length of the union of the other operands
+            rest_length = self.len(ce) - concept_length - metric.object_union_length
 
             for ref_concept in self.refine(concept,
                                            max_length=max_length - self.len(ce) + concept_length,
                                            current_domain=current_domain):
                 union = self.kb.union(concept_left + [ref_concept] + concept_right)
-                if max_length >= self.len(union):
+                if max_length >= metric.nary_length(union, (rest_length, self.len(ref_concept))):
                     yield union
 
     def refine_object_intersection_of(self, ce: OWLObjectIntersectionOf, max_length: int,
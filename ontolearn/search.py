@@ -2,8 +2,7 @@ import weakref
 from _weakref import ReferenceType
 from abc import abstractmethod, ABCMeta
 from functools import total_ordering
-from queue import PriorityQueue
-from typing import List, Optional, ClassVar, Final, Iterable, TypeVar, Generic, Set, Tuple, Dict
+from typing import Any, Callable, List, Optional, ClassVar, Final, Iterable, Iterator, TypeVar, Generic, Set, Dict
 
 from owlapy.io import OWLObjectRenderer
 from owlapy.model import OWLClassExpression
@@ -14,6 +13,7 @@ from .abstracts import AbstractNode, AbstractHeuristic, AbstractScorer, Abstract
     AbstractConceptNode, EncodedLearningProblem, DRILLAbstractTree
 
 _N = TypeVar('_N')  #:
+_T = TypeVar('_T')  #:
 
 
 # Due to a bug in Python, we cannot use the slots like we should be able to. Hence, the attribute access is also
@@ -475,6 +475,169 @@ def _node_and_all_children(n: _N) -> Iterable[_N]:
         yield from _node_and_all_children(c)
 
 
+class IndexedHeap(Generic[_T]):
+    """Binary heap of distinct items which knows the position of every item, so that an item can be re-prioritised
+    in place or removed in O(log n)
+
+    The priority of an item is computed with the key function when the item is added or updated, changes to the item
+    in between do not affect the heap. The item with the smallest key is on top, or the greatest if reverse is set.
+    Items are compared by hash and equality. Meant for a single-threaded search, there is no locking.
+    """
+    __slots__ = '_key', '_reverse', '_keys', '_items', '_pos'
+
+    _key: Callable[[_T], Any]
+    _reverse: bool
+    _keys: List[Any]
+    _items: List[_T]
+    _pos: Dict[_T, int]  # item => position in the heap
+
+    def __init__(self, key: Callable[[_T], Any], reverse: bool = False):
+        """Create a new empty heap
+
+        Args:
+            key: function that computes the priority of an item
+            reverse: whether to put the item with the greatest key on top
+        """
+        self._key = key
+        self._reverse = reverse
+        self._keys = []
+        self._items = []
+        self._pos = dict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, item) -> bool:
+        return item in self._pos
+
+    def __iter__(self) -> Iterator[_T]:
+        """Iterate over the items from the top, lazily in O(k log k) for the first k items. The heap must not be
+        changed while iterating"""
+        if not self._items:
+            return
+        frontier = IndexedHeap(key=self._keys.__getitem__, reverse=self._reverse)
+        frontier.add(0)
+        n = len(self._items)
+        while frontier:
+            i = frontier.pop()
+            yield self._items[i]
+            for c in (2 * i + 1, 2 * i + 2):
+                if c < n:
+                    frontier.add(c)
+
+    def _less(self, i: int, j: int) -> bool:
+        if self._reverse:
+            return self._keys[j] < self._keys[i]
+        return self._keys[i] < self._keys[j]
+
+    def _swap(self, i: int, j: int):
+        keys, items = self._keys, self._items
+        keys[i], keys[j] = keys[j], keys[i]
+        items[i], items[j] = items[j], items[i]
+        self._pos[items[i]] = i
+        self._pos[items[j]] = j
+
+    def _sift_up(self, i: int) -> int:
+        while i > 0:
+            parent = (i - 1) >> 1
+            if not self._less(i, parent):
+                break
+            self._swap(i, parent)
+            i = parent
+        return i
+
+    def _sift_down(self, i: int):
+        n = len(self._items)
+        while True:
+            c = 2 * i + 1
+            if c >= n:
+                break
+            if c + 1 < n and self._less(c + 1, c):
+                c += 1
+            if not self._less(c, i):
+                break
+            self._swap(i, c)
+            i = c
+
+    def _sift(self, i: int):
+        if self._sift_up(i) == i:
+            self._sift_down(i)
+
+    def add(self, item: _T):
+        """Add an item, or update its priority if it is already in the heap"""
+        i = self._pos.get(item)
+        if i is not None:
+            self._items[i] = item
+            self._keys[i] = self._key(item)
+            self._sift(i)
+            return
+        self._pos[item] = len(self._items)
+        self._items.append(item)
+        self._keys.append(self._key(item))
+        self._sift_up(len(self._items) - 1)
+
+    def update(self, item: _T):
+        """Recompute the priority of an item of the heap after it was changed
+
+        Raises:
+            KeyError: if the item is not in the heap
+        """
+        i = self._pos[item]
+        self._keys[i] = self._key(item)
+        self._sift(i)
+
+    def discard(self, item: _T):
+        """Remove an item if it is in the heap"""
+        i = self._pos.pop(item, None)
+        if i is None:
+            return
+        last_key = self._keys.pop()
+        last = self._items.pop()
+        if i < len(self._items):
+            self._keys[i] = last_key
+            self._items[i] = last
+            self._pos[last] = i
+            self._sift(i)
+
+    def peek(self) -> _T:
+        """The item on top
+
+        Raises:
+            IndexError: if the heap is empty
+        """
+        return self._items[0]
+
+    def pop(self) -> _T:
+        """Remove and return the item on top
+
+        Raises:
+            IndexError: if the heap is empty
+        """
+        item = self._items[0]
+        self.discard(item)
+        return item
+
+    def clear(self):
+        self._keys.clear()
+        self._items.clear()
+        self._pos.clear()
+
+
+def heuristic_key(node) -> Any:
+    """Key in the order of `HeuristicOrderedNode`, with the heuristic taken at the time of the call"""
+    if node.heuristic is None:
+        raise ValueError("node heuristic not calculated", node)
+    return node.heuristic, OrderedOWLObject(as_index(node.concept))
+
+
+def _negated_heuristic_key(node) -> Any:
+    return -node.heuristic, OrderedOWLObject(as_index(node.concept))
+
+
+def _negated_heuristic(node) -> float:
+    return -node.heuristic
+
+
 class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
     """
 
@@ -487,7 +650,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
     Attributes:
         quality_func: An instance of a subclass of AbstractScorer that measures the quality of a node.
         heuristic_func: An instance of a subclass of AbstractScorer that measures the promise of a node.
-        items_in_queue: An instance of PriorityQueue Class.
+        items_in_queue: An IndexedHeap of the nodes, the most promising on top.
         .nodes: A dictionary where keys are string representation of nodes and values are corresponding node objects.
         nodes: A property method for ._nodes.
         expressionTests: not being used .
@@ -497,13 +660,13 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
     quality_func: AbstractScorer
     heuristic_func: AbstractHeuristic
     nodes: Dict[OWLClassExpression, LBLNode]
-    items_in_queue: 'PriorityQueue[Tuple[float, HeuristicOrderedNode[LBLNode]]]'
+    items_in_queue: IndexedHeap[LBLNode]
 
     def __init__(self, quality_func, heuristic_func):
         self.quality_func = quality_func
         self.heuristic_func = heuristic_func
         self.nodes = dict()
-        self.items_in_queue = PriorityQueue()
+        self.items_in_queue = IndexedHeap(key=_negated_heuristic_key)  # gets the smallest one.
 
     def add(self, n: LBLNode):
         """
@@ -515,7 +678,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
         Returns:
             None
         """
-        self.items_in_queue.put((-n.heuristic, HeuristicOrderedNode(n)))  # gets the smallest one.
+        self.items_in_queue.add(n)
         self.nodes[n.concept] = n
 
     def add_root(self, node, kb_learning_problem):
@@ -523,7 +686,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
         assert not self.nodes
         self.quality_func.apply(node, node.individuals, kb_learning_problem)
         self.heuristic_func.apply(node, node.individuals, kb_learning_problem)
-        self.items_in_queue.put((-node.heuristic, HeuristicOrderedNode(node)))  # gets the smallest one.
+        self.items_in_queue.add(node)
         self.nodes[node.concept] = node
 
     def add_node(self, *, node: LBLNode, parent_node: LBLNode, kb_learning_problem: EncodedLearningProblem) \
@@ -552,7 +715,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
                 node.parent_node.remove_child(node)
                 node.parent_node = parent_node
                 parent_node.add_child(node)
-                self.items_in_queue.put((-node.heuristic, HeuristicOrderedNode(node)))  # gets the smallest one.
+                self.items_in_queue.add(node)  # updates the node if it is already queued
                 self.nodes[node.concept] = node
         else:
             # @todos reconsider it.
@@ -560,7 +723,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
             if node.quality == 0:
                 return False
             self.heuristic_func.apply(node, node.individuals, kb_learning_problem)
-            self.items_in_queue.put((-node.heuristic, HeuristicOrderedNode(node)))  # gets the smallest one.
+            self.items_in_queue.add(node)
             self.nodes[node.concept] = node
             parent_node.add_child(node)
             if node.quality == 1:
@@ -573,10 +736,10 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
         Returns:
             node: A node object
         """
-        _, most_promising_str = self.items_in_queue.get()  # get
+        most_promising_str = self.items_in_queue.peek()
         try:
-            node = self.nodes[most_promising_str.node.concept]
-            self.items_in_queue.put((-node.heuristic, HeuristicOrderedNode(node)))  # put again into queue.
+            node = self.nodes[most_promising_str.concept]
+            self.items_in_queue.add(node)  # re-prioritise, the node stays in the queue.
             return node
         except KeyError:
             print(most_promising_str, 'is not found')
@@ -605,7 +768,7 @@ class SearchTreePriorityQueue(LBLSearchTree[LBLNode]):
         return top_n_predictions
 
     def clean(self):
-        self.items_in_queue = PriorityQueue()
+        self.items_in_queue.clear()
         self.nodes.clear()
 
     def show_search_tree(self, root_concept: OWLClassExpression, heading_step: str):
@@ -660,16 +823,18 @@ class DRILLSearchTreePriorityQueue(DRILLAbstractTree):
     ----------
     quality_func : An instance of a subclass of AbstractScorer that measures the quality of a node.
     heuristic_func : An instance of a subclass of AbstractScorer that measures the promise of a node.
-    items_in_queue: An instance of PriorityQueue Class.
+    items_in_queue: An IndexedHeap of the nodes, the most promising on top.
     .nodes: A dictionary where keys are string representation of nodes and values are corresponding node objects.
     nodes: A property method for ._nodes.
     expressionTests: not being used .
     str_to_obj_instance_mapping: not being used.
     """
 
+    items_in_queue: IndexedHeap[RL_State]
+
     def __init__(self):
         super().__init__()
-        self.items_in_queue = PriorityQueue()
+        self.items_in_queue = IndexedHeap(key=_negated_heuristic)  # gets the smallest one.
 
     def add(self, node: RL_State):
         """
@@ -683,7 +848,7 @@ class DRILLSearchTreePriorityQueue(DRILLAbstractTree):
         """
         assert node.quality > 0
         assert node.heuristic is not None
-        self.items_in_queue.put((-node.heuristic, node))  # gets the smallest one.
+        self.items_in_queue.add(node)  # updates the node if it is already queued
         self.nodes[node] = node
 
     def get_most_promising(self) -> Node:
@@ -694,7 +859,7 @@ class DRILLSearchTreePriorityQueue(DRILLAbstractTree):
         -------
         node: A node object
         """
-        _, most_promising_str = self.items_in_queue.get()  # get
+        most_promising_str = self.items_in_queue.pop()
         try:
             node = self.nodes[most_promising_str]
             # We do not need to put the node again into the queue.
@@ -730,5 +895,5 @@ class DRILLSearchTreePriorityQueue(DRILLAbstractTree):
         return top_n_predictions
 
     def clean(self):
-        self.items_in_queue = PriorityQueue()
+        self.items_in_queue.clear()
         self._nodes.clear()
@@ -5,13 +5,13 @@ from datetime import date, datetime
 from functools import total_ordering
 from itertools import chain
 from pandas import Timedelta
-from scipy.stats import entropy
-from sortedcontainers import SortedDict
+from scipy.special import entr
 from typing import Dict, List, Optional, Set, Tuple, Union
 
 from owlapy.model import OWLDataProperty, OWLLiteral, OWLNamedIndividual, OWLReasoner
 
 import math
+import numpy as np
 
 
 Values = Union[OWLLiteral, int, float, bool, Timedelta, datetime, date]  #:
@@ -103,12 +103,47 @@ class IndividualValues:
                                 {ind: v for ind, v in self.neg_map.items() if ind in split.neg})
 
 
+@dataclass
+class SortedIndividualValues:
+    """The values of the positive and negative individuals, each sorted once by value
+
+    The individuals are given by their name and by their position in the positive or negative examples. Individuals
+    with equal values keep the order of the value maps.
+    """
+    pos_names: np.ndarray
+    pos_ids: np.ndarray
+    pos_values: np.ndarray
+    neg_names: np.ndarray
+    neg_ids: np.ndarray
+    neg_values: np.ndarray
+
+    @staticmethod
+    def create(values: IndividualValues, pos_index: Dict[str, int], neg_index: Dict[str, int]) \
+            -> 'SortedIndividualValues':
+        pos_values = values.get_pos_values()
+        neg_values = values.get_neg_values()
+        # numeric arrays only if they compare and combine like the python values
+        types = set(map(type, chain(pos_values, neg_values)))
+        dtype = types.pop() if types == {int} or types == {float} else object
+        pos_values = np.array(pos_values, dtype=dtype)
+        neg_values = np.array(neg_values, dtype=dtype)
+        pos_order = np.argsort(pos_values, kind='stable')
+        neg_order = np.argsort(neg_values, kind='stable')
+        pos_names = np.array(list(values.pos_map), dtype=object)
+        neg_names = np.array(list(values.neg_map), dtype=object)
+        pos_ids = np.fromiter(map(pos_index.__getitem__, values.pos_map), dtype=np.intp, count=len(values.pos_map))
+        neg_ids = np.fromiter(map(neg_index.__getitem__, values.neg_map), dtype=np.intp, count=len(values.neg_map))
+        return SortedIndividualValues(pos_names[pos_order], pos_ids[pos_order], pos_values[pos_order],
+                                      neg_names[neg_order], neg_ids[neg_order], neg_values[neg_order])
+
+
 class EntropyValueSplitter(AbstractValueSplitter):
     """Calculate the splits depending on the entropy of the resulting sets."""
 
-    __slots__ = '_prop_to_values'
+    __slots__ = '_prop_to_values', '_prop_to_sorted_values'
 
     _prop_to_values: Dict[OWLDataProperty, IndividualValues]
+    _prop_to_sorted_values: Dict[OWLDataProperty, SortedIndividualValues]
 
     def __init__(self, max_nr_splits: int = 2):
         super().__init__(max_nr_splits)
@@ -119,22 +154,29 @@ class EntropyValueSplitter(AbstractValueSplitter):
         assert pos is not None
         assert neg is not None
 
+        pos_str = [p.get_iri().get_remainder() for p in pos]
+        neg_str = [n.get_iri().get_remainder() for n in neg]
+        pos_index = {ind: i for i, ind in enumerate(pos_str)}
+        neg_index = {ind: i for i, ind in enumerate(neg_str)}
+
         dp_splits: Dict[OWLDataProperty, List[OWLLiteral]] = {}
         self._prop_to_values = {}
+        self._prop_to_sorted_values = {}
         for property_ in properties:
             dp_splits[property_] = []
-            self._prop_to_values[property_] = IndividualValues(self._get_values_for_inds(reasoner, property_, pos),
-                                                               self._get_values_for_inds(reasoner, property_, neg))
+            values = IndividualValues(self._get_values_for_inds(reasoner, property_, pos),
+                                      self._get_values_for_inds(reasoner, property_, neg))
+            self._prop_to_values[property_] = values
+            self._prop_to_sorted_values[property_] = SortedIndividualValues.create(values, pos_index, neg_index)
 
-        pos_str = [p.get_iri().get_remainder() for p in pos]
-        neg_str = [n.get_iri().get_remainder() for n in neg]
         current_splits = [Split(pos_str, neg_str, 0, set())]
         while len(properties) > 0 and len(current_splits) > 0:
             next_level_splits = []
+            split_masks = [self._get_split_masks(split, pos_index, neg_index) for split in current_splits]
             for property_ in properties[:]:
-                for split in current_splits:
+                for split, (pos_mask, neg_mask) in zip(current_splits, split_masks):
                     if property_.get_iri().get_remainder() not in split.used_properties:
-                        value, new_splits = self._compute_split_value(property_, split)
+                        value, new_splits = self._compute_split_value(property_, split, pos_mask, neg_mask)
 
                         if value is not None:
                             value = OWLLiteral(value)
@@ -149,54 +191,98 @@ class EntropyValueSplitter(AbstractValueSplitter):
 
         return dp_splits
 
-    def _compute_split_value(self, property_: OWLDataProperty, split: Split) -> Tuple[Optional[Values], List[Split]]:
-        current_values = self._prop_to_values[property_].get_overlapping_with_split(split)
-        number_of_values = len(current_values.pos_map) + len(current_values.neg_map)
+    def _compute_split_value(self, property_: OWLDataProperty, split: Split, pos_mask: np.ndarray,
+                             neg_mask: np.ndarray) -> Tuple[Optional[Values], List[Split]]:
+        """Find the value of the property that splits the individuals of split with the highest information gain
+
+        The information gain of all candidate values is computed at once from the number of positive and negative
+        individuals below every candidate value.
+
+        Args:
+            property_: the data property
+            split: the split of which to split the individuals
+            pos_mask: which positive individuals are in split, see _get_split_masks
+            neg_mask: which negative individuals are in split
+
+        Returns:
+            the split value, or None if the split has no values to split, and the splits below and above the value that
+            still contain positive and negative individuals
+        """
+        sorted_values = self._prop_to_sorted_values[property_]
+        pos_in_split = pos_mask[sorted_values.pos_ids]
+        neg_in_split = neg_mask[sorted_values.neg_ids]
+        pos_names = sorted_values.pos_names[pos_in_split]
+        neg_names = sorted_values.neg_names[neg_in_split]
+        pos_values = sorted_values.pos_values[pos_in_split]
+        neg_values = sorted_values.neg_values[neg_in_split]
+        nr_pos = len(pos_values)
+        nr_neg = len(neg_values)
+        number_of_values = nr_pos + nr_neg
 
         if number_of_values == 0:
             return None, []
-        current_entropy = entropy((len(current_values.pos_map) / number_of_values,
-                                  len(current_values.neg_map) / number_of_values))
-
-        best_gain = 0
-        best_value = None
-        best_splits = None
-        pos_inv: 'SortedDict[Values, List[str]]' = SortedDict()
-        for k, v in current_values.pos_map.items():
-            pos_inv[v] = pos_inv.get(v, []) + [k]
-        neg_inv: 'SortedDict[Values, List[str]]' = SortedDict()
-        for k, v in current_values.neg_map.items():
-            neg_inv[v] = neg_inv.get(v, []) + [k]
-
-        values = sorted(list(pos_inv.keys()) + list(neg_inv.keys()))
-        values = [self._combine_values(x, y) for x, y in zip(values, values[1:])]
+        current_entropy = self._entropies(np.array(nr_pos), np.array(nr_neg), np.array(number_of_values))
 
-        for value in values:
-            pos_below, pos_above = self._get_inds_below_above(value, pos_inv)
-            neg_below, neg_above = self._get_inds_below_above(value, neg_inv)
-            num_below = len(pos_below) + len(neg_below)
-            num_above = len(pos_above) + len(neg_above)
-
-            entropy_below = 0
-            if num_below > 0:
-                entropy_below = entropy((len(pos_below) / num_below, len(neg_below) / num_below))
-            entropy_above = 0
-            if num_above > 0:
-                entropy_above = entropy((len(pos_above) / num_above, len(neg_above) / num_above))
-            cond_entropy = ((num_below / number_of_values) * entropy_below +
-                            (num_above / number_of_values) * entropy_above)
-            gain = current_entropy - cond_entropy
-
-            if gain >= best_gain:
-                best_gain = gain
-                best_value = value
-                best_splits = []
-                if entropy_below > 0:
-                    best_splits.append(self._make_split(pos_below, neg_below, entropy_below, split, property_))
-                if entropy_above > 0:
-                    best_splits.append(self._make_split(pos_above, neg_above, entropy_above, split, property_))
-
-        return best_value, best_splits
+        # the candidate values combine the neighbours among the distinct positive and distinct negative values
+        values = np.concatenate((self._distinct(pos_values), self._distinct(neg_values)))
+        values = values[np.argsort(values, kind='stable')].tolist()
+        values = [self._combine_values(x, y) for x, y in zip(values, values[1:])]
+        if not values:
+            return None, []
+        candidates = np.array(values, dtype=pos_values.dtype if len(pos_values) else neg_values.dtype)
+
+        pos_below = np.searchsorted(pos_values, candidates, side='right')
+        neg_below = np.searchsorted(neg_values, candidates, side='right')
+        pos_above = nr_pos - pos_below
+        neg_above = nr_neg - neg_below
+        num_below = pos_below + neg_below
+        num_above = pos_above + neg_above
+
+        entropy_below = self._entropies(pos_below, neg_below, num_below)
+        entropy_above = self._entropies(pos_above, neg_above, num_above)
+        cond_entropy = ((num_below / number_of_values) * entropy_below +
+                        (num_above / number_of_values) * entropy_above)
+        gain = current_entropy - cond_entropy
+
+        # the last of the best candidates
+        best = len(gain) - 1 - int(np.argmax(gain[::-1]))
+        if gain[best] < 0:
+            return None, []
+        best_splits = []
+        if entropy_below[best] > 0:
+            best_splits.append(self._make_split(pos_names[:pos_below[best]].tolist(),
+                                                neg_names[:neg_below[best]].tolist(),
+                                                entropy_below[best], split, property_))
+        if entropy_above[best] > 0:
+            best_splits.append(self._make_split(pos_names[pos_below[best]:].tolist(),
+                                                neg_names[neg_below[best]:].tolist(),
+                                                entropy_above[best], split, property_))
+        return values[best], best_splits
+
+    @staticmethod
+    def _entropies(pos: np.ndarray, neg: np.ndarray, total: np.ndarray) -> np.ndarray:
+        """Entropies of the positive and negative fractions, 0 where there are no individuals"""
+        # same as scipy.stats.entropy on the columns, without its per call overhead
+        with np.errstate(divide='ignore', invalid='ignore'):
+            pk = np.stack((pos / total, neg / total))
+            pk = pk / np.sum(pk, axis=0)
+            return np.where(total > 0, np.sum(entr(pk), axis=0), 0)
+
+    @staticmethod
+    def _distinct(sorted_values: np.ndarray) -> np.ndarray:
+        if len(sorted_values) == 0:
+            return sorted_values
+        return sorted_values[np.concatenate(([True], sorted_values[1:] != sorted_values[:-1]))]
+
+    @staticmethod
+    def _get_split_masks(split: Split, pos_index: Dict[str, int], neg_index: Dict[str, int]) \
+            -> Tuple[np.ndarray, np.ndarray]:
+        """Which positive and negative individuals are in a split, by their position in the examples"""
+        pos_mask = np.zeros(len(pos_index), dtype=bool)
+        pos_mask[[pos_index[ind] for ind in split.pos]] = True
+        neg_mask = np.zeros(len(neg_index), dtype=bool)
+        neg_mask[[neg_index[ind] for ind in split.neg]] = True
+        return pos_mask, neg_mask
 
     def _make_split(self, pos: List[str], neg: List[str], entropy: float,
                     split: Split, property_: OWLDataProperty) -> Split:
@@ -204,13 +290,6 @@ class EntropyValueSplitter(AbstractValueSplitter):
         used_properties.add(property_.get_iri().get_remainder())
         return Split(pos, neg, entropy, used_properties)
 
-    def _get_inds_below_above(self, value: Values, ind_value_map: 'SortedDict[Values, List[str]]') \
-            -> Tuple[List[str], List[str]]:
-        idx = ind_value_map.bisect(value)
-        inds_below = list(chain.from_iterable(ind_value_map.values()[:idx]))
-        inds_above = list(chain.from_iterable(ind_value_map.values()[idx:]))
-        return inds_below, inds_above
-
     def _get_values_for_inds(self, reasoner: OWLReasoner, property_: OWLDataProperty, inds: Set[OWLNamedIndividual]) \
             -> Dict[str, Values]:
         inds_to_value = dict()
@@ -0,0 +1,705 @@
+"""Integer based index structures over the individuals of an ABox
+
+(Not part of OWLAPI)"""
+import json
+import mmap
+from collections.abc import Set as AbstractSet
+from typing import Any, Dict, Final, FrozenSet, Iterable, Iterator, List, Mapping, Optional, Tuple, Union
+
+import numpy as np
+
+from owlapy.model import OWLNamedIndividual, OWLDatatype, OWLLiteral, DoubleOWLDatatype, IntegerOWLDatatype, \
+    StringOWLDatatype, DateOWLDatatype, DateTimeOWLDatatype, DurationOWLDatatype
+from owlapy.vocab import OWLFacet
+
+try:
+    popcount = int.bit_count  # Python >= 3.10
+except AttributeError:  # pragma: no cover
+    def popcount(bits: int) -> int:
+        """Number of set bits"""
+        return bin(bits).count('1')
+
+
+class IndividualIndex:
+    """Interns named individuals to dense integer ids
+
+    Sets of individuals of the same index can then be represented as bitsets (see `IndividualBitSet`), where bit i
+    is set if the individual with id i is contained in the set.
+    """
+    __slots__ = '_individuals', '_ids', '_all'
+
+    _individuals: List[OWLNamedIndividual]
+    _ids: Dict[OWLNamedIndividual, int]
+    _all: Optional['IndividualBitSet']
+
+    def __init__(self, individuals: Iterable[OWLNamedIndividual] = ()):
+        """Create a new individual index
+
+        Args:
+            individuals: individuals to intern, ids are assigned in iteration order
+        """
+        self._individuals = []
+        self._ids = dict()
+        self._all = None
+        for ind in individuals:
+            self.add(ind)
+
+    def add(self, ind: OWLNamedIndividual) -> int:
+        """Intern an individual
+
+        Args:
+            ind: individual to intern
+
+        Returns:
+            id of the individual
+        """
+        i = self._ids.get(ind)
+        if i is None:
+            i = len(self._individuals)
+            self._individuals.append(ind)
+            self._ids[ind] = i
+            self._all = None
+        return i
+
+    def id_of(self, ind: OWLNamedIndividual) -> Optional[int]:
+        """Id of an individual, or None if it was never interned"""
+        return self._ids.get(ind)
+
+    def individual(self, i: int) -> OWLNamedIndividual:
+        """Individual with id i"""
+        return self._individuals[i]
+
+    def __len__(self) -> int:
+        return len(self._individuals)
+
+    def __contains__(self, ind: OWLNamedIndividual) -> bool:
+        return ind in self._ids
+
+    def empty(self) -> 'IndividualBitSet':
+        """The empty set of individuals"""
+        return IndividualBitSet(self, 0)
+
+    def all(self) -> 'IndividualBitSet':
+        """The set of all interned individuals"""
+        if self._all is None:
+            self._all = IndividualBitSet(self, (1 << len(self._individuals)) - 1)
+        return self._all
+
+    def ids_to_bits(self, ids: Iterable[int]) -> int:
+        """Pack individual ids into a bitset
+
+        Args:
+            ids: ids of individuals
+
+        Returns:
+            big integer with the bits of ids set
+        """
+        arr = ids if isinstance(ids, np.ndarray) else np.fromiter(ids, dtype=np.int64)
+        if len(arr) == 0:
+            return 0
+        mask = np.zeros(len(self._individuals), dtype=np.bool_)
+        mask[arr] = True
+        return self.mask_to_bits(mask)
+
+    def bits_to_ids(self, bits: int) -> np.ndarray:
+        """Unpack a bitset into the sorted array of contained ids"""
+        if not bits:
+            return np.empty(0, dtype=np.int64)
+        buf = bits.to_bytes((bits.bit_length() + 7) // 8, 'little')
+        return np.flatnonzero(np.unpackbits(np.frombuffer(buf, dtype=np.uint8), bitorder='little'))
+
+    @staticmethod
+    def mask_to_bits(mask: np.ndarray) -> int:
+        """Pack a boolean array (indexed by individual id) into a bitset"""
+        return int.from_bytes(np.packbits(mask, bitorder='little').tobytes(), 'little')
+
+    def bits_to_mask(self, bits: int, size: Optional[int] = None) -> np.ndarray:
+        """Unpack a bitset into a boolean array indexed by individual id
+
+        Args:
+            bits: the bitset
+            size: length of the array, defaults to the number of interned individuals
+
+        Returns:
+            boolean array which is True at the ids contained in bits
+        """
+        if size is None:
+            size = len(self._individuals)
+        size = max(size, bits.bit_length())
+        buf = bits.to_bytes((size + 7) // 8, 'little')
+        return np.unpackbits(np.frombuffer(buf, dtype=np.uint8), count=size, bitorder='little').view(np.bool_)
+
+    def bits_of(self, individuals: Iterable[OWLNamedIndividual]) -> Tuple[int, bool]:
+        """Encode the individuals that are known to this index as a bitset, without interning the others
+
+        Args:
+            individuals: individuals to encode
+
+        Returns:
+            bitset of the known individuals, and whether there were individuals that are not in the index
+        """
+        ids = []
+        unknown = False
+        for ind in individuals:
+            i = self._ids.get(ind)
+            if i is None:
+                unknown = True
+            else:
+                ids.append(i)
+        return self.ids_to_bits(ids), unknown
+
+    def encode(self, individuals: Iterable[OWLNamedIndividual]) -> 'IndividualBitSet':
+        """Encode individuals as a bitset of this index. Individuals that are not yet known are interned.
+
+        Args:
+            individuals: individuals to encode
+
+        Returns:
+            bitset of the individuals
+        """
+        if isinstance(individuals, IndividualBitSet) and individuals._index is self:
+            return individuals
+        return IndividualBitSet(self, self.ids_to_bits(map(self.add, individuals)))
+
+
+class IndividualBitSet(AbstractSet):
+    """Immutable set of individuals stored as a bitset over an `IndividualIndex`
+
+    The bitset behaves like a FrozenSet[OWLNamedIndividual]. Set algebra between bitsets of the same index is done
+    on the (arbitrary precision) integers, so that it works on whole machine words at once. Individuals are only
+    materialised when iterating.
+
+    Set algebra with other sets never interns individuals in the index. A result that would contain individuals which
+    are not in the index, e.g. the union with such individuals, is returned as a frozenset instead.
+    """
+    __slots__ = '_index', '_bits', '_len', '_hash'
+
+    _index: IndividualIndex
+    _bits: int
+    _len: Optional[int]
+    _hash: Optional[int]
+
+    def __init__(self, index: IndividualIndex, bits: int):
+        """Create a new bitset
+
+        Args:
+            index: index that maps the bits to individuals
+            bits: the bitset
+        """
+        self._index = index
+        self._bits = bits
+        self._len = None
+        self._hash = None
+
+    @property
+    def index(self) -> IndividualIndex:
+        return self._index
+
+    @property
+    def bits(self) -> int:
+        return self._bits
+
+    def _bits_of(self, other: Iterable[OWLNamedIndividual]) -> Tuple[int, bool]:
+        """The bits of the individuals of other that are in the index, and whether other contains individuals that are
+        not in the index"""
+        if isinstance(other, IndividualBitSet) and other._index is self._index:
+            return other._bits, False
+        return self._index.bits_of(other)
+
+    def _new(self, bits: int) -> 'IndividualBitSet':
+        return IndividualBitSet(self._index, bits)
+
+    def __len__(self) -> int:
+        if self._len is None:
+            self._len = popcount(self._bits)
+        return self._len
+
+    def __bool__(self) -> bool:
+        return self._bits != 0
+
+    def __iter__(self) -> Iterator[OWLNamedIndividual]:
+        individual = self._index.individual
+        for i in self._index.bits_to_ids(self._bits).tolist():
+            yield individual(i)
+
+    def __contains__(self, ind) -> bool:
+        i = self._index.id_of(ind)
+        return i is not None and (self._bits >> i) & 1 == 1
+
+    def __and__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.intersection(other)
+
+    __rand__ = __and__
+
+    def __or__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.union(other)
+
+    __ror__ = __or__
+
+    def __sub__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.difference(other)
+
+    def __rsub__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        bits, unknown = self._bits_of(other)
+        if unknown:
+            return frozenset(other).difference(self)
+        return self._new(bits & ~self._bits)
+
+    def __xor__(self, other):
+        if not isinstance(other, AbstractSet):
+            return NotImplemented
+        return self.symmetric_difference(other)
+
+    __rxor__ = __xor__
+
+    def __eq__(self, other):
+        if isinstance(other, IndividualBitSet) and other._index is self._index:
+            return self._bits == other._bits
+        return super().__eq__(other)
+
+    def __le__(self, other):
+        if isinstance(other, IndividualBitSet) and other._index is self._index:
+            return self._bits & ~other._bits == 0
+        return super().__le__(other)
+
+    def __ge__(self, other):
+        if isinstance(other, IndividualBitSet) and other._index is self._index:
+            return other._bits & ~self._bits == 0
+        return super().__ge__(other)
+
+    def __hash__(self):
+        # must agree with frozenset, as bitsets compare equal to frozensets with the same elements
+        if self._hash is None:
+            self._hash = hash(frozenset(self))
+        return self._hash
+
+    def __repr__(self):
+        return f'{type(self).__name__}({len(self)} individuals)'
+
+    def intersection(self, *others: Iterable[OWLNamedIndividual]) -> 'IndividualBitSet':
+        bits = self._bits
+        for other in others:
+            bits &= self._bits_of(other)[0]
+        return self._new(bits)
+
+    def union(self, *others: Iterable[OWLNamedIndividual]) \
+            -> Union['IndividualBitSet', FrozenSet[OWLNamedIndividual]]:
+        # iterators are read twice if they contain unknown individuals
+        others = [other if isinstance(other, AbstractSet) else frozenset(other) for other in others]
+        bits = self._bits
+        for other in others:
+            other_bits, unknown = self._bits_of(other)
+            if unknown:
+                return frozenset(self).union(*others)
+            bits |= other_bits
+        return self._new(bits)
+
+    def difference(self, *others: Iterable[OWLNamedIndividual]) -> 'IndividualBitSet':
+        bits = self._bits
+        for other in others:
+            bits &= ~self._bits_of(other)[0]
+        return self._new(bits)
+
+    def symmetric_difference(self, other: Iterable[OWLNamedIndividual]) \
+            -> Union['IndividualBitSet', FrozenSet[OWLNamedIndividual]]:
+        if not isinstance(other, AbstractSet):
+            other = frozenset(other)
+        bits, unknown = self._bits_of(other)
+        if unknown:
+            return frozenset(self).symmetric_difference(other)
+        return self._new(self._bits ^ bits)
+
+    def issubset(self, other: Iterable[OWLNamedIndividual]) -> bool:
+        return self._bits & ~self._bits_of(other)[0] == 0
+
+    def issuperset(self, other: Iterable[OWLNamedIndividual]) -> bool:
+        bits, unknown = self._bits_of(other)
+        return not unknown and bits & ~self._bits == 0
+
+    def isdisjoint(self, other: Iterable[OWLNamedIndividual]) -> bool:
+        return self._bits & self._bits_of(other)[0] == 0
+
+    def complement(self) -> 'IndividualBitSet':
+        """All individuals of the index which are not in this set"""
+        return self._new(self._index.all()._bits & ~self._bits)
+
+
+class CSRAdjacency:
+    """Compressed sparse row adjacency of a property over the ids of an `IndividualIndex`
+
+    The successors of the individual with id i are stored in indices[indptr[i]:indptr[i+1]] in ascending order.
+    """
+    __slots__ = 'indptr', 'indices'
+
+    indptr: np.ndarray
+    indices: np.ndarray
+
+    def __init__(self, indptr: np.ndarray, indices: np.ndarray):
+        """Create a new adjacency
+
+        Args:
+            indptr: row pointer array, of length (number of rows + 1)
+            indices: successor ids of all rows, concatenated
+        """
+        self.indptr = indptr
+        self.indices = indices
+
+    @staticmethod
+    def from_edges(n: int, subjects: Iterable[int], objects: Iterable[int]) -> 'CSRAdjacency':
+        """Build the adjacency from a list of edges. Duplicate edges are removed.
+
+        Args:
+            n: number of rows (individuals)
+            subjects: subject id of each edge
+            objects: object id of each edge
+
+        Returns:
+            the adjacency
+        """
+        s = np.asarray(subjects, dtype=np.int64)
+        o = np.asarray(objects, dtype=np.int64)
+        if n == 0:
+            return CSRAdjacency(np.zeros(1, dtype=np.int64), o)
+        keys = np.unique(s * n + o)
+        s = keys // n
+        indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(s, minlength=n), out=indptr[1:])
+        return CSRAdjacency(indptr, keys % n)
+
+    @property
+    def n_rows(self) -> int:
+        return len(self.indptr) - 1
+
+    def __len__(self) -> int:
+        """Number of edges"""
+        return len(self.indices)
+
+    def edges(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Subject ids and object ids of all edges"""
+        return np.repeat(np.arange(self.n_rows, dtype=np.int64), self.degrees()), self.indices
+
+    def transpose(self) -> 'CSRAdjacency':
+        """The adjacency of the inverse property"""
+        subjects, objects = self.edges()
+        return CSRAdjacency.from_edges(self.n_rows, objects, subjects)
+
+    def updated(self, n: int, added: Iterable[Tuple[int, int]] = (),
+                removed: Iterable[Tuple[int, int]] = ()) -> 'CSRAdjacency':
+        """A copy of the adjacency with some edges added and removed
+
+        Args:
+            n: number of rows of the copy, at least n_rows (to make room for new individuals)
+            added: (subject id, object id) of the edges to add
+            removed: (subject id, object id) of the edges to remove
+
+        Returns:
+            the updated adjacency
+        """
+        subjects, objects = self.edges()
+        removed = np.array(list(removed), dtype=np.int64).reshape(-1, 2)
+        if len(removed):
+            keep = ~np.isin(subjects * n + objects, removed[:, 0] * n + removed[:, 1])
+            subjects, objects = subjects[keep], objects[keep]
+        added = np.array(list(added), dtype=np.int64).reshape(-1, 2)
+        return CSRAdjacency.from_edges(n, np.concatenate((subjects, added[:, 0])),
+                                       np.concatenate((objects, added[:, 1])))
+
+    def degrees(self) -> np.ndarray:
+        """Number of successors of each row"""
+        return np.diff(self.indptr)
+
+    def successors(self, i: int) -> np.ndarray:
+        """Successor ids of the individual with id i"""
+        if i >= self.n_rows:
+            return self.indices[:0]
+        return self.indices[self.indptr[i]:self.indptr[i + 1]]
+
+    def successors_of_all(self, ids: np.ndarray) -> np.ndarray:
+        """Sorted ids of all individuals that are a successor of at least one of ids"""
+        ids = ids[ids < self.n_rows]
+        starts = self.indptr[ids]
+        lengths = self.indptr[ids + 1] - starts
+        total = int(lengths.sum())
+        if total == 0:
+            return self.indices[:0]
+        # positions of all elements of the selected segments, without a python loop
+        offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+        return np.unique(self.indices[offsets])
+
+    def count_in(self, mask: np.ndarray) -> np.ndarray:
+        """Count for each row the number of successors that are in a set
+
+        Args:
+            mask: boolean array indexed by id, the set to count
+
+        Returns:
+            array of counts with one entry per row
+        """
+        hits = np.zeros(len(self.indices) + 1, dtype=np.int64)
+        np.cumsum(mask[self.indices], out=hits[1:])
+        return hits[self.indptr[1:]] - hits[self.indptr[:-1]]
+
+
+class DataPropertyValueIndex:
+    """Columnar index of the values of one data property over the ids of an `IndividualIndex`
+
+    For every ordered datatype, the values are stored in a sorted array together with a parallel array of the ids of
+    the subjects having the value, so that range restrictions resolve to a contiguous slice found by binary search.
+    Single values are resolved by hash lookup.
+    """
+    __slots__ = '_index', '_subjects', '_literals', '_columns'
+
+    #: datatypes with a total order on their values, for which range queries are supported
+    ORDERED_DATATYPES: Final = frozenset({DoubleOWLDatatype, IntegerOWLDatatype, StringOWLDatatype,
+                                          DateOWLDatatype, DateTimeOWLDatatype, DurationOWLDatatype})
+    #: facets which can be resolved as range query
+    RANGE_FACETS: Final = frozenset({OWLFacet.MIN_INCLUSIVE, OWLFacet.MIN_EXCLUSIVE,
+                                     OWLFacet.MAX_INCLUSIVE, OWLFacet.MAX_EXCLUSIVE})
+
+    _index: IndividualIndex
+    _subjects: np.ndarray
+    _literals: Dict[OWLLiteral, np.ndarray]  # value => subject ids
+    _columns: Dict[OWLDatatype, Tuple[np.ndarray, np.ndarray]]  # datatype => (sorted values, subject ids)
+
+    def __init__(self, index: IndividualIndex, assertions: Iterable[Tuple[OWLNamedIndividual, OWLLiteral]]):
+        """Create a new data property value index
+
+        Args:
+            index: index to intern the subjects with
+            assertions: pairs of subject and value of the data property
+        """
+        literal_ids: Dict[OWLLiteral, int] = dict()
+        lit_ids = []
+        subject_ids = []
+        for s, lit in assertions:
+            lit_ids.append(literal_ids.setdefault(lit, len(literal_ids)))
+            subject_ids.append(index.add(s))
+        self._init(index, list(literal_ids), np.asarray(lit_ids, dtype=np.int64),
+                   np.asarray(subject_ids, dtype=np.int64))
+
+    @staticmethod
+    def from_arrays(index: IndividualIndex, literals: List[OWLLiteral], literal_ids: np.ndarray,
+                    subject_ids: np.ndarray) -> 'DataPropertyValueIndex':
+        """Create a data property value index from the output of `to_arrays`
+
+        Args:
+            index: the individual index the subject ids refer to
+            literals: distinct values of the data property
+            literal_ids: position in literals of the value of each assertion
+            subject_ids: id of the subject of each assertion
+
+        Returns:
+            the data property value index
+        """
+        obj = object.__new__(DataPropertyValueIndex)
+        obj._init(index, literals, literal_ids, subject_ids)
+        return obj
+
+    def _init(self, index: IndividualIndex, literals: List[OWLLiteral], literal_ids: np.ndarray,
+              subject_ids: np.ndarray):
+        self._index = index
+        order = np.lexsort((subject_ids, literal_ids))
+        literal_ids = literal_ids[order]
+        subject_ids = subject_ids[order]
+        bounds = np.searchsorted(literal_ids, np.arange(len(literals) + 1))
+        self._literals = {lit: np.unique(subject_ids[bounds[i]:bounds[i + 1]]) for i, lit in enumerate(literals)}
+        if self._literals:
+            self._subjects = np.unique(np.concatenate(list(self._literals.values())))
+        else:
+            self._subjects = np.empty(0, dtype=np.int64)
+
+        by_datatype: Dict[OWLDatatype, List[OWLLiteral]] = dict()
+        for lit in self._literals:
+            if lit.get_datatype() in self.ORDERED_DATATYPES:
+                by_datatype.setdefault(lit.get_datatype(), []).append(lit)
+        self._columns = dict()
+        for datatype, literals in by_datatype.items():
+            values = _column_array(datatype, [lit.to_python() for lit in literals])
+            lengths = [len(self._literals[lit]) for lit in literals]
+            subjects = np.concatenate([self._literals[lit] for lit in literals])
+            values = np.repeat(values, lengths)
+            if values.dtype.kind == 'f':
+                keep = ~np.isnan(values)
+                values, subjects = values[keep], subjects[keep]
+            order = np.argsort(values, kind='stable')
+            self._columns[datatype] = (values[order], subjects[order])
+
+    @property
+    def index(self) -> IndividualIndex:
+        return self._index
+
+    def updated(self, added: Iterable[Tuple[OWLNamedIndividual, OWLLiteral]] = (),
+                removed: Iterable[Tuple[OWLNamedIndividual, OWLLiteral]] = ()) -> 'DataPropertyValueIndex':
+        """A copy of the value index with some assertions added and removed, on the same individual index
+
+        Args:
+            added: pairs of subject and value to add
+            removed: pairs of subject and value to remove
+
+        Returns:
+            the updated value index
+        """
+        literals = {lit: set(ids.tolist()) for lit, ids in self._literals.items()}
+        for s, lit in removed:
+            i = self._index.id_of(s)
+            if i is not None and lit in literals:
+                literals[lit].discard(i)
+        for s, lit in added:
+            literals.setdefault(lit, set()).add(self._index.add(s))
+        literals = {lit: ids for lit, ids in literals.items() if ids}
+        literal_ids = np.repeat(np.arange(len(literals), dtype=np.int64), [len(ids) for ids in literals.values()])
+        subject_ids = np.fromiter((i for ids in literals.values() for i in ids), dtype=np.int64,
+                                  count=len(literal_ids))
+        return DataPropertyValueIndex.from_arrays(self._index, list(literals), literal_ids, subject_ids)
+
+    def to_arrays(self) -> Tuple[List[OWLLiteral], np.ndarray, np.ndarray]:
+        """The assertions of the data property as distinct values, value position and subject id of each assertion,
+        see `from_arrays`"""
+        literals = list(self._literals)
+        subject_ids = [self._literals[lit] for lit in literals]
+        literal_ids = np.repeat(np.arange(len(literals), dtype=np.int64), [len(ids) for ids in subject_ids])
+        if subject_ids:
+            return literals, literal_ids, np.concatenate(subject_ids)
+        return literals, literal_ids, np.empty(0, dtype=np.int64)
+
+    def subjects(self) -> np.ndarray:
+        """Sorted ids of all individuals having a value for the data property"""
+        return self._subjects
+
+    def literals(self) -> Iterable[OWLLiteral]:
+        """All distinct values of the data property"""
+        return self._literals.keys()
+
+    def subjects_with_value(self, value: OWLLiteral) -> np.ndarray:
+        """Sorted ids of the individuals having value for the data property"""
+        ids = self._literals.get(value)
+        if ids is None:
+            return self._subjects[:0]
+        return ids
+
+    def subjects_with_values(self, values: Iterable[OWLLiteral]) -> np.ndarray:
+        """Sorted ids of the individuals having any of values for the data property"""
+        ids = [self._literals[v] for v in values if v in self._literals]
+        if not ids:
+            return self._subjects[:0]
+        return np.unique(np.concatenate(ids))
+
+    def subjects_in_range(self, datatype: OWLDatatype, facet_values: Iterable[Tuple[OWLFacet, Any]]) -> np.ndarray:
+        """Ids of the individuals having a value of datatype which satisfies all the range facets
+
+        Args:
+            datatype: one of `ORDERED_DATATYPES`
+            facet_values: pairs of a facet in `RANGE_FACETS` and the (python) value to compare to
+
+        Returns:
+            sorted array of ids
+        """
+        column = self._columns.get(datatype)
+        if column is None:
+            return self._subjects[:0]
+        values, subjects = column
+        start = 0
+        end = len(values)
+        for facet, v in facet_values:
+            if facet == OWLFacet.MIN_INCLUSIVE:
+                start = max(start, int(np.searchsorted(values, v, side='left')))
+            elif facet == OWLFacet.MIN_EXCLUSIVE:
+                start = max(start, int(np.searchsorted(values, v, side='right')))
+            elif facet == OWLFacet.MAX_INCLUSIVE:
+                end = min(end, int(np.searchsorted(values, v, side='right')))
+            elif facet == OWLFacet.MAX_EXCLUSIVE:
+                end = min(end, int(np.searchsorted(values, v, side='left')))
+            else:
+                raise ValueError(facet)
+        if start >= end:
+            return self._subjects[:0]
+        return np.unique(subjects[start:end])
+
+
+def _column_array(datatype: OWLDatatype, values: List[Any]) -> np.ndarray:
+    if datatype == DoubleOWLDatatype:
+        return np.asarray(values, dtype=np.float64)
+    if datatype == IntegerOWLDatatype:
+        try:
+            return np.asarray(values, dtype=np.int64)
+        except OverflowError:
+            pass
+    arr = np.empty(len(values), dtype=object)
+    arr[:] = values
+    return arr
+
+
+#: version of the file format written by `write_index_file`
+INDEX_FORMAT_VERSION: Final = 1
+_INDEX_MAGIC: Final = b'OWLAPYIX'
+_INDEX_ALIGNMENT: Final = 16
+
+
+def bits_to_array(bits: int) -> np.ndarray:
+    """Store a bitset as little endian byte array"""
+    return np.frombuffer(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+
+
+def array_to_bits(arr: np.ndarray) -> int:
+    """Inverse of `bits_to_array`"""
+    return int.from_bytes(arr.tobytes(), 'little')
+
+
+def write_index_file(path: str, header: Mapping[str, Any], arrays: Mapping[str, np.ndarray]) -> None:
+    """Write a JSON header and a number of arrays into one binary file, to be memory mapped by `read_index_file`
+
+    Args:
+        path: file to write
+        header: JSON serialisable header
+        arrays: name => one dimensional array
+    """
+    layout = dict()
+    offset = 0
+    for name, arr in arrays.items():
+        layout[name] = [offset, arr.dtype.str, len(arr)]
+        offset += -(-arr.nbytes // _INDEX_ALIGNMENT) * _INDEX_ALIGNMENT
+    head = json.dumps({'version': INDEX_FORMAT_VERSION, 'header': header, 'arrays': layout}).encode('utf-8')
+    start = len(_INDEX_MAGIC) + 8 + len(head)
+    start = -(-start // _INDEX_ALIGNMENT) * _INDEX_ALIGNMENT
+    with open(path, 'wb') as f:
+        f.write(_INDEX_MAGIC)
+        f.write(len(head).to_bytes(8, 'little'))
+        f.write(head)
+        f.write(bytes(start - f.tell()))
+        for name, arr in arrays.items():
+            f.write(bytes(start + layout[name][0] - f.tell()))
+            f.write(np.ascontiguousarray(arr).tobytes())
+        f.write(bytes(start + offset - f.tell()))
+
+
+def read_index_file(path: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, np.ndarray]]:
+    """Memory map a file written by `write_index_file`
+
+    Args:
+        path: file to read
+
+    Returns:
+        the header, or None if the file was written in a different format version, and the (read only) arrays
+    """
+    with open(path, 'rb') as f:
+        if f.read(len(_INDEX_MAGIC)) != _INDEX_MAGIC:
+            raise ValueError(f"{path} is not an index file")
+        size = int.from_bytes(f.read(8), 'little')
+        head = json.loads(f.read(size).decode('utf-8'))
+        if head['version'] != INDEX_FORMAT_VERSION:
+            return None, dict()
+        start = -(-(len(_INDEX_MAGIC) + 8 + size) // _INDEX_ALIGNMENT) * _INDEX_ALIGNMENT
+        if not head['arrays']:
+            return head['header'], dict()
+        buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    arrays = {name: np.frombuffer(buf, dtype=np.dtype(dtype), count=count, offset=start + offset)
+              for name, (offset, dtype, count) in head['arrays'].items()}
+    return head['header'], arrays
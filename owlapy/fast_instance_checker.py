@@ -1,11 +1,19 @@
 from collections import defaultdict
 import logging
+import hashlib
 import operator
+import sys
+import time
 from functools import singledispatchmethod, reduce
 from itertools import repeat
 from types import MappingProxyType, FunctionType
-from typing import DefaultDict, Iterable, Dict, Mapping, Set, Type, TypeVar, Union, Optional, FrozenSet
+from typing import TYPE_CHECKING, DefaultDict, Iterable, Dict, List, Mapping, Set, Tuple, Type, TypeVar, Union, \
+    Optional, FrozenSet
 
+import numpy as np
+
+from owlapy.abox_index import CSRAdjacency, DataPropertyValueIndex, IndividualIndex, IndividualBitSet, \
+    array_to_bits, bits_to_array, read_index_file, write_index_file
 from owlapy.ext import OWLReasonerEx
 from owlapy.model import OWLDataRange, OWLObjectOneOf, OWLOntology, OWLNamedIndividual, OWLClass, OWLClassExpression, \
     OWLObjectProperty, OWLDataProperty, OWLObjectUnionOf, OWLObjectIntersectionOf, OWLObjectSomeValuesFrom, \
@@ -13,23 +21,40 @@ from owlapy.model import OWLDataRange, OWLObjectOneOf, OWLOntology, OWLNamedIndi
     OWLDataSomeValuesFrom, OWLDataPropertyExpression, OWLDatatypeRestriction, OWLLiteral, \
     OWLDataComplementOf, OWLDataAllValuesFrom, OWLDatatype, OWLDataHasValue, OWLDataOneOf, OWLReasoner, \
     OWLDataIntersectionOf, OWLDataUnionOf, OWLObjectCardinalityRestriction, OWLObjectMinCardinality, \
-    OWLObjectMaxCardinality, OWLObjectExactCardinality, OWLObjectHasValue, OWLPropertyExpression, OWLFacetRestriction
-from owlapy.util import LRUCache
+    OWLObjectMaxCardinality, OWLObjectExactCardinality, OWLObjectHasValue, OWLPropertyExpression, OWLFacetRestriction, \
+    OWLIndividualAxiom, OWLClassAssertionAxiom, OWLObjectPropertyAssertionAxiom, OWLDataPropertyAssertionAxiom, \
+    OWLEntity, OWLThing
+from owlapy.util import CostAwareCache, LRUCache, class_expression_signature, shared_subexpressions
+
+if TYPE_CHECKING:
+    from owlapy.owlready2.bulk import BulkLoader_Owlready2
 
 logger = logging.getLogger(__name__)
 
 _P = TypeVar('_P', bound=OWLPropertyExpression)
 
 
+def _retained_bytes(individuals: FrozenSet[OWLNamedIndividual]) -> int:
+    # the individuals themselves are shared between all sets, only count the containers
+    if isinstance(individuals, IndividualBitSet):
+        return sys.getsizeof(individuals) + sys.getsizeof(individuals.bits)
+    return sys.getsizeof(individuals)
+
+
+def _iri_of(entity: OWLEntity) -> str:
+    return entity.get_iri().as_str()
+
+
 class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
     """Tries to check instances fast (but maybe incomplete)"""
     __slots__ = '_ontology', '_base_reasoner', \
                 '_ind_set', '_cls_to_ind', \
                 '_has_prop', \
-                '_objectsomevalues_cache', '_datasomevalues_cache', '_objectcardinality_cache', \
+                '_retrieval_cache', '_retrieval_cache_bytes', '_pinned', \
                 '_property_cache', \
                 '_obj_prop', '_obj_prop_inv', '_data_prop', \
                 '_negation_default', \
+                '_ind_index', '_ind_bits', '_bulk_loader', \
                 '__warned'
 
     _ontology: OWLOntology
@@ -37,23 +62,28 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
     _cls_to_ind: Dict[OWLClass, FrozenSet[OWLNamedIndividual]]  # Class => individuals
     _has_prop: Mapping[Type[_P], LRUCache[_P, FrozenSet[OWLNamedIndividual]]]  # Type => Property => individuals
     _ind_set: FrozenSet[OWLNamedIndividual]
-    # ObjectSomeValuesFrom => individuals
-    _objectsomevalues_cache: LRUCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
-    # DataSomeValuesFrom => individuals
-    _datasomevalues_cache: LRUCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
-    # ObjectCardinalityRestriction => individuals
-    _objectcardinality_cache: LRUCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
-    # ObjectProperty => { individual => individuals }
-    _obj_prop: Dict[OWLObjectProperty, Mapping[OWLNamedIndividual, Set[OWLNamedIndividual]]]
-    # ObjectProperty => { individual => individuals }
-    _obj_prop_inv: Dict[OWLObjectProperty, Mapping[OWLNamedIndividual, Set[OWLNamedIndividual]]]
-    # DataProperty => { individual => literals }
-    _data_prop: Dict[OWLDataProperty, Mapping[OWLNamedIndividual, Set[OWLLiteral]]]
+    # class expression => individuals
+    _retrieval_cache: CostAwareCache[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
+    _retrieval_cache_bytes: int
+    # class expression => individuals, of the shared subexpressions of the batch being retrieved
+    _pinned: Dict[OWLClassExpression, FrozenSet[OWLNamedIndividual]]
+    # ObjectProperty => { individual => individuals }, or adjacency over the individual ids in bitset mode
+    _obj_prop: Dict[OWLObjectProperty, Union[Mapping[OWLNamedIndividual, Set[OWLNamedIndividual]], CSRAdjacency]]
+    # ObjectProperty => { individual => individuals }, or adjacency over the individual ids in bitset mode
+    _obj_prop_inv: Dict[OWLObjectProperty, Union[Mapping[OWLNamedIndividual, Set[OWLNamedIndividual]], CSRAdjacency]]
+    # DataProperty => columnar index of the values
+    _data_prop: Dict[OWLDataProperty, DataPropertyValueIndex]
     _property_cache: bool
     _negation_default: bool
+    # Individual => id, only in bitset mode
+    _ind_index: Optional[IndividualIndex]
+    # all individuals as bitset, only in bitset mode
+    _ind_bits: Optional[IndividualBitSet]
+    # reads property assertions from the owlready2 quadstore, see _get_bulk_loader
+    _bulk_loader: Optional['BulkLoader_Owlready2']
 
     def __init__(self, ontology: OWLOntology, base_reasoner: OWLReasoner, *,
-                 property_cache=True, negation_default=False):
+                 property_cache=True, negation_default=False, bitsets=False, retrieval_cache_bytes=2 ** 26):
         """Fast instance checker
 
         Args:
@@ -61,22 +91,37 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
             base_reasoner: Reasoner to get instances/types from
             property_cache: Whether to cache property values
             negation_default: Whether to assume a missing fact means it is false ("closed world view")
+            bitsets: Whether to intern the individuals to integer ids and represent all retrieval results as
+                `IndividualBitSet` instead of frozenset. Object property values are then stored as `CSRAdjacency`
+                and restrictions on object properties are evaluated with vectorised operations
+            retrieval_cache_bytes: Memory budget (estimated bytes of the retained sets of individuals) for memoising
+                the instances of class expressions
             """
         super().__init__(ontology)
         self._ontology = ontology
         self._base_reasoner = base_reasoner
         self._property_cache = property_cache
         self._negation_default = negation_default
+        self._retrieval_cache_bytes = retrieval_cache_bytes
+        self._pinned = dict()
+        self._ind_index = IndividualIndex() if bitsets else None
         self.__warned = 0
         self._init()
 
     def _init(self, cache_size=128):
-        self._cls_to_ind = dict()
         individuals = self._ontology.individuals_in_signature()
         self._ind_set = frozenset(individuals)
-        self._objectsomevalues_cache = LRUCache(maxsize=cache_size)
-        self._datasomevalues_cache = LRUCache(maxsize=cache_size)
-        self._objectcardinality_cache = LRUCache(maxsize=cache_size)
+        if self._ind_index is not None:
+            self._ind_index = IndividualIndex(self._ind_set)
+            self._ind_bits = self._ind_index.all()
+        else:
+            self._ind_bits = None
+        self._init_caches(cache_size)
+
+    def _init_caches(self, cache_size=128):
+        self._cls_to_ind = dict()
+        self._bulk_loader = None
+        self._retrieval_cache = CostAwareCache(maxbytes=self._retrieval_cache_bytes, sizeof=_retained_bytes)
         if self._property_cache:
             self._obj_prop = dict()
             self._obj_prop_inv = dict()
@@ -92,6 +137,306 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         """The reset method shall reset any cached state"""
         self._init()
 
+    def retrieval_cache_info(self):
+        """Statistics (hits, misses, evictions, maxbytes, currbytes, currsize) of the memoised class expression
+        instances"""
+        return self._retrieval_cache.cache_info()
+
+    def _index_key(self) -> str:
+        """Hash of the ontology content and the base reasoner, identifying the state that `save_index` stores"""
+        h = hashlib.sha256()
+        h.update(type(self._base_reasoner).__qualname__.encode('utf-8'))
+
+        from owlapy.owlready2 import OWLOntology_Owlready2
+        if isinstance(self._ontology, OWLOntology_Owlready2):
+            # hash the asserted triples of the ontology and its imports in a single pass over the quadstore, other
+            # ontologies of the same world are left out
+            onto = self._ontology._onto
+            cs = sorted({onto.graph.c, *(o.graph.c for o in onto.indirectly_imported_ontologies())})
+            in_cs = f"IN ({', '.join('?' * len(cs))})"
+            graph = onto.world.graph
+            for query in ("SELECT s.iri, p.iri, o.iri FROM objs "
+                          "LEFT JOIN resources s ON objs.s = s.storid "
+                          "LEFT JOIN resources p ON objs.p = p.storid "
+                          f"LEFT JOIN resources o ON objs.o = o.storid WHERE objs.c {in_cs} ORDER BY 1, 2, 3",
+                          "SELECT s.iri, p.iri, datas.o, datas.d FROM datas "
+                          "LEFT JOIN resources s ON datas.s = s.storid "
+                          f"LEFT JOIN resources p ON datas.p = p.storid WHERE datas.c {in_cs} ORDER BY 1, 2, 3, 4"):
+                for row in graph.execute(query, cs):
+                    h.update(repr(row).encode('utf-8'))
+        else:
+            classes = sorted(self._ontology.classes_in_signature(), key=_iri_of)
+            object_properties = sorted(self._ontology.object_properties_in_signature(), key=_iri_of)
+            data_properties = sorted(self._ontology.data_properties_in_signature(), key=_iri_of)
+            for entities in (classes, object_properties, data_properties):
+                for e in entities:
+                    h.update(_iri_of(e).encode('utf-8'))
+            # the assertions of every individual, as seen by the base reasoner
+            for ind in sorted(self._ind_set, key=_iri_of):
+                h.update(_iri_of(ind).encode('utf-8'))
+                for c in sorted(map(_iri_of, self._base_reasoner.types(ind, direct=True))):
+                    h.update(f'a {c}'.encode('utf-8'))
+                for pe in object_properties:
+                    for o in sorted(map(_iri_of, self._base_reasoner.object_property_values(ind, pe))):
+                        h.update(f'{_iri_of(pe)} {o}'.encode('utf-8'))
+                for pe in data_properties:
+                    for lit in sorted(f'{_iri_of(lit.get_datatype())} {lit.get_literal()}'
+                                      for lit in self._base_reasoner.data_property_values(ind, pe)):
+                        h.update(f'{_iri_of(pe)} {lit}'.encode('utf-8'))
+        return h.hexdigest()
+
+    def materialise(self) -> None:
+        """Cache the instances of all classes and, with the property cache, the values of all properties of the
+        ontology, e.g. before `save_index`"""
+        for c in self._ontology.classes_in_signature():
+            self._lazy_cache_class(c)
+        if self._property_cache:
+            for op in self._ontology.object_properties_in_signature():
+                self._lazy_cache_obj_prop(op)
+                self._lazy_cache_obj_prop(op.get_inverse_property())
+            for dp in self._ontology.data_properties_in_signature():
+                self._lazy_cache_data_prop(dp)
+
+    def save_index(self, path: str) -> None:
+        """Save the cached instances of classes and values of properties to a file, so that another reasoner on the
+        same ontology can start with warm caches using `load_index`
+
+        Args:
+            path: file to write to
+        """
+        # without bitsets, a temporary index is used to store all individuals as ids
+        index = self._ind_index if self._ind_index is not None else IndividualIndex(self._ind_set)
+        arrays = dict()
+
+        classes = dict()
+        for c, inds in self._cls_to_ind.items():
+            name = f'c{len(arrays)}'
+            arrays[name] = bits_to_array(index.encode(inds).bits)
+            classes[c.get_iri().as_str()] = name
+
+        object_properties = dict()
+        data_properties = dict()
+        if self._property_cache:
+            for key, cache in (('', self._obj_prop), ('inverse ', self._obj_prop_inv)):
+                for pe, ops in cache.items():
+                    if not isinstance(ops, CSRAdjacency):
+                        subjects = []
+                        objects = []
+                        for s, o_set in ops.items():
+                            for o in o_set:
+                                subjects.append(index.add(s))
+                                objects.append(index.add(o))
+                        ops = CSRAdjacency.from_edges(len(index), subjects, objects)
+                    name = f'p{len(arrays)}'
+                    arrays[name + 'indptr'] = ops.indptr
+                    arrays[name + 'indices'] = ops.indices
+                    object_properties[key + pe.get_iri().as_str()] = name
+
+            for pe, dps in self._data_prop.items():
+                literals, literal_ids, subject_ids = dps.to_arrays()
+                if dps.index is not index:
+                    ids = np.fromiter(map(index.add, map(dps.index.individual, range(len(dps.index)))),
+                                      dtype=np.int64, count=len(dps.index))
+                    subject_ids = ids[subject_ids]
+                name = f'd{len(arrays)}'
+                arrays[name + 'literals'] = literal_ids
+                arrays[name + 'subjects'] = subject_ids
+                data_properties[pe.get_iri().as_str()] = \
+                    [name, [[lit.get_datatype().get_iri().as_str(), lit.get_literal()] for lit in literals]]
+
+        header = {
+            'key': self._index_key(),
+            'individuals': [index.individual(i).get_iri().as_str() for i in range(len(index))],
+            'signature_size': len(self._ind_set),
+            'classes': classes,
+            'object_properties': object_properties,
+            'data_properties': data_properties,
+        }
+        write_index_file(path, header, arrays)
+
+    def load_index(self, path: str) -> bool:
+        """Replace the cached state of this reasoner by the content of a file written by `save_index`
+
+        The arrays of the file are memory mapped. The file is only loaded if it was written for the same ontology
+        content, base reasoner and format version.
+
+        Args:
+            path: file to read from
+
+        Returns:
+            whether the file was loaded
+        """
+        header, arrays = read_index_file(path)
+        if header is None or header['key'] != self._index_key():
+            return False
+
+        index = IndividualIndex(OWLNamedIndividual(IRI.create(iri)) for iri in header['individuals'])
+        size = header['signature_size']
+        self._ind_set = frozenset(map(index.individual, range(size)))
+        if self._ind_index is not None:
+            self._ind_index = index
+            self._ind_bits = IndividualBitSet(index, (1 << size) - 1)
+        self._init_caches()
+
+        for iri, name in header['classes'].items():
+            self._cls_to_ind[OWLClass(IRI.create(iri))] = self._ids_as_set(
+                index, index.bits_to_ids(array_to_bits(arrays[name])))
+
+        if self._property_cache:
+            for key, name in header['object_properties'].items():
+                inverse = key.startswith('inverse ')
+                pe = OWLObjectProperty(IRI.create(key[len('inverse '):] if inverse else key))
+                ops = CSRAdjacency(arrays[name + 'indptr'], arrays[name + 'indices'])
+                if self._ind_index is None:
+                    opc: DefaultDict[OWLNamedIndividual, Set[OWLNamedIndividual]] = defaultdict(set)
+                    for i in np.flatnonzero(ops.degrees()).tolist():
+                        opc[index.individual(i)] = set(map(index.individual, ops.successors(i).tolist()))
+                    ops = MappingProxyType(opc)
+                if inverse:
+                    self._obj_prop_inv[pe] = ops
+                else:
+                    self._obj_prop[pe] = ops
+
+            for iri, (name, literals) in header['data_properties'].items():
+                literals = [OWLLiteral(v, OWLDatatype(IRI.create(dt))) for dt, v in literals]
+                self._data_prop[OWLDataProperty(IRI.create(iri))] = DataPropertyValueIndex.from_arrays(
+                    index, literals, arrays[name + 'literals'], arrays[name + 'subjects'])
+        return True
+
+    def update_assertions(self, added: Iterable[OWLIndividualAxiom] = (),
+                          removed: Iterable[OWLIndividualAxiom] = ()) -> Optional[FrozenSet[OWLEntity]]:
+        """Update the cached state after assertions were added to or removed from the ontology, instead of `reset`
+
+        The instances of the asserted classes (and their super classes) and the values of the asserted properties are
+        patched in place, and only the memoised class expressions that use one of them are dropped. Assertions of
+        complex class expressions and other axioms reset all cached state.
+
+        Args:
+            added: class, object property and data property assertions that were added to the ontology
+            removed: class, object property and data property assertions that were removed from the ontology
+
+        Returns:
+            the entities whose instances or values changed, or None if the instances of any class expression may
+            have changed (because new individuals appeared or the cached state was reset)
+        """
+        # entity => (added, removed) individuals, (subject, object) or (subject, value) pairs
+        classes: Dict[OWLClass, Tuple[Set[OWLNamedIndividual], Set[OWLNamedIndividual]]] = dict()
+        obj_props: Dict[OWLObjectProperty, Tuple[List[Tuple[OWLNamedIndividual, OWLNamedIndividual]],
+                                                 List[Tuple[OWLNamedIndividual, OWLNamedIndividual]]]] = dict()
+        data_props: Dict[OWLDataProperty, Tuple[List[Tuple[OWLNamedIndividual, OWLLiteral]],
+                                                List[Tuple[OWLNamedIndividual, OWLLiteral]]]] = dict()
+        # only added assertions can introduce new individuals
+        individuals = set()
+        for k, axioms in enumerate((added, removed)):
+            for axiom in axioms:
+                if isinstance(axiom, OWLClassAssertionAxiom) and isinstance(axiom.get_class_expression(), OWLClass):
+                    classes.setdefault(axiom.get_class_expression(), (set(), set()))[k].add(axiom.get_individual())
+                    if k == 0:
+                        individuals.add(axiom.get_individual())
+                elif isinstance(axiom, OWLObjectPropertyAssertionAxiom):
+                    s, pe, o = axiom.get_subject(), axiom.get_property(), axiom.get_object()
+                    if isinstance(pe, OWLObjectInverseOf):
+                        s, pe, o = o, pe.get_named_property(), s
+                    obj_props.setdefault(pe, ([], []))[k].append((s, o))
+                    if k == 0:
+                        individuals.update((s, o))
+                elif isinstance(axiom, OWLDataPropertyAssertionAxiom):
+                    data_props.setdefault(axiom.get_property(), ([], []))[k].append(
+                        (axiom.get_subject(), axiom.get_object()))
+                    if k == 0:
+                        individuals.add(axiom.get_subject())
+                else:
+                    self.reset()
+                    return None
+
+        new_individuals = individuals - self._ind_set
+        if new_individuals:
+            self._ind_set = self._ind_set | new_individuals
+            if self._ind_index is not None:
+                self._ind_bits = self._ind_bits | self._ind_index.encode(new_individuals)
+            self._cls_to_ind.pop(OWLThing, None)
+
+        changed = set()
+        for c, (c_added, c_removed) in classes.items():
+            for d in {c, *self._base_reasoner.super_classes(c)}:
+                changed.add(d)
+                if d not in self._cls_to_ind:
+                    continue
+                if c_removed:
+                    # the individuals may still be instances through other assertions, load d again when needed
+                    del self._cls_to_ind[d]
+                else:
+                    self._cls_to_ind[d] = self._cls_to_ind[d] | self._as_set(c_added)
+
+        for pe, (pe_added, pe_removed) in obj_props.items():
+            changed.add(pe)
+            if self._property_cache:
+                self._update_obj_prop(pe, pe_added, pe_removed)
+            else:
+                self._has_prop[OWLObjectProperty].discard_if(lambda p: p == pe)
+                self._has_prop[OWLObjectInverseOf].discard_if(lambda p: p.get_named_property() == pe)
+
+        for pe, (pe_added, pe_removed) in data_props.items():
+            changed.add(pe)
+            if self._property_cache:
+                if pe in self._data_prop:
+                    self._data_prop[pe] = self._data_prop[pe].updated(pe_added, pe_removed)
+            else:
+                self._has_prop[OWLDataProperty].discard_if(lambda p: p == pe)
+
+        if new_individuals:
+            # complements and universal restrictions include the new individuals
+            self._retrieval_cache.discard_if(lambda ce: True)
+            return None
+        changed = frozenset(changed)
+        self._retrieval_cache.discard_if(lambda ce: not changed.isdisjoint(class_expression_signature(ce)))
+        return changed
+
+    def _update_obj_prop(self, pe: OWLObjectProperty,
+                         added: List[Tuple[OWLNamedIndividual, OWLNamedIndividual]],
+                         removed: List[Tuple[OWLNamedIndividual, OWLNamedIndividual]]) -> None:
+        """Patch the cached values of an object property and its inverse, see `update_assertions`"""
+        if self._ind_index is not None:
+            if pe in self._obj_prop:
+                index = self._ind_index
+                added_ids = [(index.add(s), index.add(o)) for s, o in added]
+                # edges of unknown individuals can not exist, they are not interned
+                removed_ids = [(i, j) for i, j in ((index.id_of(s), index.id_of(o)) for s, o in removed)
+                               if i is not None and j is not None]
+                adjacency = self._obj_prop[pe].updated(len(index), added_ids, removed_ids)
+                self._obj_prop[pe] = adjacency
+                self._obj_prop_inv[pe] = adjacency.transpose()
+            return
+
+        for cache, inverse in ((self._obj_prop, False), (self._obj_prop_inv, True)):
+            if pe not in cache:
+                continue
+            opc: DefaultDict[OWLNamedIndividual, Set[OWLNamedIndividual]] = defaultdict(set, cache[pe])
+            for s, o in removed:
+                if inverse:
+                    s, o = o, s
+                if o in opc.get(s, ()):
+                    opc[s] = opc[s] - {o}
+                    if not opc[s]:
+                        del opc[s]
+            for s, o in added:
+                if inverse:
+                    s, o = o, s
+                opc[s] = opc[s] | {o}
+            cache[pe] = MappingProxyType(opc)
+
+    def _as_set(self, individuals: Iterable[OWLNamedIndividual]) -> FrozenSet[OWLNamedIndividual]:
+        """Store individuals in the set representation of this reasoner (bitset or frozenset)"""
+        if self._ind_index is not None:
+            return self._ind_index.encode(individuals)
+        return frozenset(individuals)
+
+    def _all_individuals(self) -> FrozenSet[OWLNamedIndividual]:
+        """All individuals in the set representation of this reasoner"""
+        if self._ind_bits is not None:
+            return self._ind_bits
+        return self._ind_set
+
     def data_property_domains(self, pe: OWLDataProperty, direct: bool = False) -> Iterable[OWLClassExpression]:
         yield from self._base_reasoner.data_property_domains(pe, direct=direct)
 
@@ -116,13 +461,13 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
     def object_property_values(self, ind: OWLNamedIndividual, pe: OWLObjectPropertyExpression) \
             -> Iterable[OWLNamedIndividual]:
         if self._property_cache:
-            self._lazy_cache_obj_prop(pe)
-            if isinstance(pe, OWLObjectProperty):
-                yield from self._obj_prop[pe][ind]
-            elif isinstance(pe, OWLObjectInverseOf):
-                yield from self._obj_prop_inv[pe.get_named_property()][ind]
+            ops = self._get_obj_prop_cache(pe)
+            if self._ind_index is not None:
+                i = self._ind_index.id_of(ind)
+                if i is not None:
+                    yield from map(self._ind_index.individual, ops.successors(i).tolist())
             else:
-                raise NotImplementedError
+                yield from ops[ind]
         else:
             yield from self._base_reasoner.object_property_values(ind, pe)
 
@@ -169,28 +514,22 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         else:
             raise NotImplementedError
 
+        if self._ind_index is not None:
+            self._lazy_cache_obj_prop_adjacency(pe.get_named_property())
+            return
+
         # Dict with Individual => Set[Individual]
         opc: DefaultDict[OWLNamedIndividual, Set[OWLNamedIndividual]] = defaultdict(set)
 
         # shortcut for owlready2
-        from owlapy.owlready2 import OWLOntology_Owlready2
-        if isinstance(self._ontology, OWLOntology_Owlready2):
-            import owlready2
-            # _x => owlready2 objects
-            p_x: owlready2.ObjectProperty = self._ontology._world[pe.get_named_property().get_iri().as_str()]
-            for l_x, r_x in p_x.get_relations():
-                if inverse:
-                    o_x = l_x
-                    s_x = r_x
-                else:
-                    s_x = l_x
-                    o_x = r_x
-                if isinstance(s_x, owlready2.Thing) and isinstance(o_x, owlready2.Thing):
-                    s = OWLNamedIndividual(IRI.create(s_x.iri))
-                    o = OWLNamedIndividual(IRI.create(o_x.iri))
-                    if s not in opc:
-                        opc[s] = set()
-                    opc[s] |= {o}
+        loader = self._get_bulk_loader()
+        if loader is not None:
+            subjects, objects = loader.object_property_edges(pe.get_named_property())
+            if inverse:
+                subjects, objects = objects, subjects
+            individual = loader.index.individual
+            for s, o in zip(subjects.tolist(), objects.tolist()):
+                opc[individual(s)].add(individual(o))
         else:
             for s in self._ind_set:
                 individuals = set(self._base_reasoner.object_property_values(s, pe))
@@ -202,6 +541,48 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         else:
             self._obj_prop[pe] = MappingProxyType(opc)
 
+    def _lazy_cache_obj_prop_adjacency(self, pe: OWLObjectProperty) -> None:
+        """Get all edges of this object property and store them, as well as the edges of its inverse, as adjacency
+        over the individual ids (bitset mode)"""
+        index = self._ind_index
+        subjects = []
+        objects = []
+
+        # shortcut for owlready2
+        loader = self._get_bulk_loader()
+        if loader is not None:
+            subjects, objects = loader.object_property_edges(pe)
+        else:
+            for s in self._ind_set:
+                for o in self._base_reasoner.object_property_values(s, pe):
+                    subjects.append(index.add(s))
+                    objects.append(index.add(o))
+
+        adjacency = CSRAdjacency.from_edges(len(index), subjects, objects)
+        self._obj_prop[pe] = adjacency
+        self._obj_prop_inv[pe] = adjacency.transpose()
+
+    def _get_bulk_loader(self) -> Optional['BulkLoader_Owlready2']:
+        """Loader for property assertions that maps the individuals to the individual index (a private one if not in
+        bitset mode), or None if the ontology is not an Owlready2 ontology"""
+        from owlapy.owlready2 import OWLOntology_Owlready2
+        if self._bulk_loader is None and isinstance(self._ontology, OWLOntology_Owlready2):
+            from owlapy.owlready2.bulk import BulkLoader_Owlready2
+            index = self._ind_index if self._ind_index is not None else IndividualIndex(self._ind_set)
+            self._bulk_loader = BulkLoader_Owlready2(self._ontology, index)
+        return self._bulk_loader
+
+    def _get_obj_prop_cache(self, pe: OWLObjectPropertyExpression) \
+            -> Union[Mapping[OWLNamedIndividual, Set[OWLNamedIndividual]], CSRAdjacency]:
+        """The cached values of an object property (expression), see `_lazy_cache_obj_prop`"""
+        self._lazy_cache_obj_prop(pe)
+        if isinstance(pe, OWLObjectInverseOf):
+            return self._obj_prop_inv[pe.get_named_property()]
+        elif isinstance(pe, OWLObjectProperty):
+            return self._obj_prop[pe]
+        else:
+            raise NotImplementedError
+
     def _some_values_subject_index(self, pe: OWLPropertyExpression) -> FrozenSet[OWLNamedIndividual]:
         if isinstance(pe, OWLDataProperty):
             typ = OWLDataProperty
@@ -248,7 +629,7 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
                     except StopIteration:
                         pass
 
-            self._has_prop[typ][pe] = frozenset(subs)
+            self._has_prop[typ][pe] = self._as_set(subs)
 
         return self._has_prop[typ][pe]
 
@@ -258,14 +639,10 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         ret = set()
 
         if self._property_cache:
-            self._lazy_cache_obj_prop(pe)
+            ops = self._get_obj_prop_cache(pe)
 
-            if isinstance(pe, OWLObjectInverseOf):
-                ops = self._obj_prop_inv[pe.get_named_property()]
-            elif isinstance(pe, OWLObjectProperty):
-                ops = self._obj_prop[pe]
-            else:
-                raise ValueError
+            if self._ind_index is not None:
+                return self._find_some_values_adjacency(pe, ops, filler_inds, min_count, max_count)
 
             exists_p = min_count == 1 and max_count is None
 
@@ -290,60 +667,145 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
                 if count >= min_count and (max_count is None or count <= max_count):
                     ret |= {s}
 
-        return frozenset(ret)
+        return self._as_set(ret)
+
+    def _find_some_values_adjacency(self, pe: OWLObjectPropertyExpression, adjacency: CSRAdjacency,
+                                    filler_inds: Set[OWLNamedIndividual],
+                                    min_count: int, max_count: Optional[int]) -> IndividualBitSet:
+        """Vectorised `_find_some_values` on the adjacency of pe (bitset mode)"""
+        index = self._ind_index
+        fillers = index.encode(filler_inds)
+
+        if min_count == 1 and max_count is None and len(fillers) * 16 < adjacency.n_rows:
+            # few fillers: collect their predecessors instead of scanning all edges
+            inverse = self._get_obj_prop_cache(pe.get_inverse_property())
+            subjects = inverse.successors_of_all(index.bits_to_ids(fillers.bits))
+            return IndividualBitSet(index, index.ids_to_bits(subjects))
+
+        counts = adjacency.count_in(index.bits_to_mask(fillers.bits))
+        selected = counts >= min_count
+        if max_count is not None:
+            selected &= counts <= max_count
+        if min_count == 0:
+            # like the set based evaluation, only consider individuals that have a value for pe
+            selected &= adjacency.degrees() > 0
+        return IndividualBitSet(index, index.mask_to_bits(selected))
+
+    def _find_all_values(self, pe: OWLObjectPropertyExpression, filler_inds: Set[OWLNamedIndividual]) \
+            -> FrozenSet[OWLNamedIndividual]:
+        """Get all individuals whose object property values are all in filler_inds (including the individuals without
+        a value), in one pass over the property values"""
+        ops = self._get_obj_prop_cache(pe)
+        all_ = self._all_individuals()
+        if self._ind_index is not None:
+            index = self._ind_index
+            counts = ops.count_in(index.bits_to_mask(index.encode(filler_inds).bits))
+            return all_ - IndividualBitSet(index, index.mask_to_bits(counts < ops.degrees()))
+        return all_ - {s for s, o_set in ops.items() if not o_set <= filler_inds}
 
     def _lazy_cache_data_prop(self, pe: OWLDataPropertyExpression) -> None:
-        """Get all individuals and values involved in this data property and put them in a Dict"""
+        """Get all individuals and values involved in this data property and put them in a columnar index"""
         assert (isinstance(pe, OWLDataProperty))
         if pe in self._data_prop:
             return
 
-        opc: Dict[OWLNamedIndividual, Set[OWLLiteral]] = dict()
-
         # shortcut for owlready2
-        from owlapy.owlready2 import OWLOntology_Owlready2
-        if isinstance(self._ontology, OWLOntology_Owlready2):
-            import owlready2
-            # _x => owlready2 objects
-            p_x: owlready2.DataProperty = self._ontology._world[pe.get_iri().as_str()]
-            for s_x, o_x in p_x.get_relations():
-                if isinstance(s_x, owlready2.Thing):
-                    o_literal = OWLLiteral(o_x)
-                    s = OWLNamedIndividual(IRI.create(s_x.iri))
-                    if s not in opc:
-                        opc[s] = set()
-                    opc[s].add(o_literal)
+        loader = self._get_bulk_loader()
+        if loader is not None:
+            literals, literal_ids, subject_ids = loader.data_property_assertions(pe)
+            self._data_prop[pe] = DataPropertyValueIndex.from_arrays(loader.index, literals, literal_ids,
+                                                                     subject_ids)
         else:
+            opc: List[Tuple[OWLNamedIndividual, OWLLiteral]] = []
             for s in self._ind_set:
-                values = set(self._base_reasoner.data_property_values(s, pe))
-                if len(values) > 0:
-                    opc[s] = values
+                for o in self._base_reasoner.data_property_values(s, pe):
+                    opc.append((s, o))
+
+            # without bitsets, the ids are only used inside the value index
+            index = self._ind_index if self._ind_index is not None else IndividualIndex()
+            self._data_prop[pe] = DataPropertyValueIndex(index, opc)
 
-        self._data_prop[pe] = MappingProxyType(opc)
+    def _ids_as_set(self, index: IndividualIndex, ids: np.ndarray) -> FrozenSet[OWLNamedIndividual]:
+        """Store individual ids of index in the set representation of this reasoner (bitset or frozenset)"""
+        if self._ind_index is not None:
+            return IndividualBitSet(index, index.ids_to_bits(ids))
+        return frozenset(map(index.individual, ids.tolist()))
+
+    def _find_instances(self, ce: OWLClassExpression) -> FrozenSet[OWLNamedIndividual]:
+        """Instances of ce, memoised in the retrieval cache"""
+        if isinstance(ce, OWLClass):
+            # already cached in _cls_to_ind
+            return self._retrieve(ce)
+        ind = self._pinned.get(ce)
+        if ind is not None:
+            return ind
+        if ce in self._retrieval_cache:
+            return self._retrieval_cache[ce]
+        start = time.perf_counter()
+        ind = self._retrieve(ce)
+        self._retrieval_cache.put(ce, ind, cost=time.perf_counter() - start)
+        return ind
+
+    def _find_instances_many(self, ces: List[OWLClassExpression]) -> List[FrozenSet[OWLNamedIndividual]]:
+        """Instances of many class expressions
+
+        The subexpressions shared between the class expressions are retrieved first and kept for the rest of the
+        batch, so that every one of them is only retrieved once even if the retrieval cache evicts it.
+
+        Args:
+            ces: class expressions
+
+        Returns:
+            the instances of every class expression
+        """
+        try:
+            for ce in shared_subexpressions(ces):
+                self._pinned[ce] = self._find_instances(ce)
+            return [self._find_instances(ce) for ce in ces]
+        finally:
+            self._pinned.clear()
+
+    def _find_instances_given(self, ce: OWLClassExpression,
+                              known: Dict[OWLClassExpression, FrozenSet[OWLNamedIndividual]]) \
+            -> FrozenSet[OWLNamedIndividual]:
+        """Instances of ce, where the instances of some of its subexpressions are already known
+
+        Args:
+            ce: class expression
+            known: the instances of subexpressions of ce, in the set representation of this reasoner. they are only
+                kept for this retrieval
+
+        Returns:
+            the instances of ce
+        """
+        added = [k for k in known if k not in self._pinned]
+        self._pinned.update((k, known[k]) for k in added)
+        try:
+            return self._find_instances(ce)
+        finally:
+            for k in added:
+                del self._pinned[k]
 
     # single dispatch is still not implemented in mypy, see https://github.com/python/mypy/issues/2904
     @singledispatchmethod
-    def _find_instances(self, ce: OWLClassExpression) -> FrozenSet[OWLNamedIndividual]:
+    def _retrieve(self, ce: OWLClassExpression) -> FrozenSet[OWLNamedIndividual]:
         raise NotImplementedError(ce)
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, c: OWLClass) -> FrozenSet[OWLNamedIndividual]:
         self._lazy_cache_class(c)
         return self._cls_to_ind[c]
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectUnionOf) -> FrozenSet[OWLNamedIndividual]:
         return reduce(operator.or_, map(self._find_instances, ce.operands()))
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectIntersectionOf) -> FrozenSet[OWLNamedIndividual]:
         return reduce(operator.and_, map(self._find_instances, ce.operands()))
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectSomeValuesFrom) -> FrozenSet[OWLNamedIndividual]:
-        if ce in self._objectsomevalues_cache:
-            return self._objectsomevalues_cache[ce]
-
         p = ce.get_property()
         assert isinstance(p, OWLObjectPropertyExpression)
         if not self._property_cache and ce.get_filler().is_owl_thing():
@@ -351,64 +813,60 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
 
         filler_ind = self._find_instances(ce.get_filler())
 
-        ind = self._find_some_values(p, filler_ind)
+        return self._find_some_values(p, filler_ind)
 
-        self._objectsomevalues_cache[ce] = ind
-        return ind
-
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectComplementOf) -> FrozenSet[OWLNamedIndividual]:
         if self._negation_default:
-            all_ = self._ind_set
-            complement_ind = self._find_instances(ce.get_operand())
-            return all_ ^ complement_ind
+            # on bitsets, this is a single operation on the integers
+            return self._all_individuals() - self._find_instances(ce.get_operand())
         else:
             # TODO! XXX
             if not self.__warned & 1:
                 logger.warning("Object Complement Of not implemented at %s", ce)
                 self.__warned |= 1
-            return frozenset()
+            return self._as_set(())
             # if self.complement_as_negation:
             #     ...
             # else:
             #     self._lazy_cache_negation
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectAllValuesFrom) -> FrozenSet[OWLNamedIndividual]:
+        if self._negation_default and self._property_cache:
+            filler_ind = self._find_instances(ce.get_filler())
+            return self._find_all_values(ce.get_property(), filler_ind)
         return self._find_instances(
             OWLObjectSomeValuesFrom(
                 property=ce.get_property(),
                 filler=ce.get_filler().get_object_complement_of().get_nnf()
             ).get_object_complement_of())
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectOneOf) -> FrozenSet[OWLNamedIndividual]:
-        return frozenset(ce.individuals())
+        return self._as_set(ce.individuals())
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectHasValue) -> FrozenSet[OWLNamedIndividual]:
         return self._find_instances(ce.as_some_values_from())
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectMinCardinality) -> FrozenSet[OWLNamedIndividual]:
         return self._get_instances_object_card_restriction(ce)
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectMaxCardinality) -> FrozenSet[OWLNamedIndividual]:
-        all_ = self._ind_set
+        all_ = self._all_individuals()
         min_ind = self._find_instances(OWLObjectMinCardinality(cardinality=ce.get_cardinality() + 1,
                                                                property=ce.get_property(),
                                                                filler=ce.get_filler()))
-        return all_ ^ min_ind
+        return all_ - min_ind
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLObjectExactCardinality) -> FrozenSet[OWLNamedIndividual]:
         return self._get_instances_object_card_restriction(ce)
 
     def _get_instances_object_card_restriction(self, ce: OWLObjectCardinalityRestriction):
-        if ce in self._objectcardinality_cache:
-            return self._objectcardinality_cache[ce]
-
         p = ce.get_property()
         assert isinstance(p, OWLObjectPropertyExpression)
 
@@ -428,16 +886,10 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
 
         filler_ind = self._find_instances(ce.get_filler())
 
-        ind = self._find_some_values(p, filler_ind, min_count=min_count, max_count=max_count)
-
-        self._objectcardinality_cache[ce] = ind
-        return ind
+        return self._find_some_values(p, filler_ind, min_count=min_count, max_count=max_count)
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLDataSomeValuesFrom) -> FrozenSet[OWLNamedIndividual]:
-        if ce in self._datasomevalues_cache:
-            return self._datasomevalues_cache[ce]
-
         pe = ce.get_property()
         filler = ce.get_filler()
         assert isinstance(pe, OWLDataProperty)
@@ -456,8 +908,7 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         if isinstance(filler, OWLDatatype):
             if property_cache:
                 # TODO: Currently we just assume that the values are of the given type (also done in DLLearner)
-                for s in dps.keys():
-                    ind |= {s}
+                ind = self._ids_as_set(dps.index, dps.subjects())
             else:
                 for s in subs:
                     for lit in self._base_reasoner.data_property_values(s, pe):
@@ -467,9 +918,7 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         elif isinstance(filler, OWLDataOneOf):
             values = set(filler.values())
             if property_cache:
-                for s, literals in dps.items():
-                    if literals & values:
-                        ind |= {s}
+                ind = self._ids_as_set(dps.index, dps.subjects_with_values(values))
             else:
                 for s in subs:
                     for lit in self._base_reasoner.data_property_values(s, pe):
@@ -480,9 +929,7 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
             temp = self._find_instances(
                 OWLDataSomeValuesFrom(property=pe, filler=filler.get_data_range()))
             if property_cache:
-                subs = set()
-                for s in dps.keys():
-                    subs |= {s}
+                subs = self._ids_as_set(dps.index, dps.subjects())
 
             ind = subs.difference(temp)
         elif isinstance(filler, OWLDataUnionOf):
@@ -510,11 +957,17 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
                        all(map(apply, facet_restrictions, repeat(lv)))
 
             if property_cache:
-                for s, literals in dps.items():
-                    for lit in literals:
-                        if include(lit):
-                            ind |= {s}
-                            break
+                datatype = filler.get_datatype()
+                if datatype in DataPropertyValueIndex.ORDERED_DATATYPES and \
+                        all(res.get_facet() in DataPropertyValueIndex.RANGE_FACETS
+                            and res.get_facet_value().get_datatype() == datatype
+                            for res in filler.get_facet_restrictions()):
+                    # binary search in the sorted values
+                    ids = dps.subjects_in_range(datatype, ((res.get_facet(), res.get_facet_value().to_python())
+                                                           for res in filler.get_facet_restrictions()))
+                else:
+                    ids = dps.subjects_with_values(filter(include, dps.literals()))
+                ind = self._ids_as_set(dps.index, ids)
             else:
                 for s in subs:
                     for lit in self._base_reasoner.data_property_values(s, pe):
@@ -524,11 +977,9 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         else:
             raise ValueError
 
-        r = frozenset(ind)
-        self._datasomevalues_cache[ce] = r
-        return r
+        return self._as_set(ind)
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLDataAllValuesFrom) -> FrozenSet[OWLNamedIndividual]:
         filler = ce.get_filler()
         if isinstance(filler, OWLDataComplementOf):
@@ -541,7 +992,7 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
                 filler=filler
             ).get_object_complement_of())
 
-    @_find_instances.register
+    @_retrieve.register
     def _(self, ce: OWLDataHasValue) -> FrozenSet[OWLNamedIndividual]:
         return self._find_instances(ce.as_some_values_from())
 
@@ -549,4 +1000,4 @@ class OWLReasoner_FastInstanceChecker(OWLReasonerEx):
         if c in self._cls_to_ind:
             return
         temp = self._base_reasoner.instances(c)
-        self._cls_to_ind[c] = frozenset(temp)
+        self._cls_to_ind[c] = self._as_set(temp)
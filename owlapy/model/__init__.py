@@ -1164,6 +1164,10 @@ class OWLLiteral(OWLAnnotationValue, metaclass=ABCMeta):
         # TODO XXX
         raise NotImplementedError(value)
 
+    def __getnewargs__(self):
+        # needed to pickle literals, __new__ selects the implementation by the datatype
+        return self._v, self.get_datatype()
+
     def get_literal(self) -> str:
         """Gets the lexical value of this literal. Note that the language tag is not included.
 
@@ -2110,6 +2114,110 @@ class OWLSubClassOfAxiom(OWLClassAxiom):
         return f'OWLSubClassOfAxiom(sub_class={self._sub_class},super_class={self._super_class})'
 
 
+class OWLIndividualAxiom(OWLLogicalAxiom, metaclass=ABCMeta):
+    """The base interface for axioms about individuals (assertions)."""
+    __slots__ = ()
+
+    def __init__(self, annotations: Optional[Iterable['OWLAnnotation']] = None):
+        super().__init__(annotations=annotations)
+
+
+class OWLClassAssertionAxiom(OWLIndividualAxiom):
+    """Represents ClassAssertion axioms in the OWL 2 Specification."""
+    __slots__ = '_individual', '_class_expression'
+
+    _individual: OWLIndividual
+    _class_expression: OWLClassExpression
+
+    def __init__(self, individual: OWLIndividual, class_expression: OWLClassExpression):
+        """Get a ClassAssertion axiom for the specified individual and class expression
+
+        Args:
+            individual: the individual
+            class_expression: the class the individual belongs to
+        """
+        self._individual = individual
+        self._class_expression = class_expression
+
+    def get_individual(self) -> OWLIndividual:
+        return self._individual
+
+    def get_class_expression(self) -> OWLClassExpression:
+        return self._class_expression
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self._class_expression == other._class_expression and self._individual == other._individual
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._individual, self._class_expression))
+
+    def __repr__(self):
+        return f'OWLClassAssertionAxiom(individual={self._individual},class_expression={self._class_expression})'
+
+
+class OWLPropertyAssertionAxiom(Generic[_P, _C], OWLIndividualAxiom, metaclass=ABCMeta):
+    """Represents a PropertyAssertion axiom in the OWL 2 specification."""
+    __slots__ = '_subject', '_property', '_object'
+
+    _subject: OWLIndividual
+    _property: _P
+    _object: _C
+
+    @abstractmethod
+    def __init__(self, subject: OWLIndividual, property_: _P, object_: _C):
+        """Get a PropertyAssertion axiom for the specified subject, property, object
+
+        Args:
+            subject: the subject of the property assertion
+            property_: the property of the property assertion
+            object_: the object of the property assertion
+        """
+        assert isinstance(subject, OWLIndividual)
+
+        self._subject = subject
+        self._property = property_
+        self._object = object_
+
+    def get_subject(self) -> OWLIndividual:
+        return self._subject
+
+    def get_property(self) -> _P:
+        return self._property
+
+    def get_object(self) -> _C:
+        return self._object
+
+    def __eq__(self, other):
+        if type(other) is type(self):
+            return self._subject == other._subject and self._property == other._property and \
+                self._object == other._object
+        return NotImplemented
+
+    def __hash__(self):
+        return hash((self._subject, self._property, self._object))
+
+    def __repr__(self):
+        return f'{type(self).__name__}({self._subject},{self._property},{self._object})'
+
+
+class OWLObjectPropertyAssertionAxiom(OWLPropertyAssertionAxiom[OWLObjectPropertyExpression, OWLIndividual]):
+    """Represents an ObjectPropertyAssertion axiom in the OWL 2 specification."""
+    __slots__ = ()
+
+    def __init__(self, subject: OWLIndividual, property_: OWLObjectPropertyExpression, object_: OWLIndividual):
+        super().__init__(subject, property_, object_)
+
+
+class OWLDataPropertyAssertionAxiom(OWLPropertyAssertionAxiom[OWLDataPropertyExpression, OWLLiteral]):
+    """Represents a DataPropertyAssertion axiom in the OWL 2 specification."""
+    __slots__ = ()
+
+    def __init__(self, subject: OWLIndividual, property_: OWLDataPropertyExpression, object_: OWLLiteral):
+        super().__init__(subject, property_, object_)
+
+
 class OWLAnnotationAxiom(OWLAxiom, metaclass=ABCMeta):
     """A super interface for annotation axioms."""
     __slots__ = ()
@@ -2549,6 +2657,20 @@ class OWLOntologyManager(metaclass=ABCMeta):
         """
         pass
 
+    @abstractmethod
+    def remove_axiom(self, ontology: OWLOntology, axiom: OWLAxiom):
+        """A convenience method that removes a single axiom from an ontology. The appropriate RemoveAxiom change object
+        is automatically generated.
+
+        Args:
+            ontology: The ontology to remove the axiom from.
+            axiom: The axiom to be removed
+
+        Raises:
+            ChangeApplied.UNSUCCESSFULLY: if the axiom could not be removed.
+        """
+        pass
+
     @abstractmethod
     def save_ontology(self, ontology: OWLOntology, document_iri: IRI):
         """Saves the specified ontology, using the specified document IRI to determine where/how the ontology should be
@@ -111,6 +111,10 @@ class IRI(OWLAnnotationSubject, OWLAnnotationValue, metaclass=_meta_IRI):
     def __hash__(self):
         return hash((self._namespace, self._remainder))
 
+    def __reduce__(self):
+        # go through the constructor, the namespace must be interned and the IRI cached
+        return IRI, (self._namespace, self._remainder)
+
     def is_nothing(self):
         """Determines if this IRI is equal to the IRI that owl:Nothing is named with.
 
@@ -4,7 +4,7 @@ from datetime import date, datetime
 from enum import Enum, auto
 from itertools import chain
 from types import MappingProxyType
-from typing import Iterable, Set, Final, cast
+from typing import Iterable, Set, Final, Optional, cast
 
 import owlready2
 from owlready2 import declare_datatype
@@ -17,7 +17,8 @@ from owlapy.model import OWLObjectPropertyRangeAxiom, OWLOntologyManager, OWLDat
     OWLOntologyChange, AddImport, OWLEquivalentClassesAxiom, OWLThing, OWLAnnotationAssertionAxiom, DoubleOWLDatatype, \
     OWLObjectInverseOf, BooleanOWLDatatype, IntegerOWLDatatype, DateOWLDatatype, DateTimeOWLDatatype, OWLClass, \
     DurationOWLDatatype, StringOWLDatatype, IRI, OWLDataPropertyRangeAxiom, OWLDataPropertyDomainAxiom, OWLLiteral, \
-    OWLObjectPropertyDomainAxiom, OWLSubClassOfAxiom
+    OWLObjectPropertyDomainAxiom, OWLSubClassOfAxiom, OWLClassAssertionAxiom, OWLObjectPropertyAssertionAxiom, \
+    OWLDataPropertyAssertionAxiom, OWLPropertyAssertionAxiom
 from owlapy.owlready2.utils import FromOwlready2, ToOwlready2
 
 logger = logging.getLogger(__name__)
@@ -140,9 +141,82 @@ class OWLOntologyManager_Owlready2(OWLOntologyManager):
                 o_x = self._world[axiom.get_value().as_iri().as_str()]
                 assert o_x is not None, f'{axiom.get_value()} not found in {ontology}'
                 setattr(sub_x, prop_x.python_name, o_x)
+        elif isinstance(axiom, OWLClassAssertionAxiom):
+            ind_x = self._individual_x(ont_x, axiom.get_individual())
+            c_x = conv.map_concept(axiom.get_class_expression())
+            with ont_x:
+                if c_x not in ind_x.is_a:
+                    ind_x.is_a.append(c_x)
+        elif isinstance(axiom, OWLPropertyAssertionAxiom):
+            values_x, o_x = self._property_assertion_x(ont_x, axiom)
+            with ont_x:
+                if o_x not in values_x:
+                    values_x.append(o_x)
         else:
-            # TODO XXX
-            raise NotImplementedError
+            raise NotImplementedError(f'Adding {type(axiom).__name__} axioms is not supported by Owlready2 ({axiom})')
+
+    def remove_axiom(self, ontology: OWLOntology, axiom: OWLAxiom):
+        conv = ToOwlready2(self._world)
+        ont_x: owlready2.namespace.Ontology = conv.map_object(ontology)
+
+        # removing an assertion about an individual that does not exist does nothing, in particular it does not create
+        # the individual
+        if isinstance(axiom, OWLClassAssertionAxiom):
+            ind_x = self._individual_x(ont_x, axiom.get_individual(), create=False)
+            c_x = conv.map_concept(axiom.get_class_expression())
+            if ind_x is not None and c_x in ind_x.is_a:
+                with ont_x:
+                    ind_x.is_a.remove(c_x)
+        elif isinstance(axiom, OWLPropertyAssertionAxiom):
+            assertion_x = self._property_assertion_x(ont_x, axiom, create=False)
+            if assertion_x is not None:
+                values_x, o_x = assertion_x
+                with ont_x:
+                    if o_x in values_x:
+                        values_x.remove(o_x)
+        else:
+            raise NotImplementedError(f'Removing {type(axiom).__name__} axioms is not supported by Owlready2 '
+                                      f'({axiom}), only class and property assertions can be removed')
+
+    def _individual_x(self, ont_x: owlready2.namespace.Ontology, ind: OWLNamedIndividual, create: bool = True) \
+            -> Optional[owlready2.Thing]:
+        """The Owlready2 individual, which is created in ont_x if it does not exist yet and create is set, otherwise
+        None"""
+        ind_x = self._world[ind.get_iri().as_str()]
+        if ind_x is None and create:
+            with ont_x:
+                ind_x = owlready2.Thing(ind.get_iri().get_remainder(),
+                                        namespace=ont_x.get_namespace(ind.get_iri().get_namespace()))
+        return ind_x
+
+    def _property_assertion_x(self, ont_x: owlready2.namespace.Ontology, axiom: OWLPropertyAssertionAxiom,
+                              create: bool = True):
+        """The Owlready2 list of values of the subject of a property assertion and the Owlready2 object to add to or
+        remove from it
+
+        Args:
+            create: whether the individuals of the assertion are created if they do not exist yet. If not set, None is
+                returned if one of them does not exist
+        """
+        subject = axiom.get_subject()
+        pe = axiom.get_property()
+        if isinstance(axiom, OWLObjectPropertyAssertionAxiom):
+            object_ = axiom.get_object()
+            if isinstance(pe, OWLObjectInverseOf):
+                pe = pe.get_named_property()
+                subject, object_ = object_, subject
+            o_x = self._individual_x(ont_x, object_, create)
+        elif isinstance(axiom, OWLDataPropertyAssertionAxiom):
+            o_x = axiom.get_object().to_python()
+        else:
+            raise NotImplementedError(f'{type(axiom).__name__} axioms are not supported by Owlready2 ({axiom})')
+        s_x = self._individual_x(ont_x, subject, create)
+        if s_x is None or o_x is None:
+            return None
+        p_x = self._world[pe.get_iri().as_str()]
+        assert p_x is not None, f'{pe} not found in {ont_x}'
+        # indexing the property always gives a list of values, also for functional properties
+        return p_x[s_x], o_x
 
     def save_ontology(self, ontology: OWLOntology, document_iri: IRI):
         ont_x: owlready2.namespace.Ontology = self._world.get_ontology(
@@ -0,0 +1,107 @@
+"""Bulk reading of property assertions from the Owlready2 quadstore"""
+from typing import Dict, List, Tuple
+
+import numpy as np
+import owlready2
+
+from owlapy.abox_index import IndividualIndex
+from owlapy.model import OWLDataProperty, OWLLiteral, OWLNamedIndividual, OWLObjectProperty, IRI
+from owlapy.owlready2 import OWLOntology_Owlready2
+
+_SQL_BATCH = 500
+
+
+class BulkLoader_Owlready2:
+    """Reads all assertions of a property in one SQL query on the quadstore of the ontology's world
+
+    Individuals are identified by their storid, which is mapped to the ids of an `IndividualIndex`. Owlready2 entities
+    are never created for individuals that are already in the index, and an OWLNamedIndividual is only created once
+    for each individual that is not.
+    """
+    __slots__ = '_ontology', '_index', '_storid_ids', '_iri_ids'
+
+    _ontology: OWLOntology_Owlready2
+    _index: IndividualIndex
+    _storid_ids: Dict[int, int]  # storid => id in the index, or -1 if the storid is no individual
+    _iri_ids: Dict[str, int]  # iri => id in the index, for the individuals which have no known storid yet
+
+    def __init__(self, ontology: OWLOntology_Owlready2, index: IndividualIndex):
+        """Create a new bulk loader
+
+        Args:
+            ontology: the ontology, all assertions of its world are read
+            index: index to map the individuals to
+        """
+        self._ontology = ontology
+        self._index = index
+        self._storid_ids = dict()
+        self._iri_ids = {index.individual(i).get_iri().as_str(): i for i in range(len(index))}
+
+    @property
+    def index(self) -> IndividualIndex:
+        return self._index
+
+    def _map_storids(self, storids: np.ndarray) -> np.ndarray:
+        """Map storids to ids of the index, or -1 for storids which are no individual"""
+        unique, inverse = np.unique(storids, return_inverse=True)
+        unknown = [s for s in unique.tolist() if s not in self._storid_ids]
+        world = self._ontology._world
+        for k in range(0, len(unknown), _SQL_BATCH):
+            batch = unknown[k:k + _SQL_BATCH]
+            iris = dict(world.graph.execute("SELECT storid, iri FROM resources WHERE storid IN (%s)"
+                                            % ",".join("?" * len(batch)), batch))
+            for s in batch:
+                iri = iris.get(s)
+                i = -1
+                if iri is not None:
+                    i = self._iri_ids.pop(iri, -1)
+                    if i < 0 and isinstance(world._get_by_storid(s), owlready2.Thing):
+                        i = self._index.add(OWLNamedIndividual(IRI.create(iri)))
+                self._storid_ids[s] = i
+        ids = np.fromiter((self._storid_ids[s] for s in unique.tolist()), dtype=np.int64, count=len(unique))
+        return ids[inverse.reshape(-1)]
+
+    def object_property_edges(self, pe: OWLObjectProperty) -> Tuple[np.ndarray, np.ndarray]:
+        """All assertions of an object property (including those of an Owlready2 inverse property) between individuals
+
+        Args:
+            pe: the object property
+
+        Returns:
+            ids of the subjects and ids of the objects
+        """
+        p_x: owlready2.ObjectProperty = self._ontology._world[pe.get_iri().as_str()]
+        graph = self._ontology._world.graph
+        rows = graph.execute("SELECT s, o FROM objs WHERE p = ?", (p_x.storid,)).fetchall()
+        if p_x._inverse_storid:
+            rows.extend(graph.execute("SELECT o, s FROM objs WHERE p = ?", (p_x._inverse_storid,)))
+        edges = np.array(rows, dtype=np.int64).reshape(-1, 2)
+        ids = self._map_storids(edges.reshape(-1)).reshape(-1, 2)
+        ids = ids[(ids >= 0).all(axis=1)]
+        return ids[:, 0], ids[:, 1]
+
+    def data_property_assertions(self, pe: OWLDataProperty) -> Tuple[List[OWLLiteral], np.ndarray, np.ndarray]:
+        """All assertions of a data property on individuals
+
+        Args:
+            pe: the data property
+
+        Returns:
+            the distinct values, the position in these values of the value of each assertion and the id of the subject
+            of each assertion
+        """
+        p_x: owlready2.DataProperty = self._ontology._world[pe.get_iri().as_str()]
+        rows = self._ontology._world.graph.execute("SELECT s, o, d FROM datas WHERE p = ?", (p_x.storid,)).fetchall()
+        subjects = self._map_storids(np.fromiter((r[0] for r in rows), dtype=np.int64, count=len(rows)))
+
+        to_python = self._ontology._onto._to_python
+        raw_ids: Dict[Tuple, int] = dict()  # (o, d) => position of the literal
+        literal_ids: Dict[OWLLiteral, int] = dict()
+        value_ids = np.empty(len(rows), dtype=np.int64)
+        for k, (_, o, d) in enumerate(rows):
+            i = raw_ids.get((o, d))
+            if i is None:
+                i = raw_ids[(o, d)] = literal_ids.setdefault(OWLLiteral(to_python(o, d)), len(literal_ids))
+            value_ids[k] = i
+        keep = subjects >= 0
+        return list(literal_ids), value_ids[keep], subjects[keep]
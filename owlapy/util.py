@@ -1,5 +1,8 @@
+import heapq
+import sys
 from functools import singledispatchmethod, total_ordering
-from typing import Iterable, TypeVar, Generic, Tuple, cast, Optional
+from typing import Callable, Dict, FrozenSet, Iterable, List, Set, TypeVar, Generic, Tuple, Union, cast, Optional
+from weakref import WeakValueDictionary
 
 from owlapy.model import OWLObject, HasIndex, HasIRI, OWLClassExpression, OWLClass, OWLObjectIntersectionOf, \
     OWLObjectUnionOf, OWLObjectComplementOf, OWLNothing, OWLRestriction, OWLThing, OWLObjectSomeValuesFrom, \
@@ -7,7 +10,7 @@ from owlapy.model import OWLObject, HasIndex, HasIRI, OWLClassExpression, OWLCla
     OWLObjectOneOf, OWLDataMaxCardinality, OWLDataMinCardinality, OWLDataExactCardinality, OWLDataHasValue, \
     OWLDataAllValuesFrom, OWLDataSomeValuesFrom, OWLObjectAllValuesFrom, HasFiller, HasCardinality, HasOperands, \
     OWLObjectInverseOf, OWLDatatypeRestriction, OWLDataComplementOf, OWLDatatype, OWLDataUnionOf, \
-    OWLDataIntersectionOf, OWLDataOneOf, OWLFacetRestriction, OWLLiteral
+    OWLDataIntersectionOf, OWLDataOneOf, OWLFacetRestriction, OWLLiteral, OWLEntity, OWLDataRange
 
 _HasIRI = TypeVar('_HasIRI', bound=HasIRI)  #:
 _HasIndex = TypeVar('_HasIndex', bound=HasIndex)  #:
@@ -281,6 +284,213 @@ def iter_count(i: Iterable) -> int:
     return sum(1 for _ in i)
 
 
+def class_expression_signature(ce: Union[OWLClassExpression, OWLDataRange]) -> FrozenSet[OWLEntity]:
+    """The classes, properties, individuals and datatypes occurring in a class expression or data range
+
+    Args:
+        ce: class expression or data range
+
+    Returns:
+        the named entities used in ce
+    """
+    signature = set()
+    stack = [ce]
+    while stack:
+        o = stack.pop()
+        if isinstance(o, OWLEntity):
+            signature.add(o)
+        elif isinstance(o, OWLObjectInverseOf):
+            stack.append(o.get_named_property())
+        elif isinstance(o, OWLObjectComplementOf):
+            stack.append(o.get_operand())
+        elif isinstance(o, OWLDataComplementOf):
+            stack.append(o.get_data_range())
+        elif isinstance(o, OWLDatatypeRestriction):
+            stack.append(o.get_datatype())
+        elif isinstance(o, HasOperands):
+            stack.extend(o.operands())
+        else:
+            if isinstance(o, OWLRestriction):
+                stack.append(o.get_property())
+            if isinstance(o, HasFiller):
+                stack.append(o.get_filler())
+    return frozenset(signature)
+
+
+def _class_expression_operands(ce: OWLClassExpression) -> Iterable[OWLClassExpression]:
+    if isinstance(ce, OWLObjectComplementOf):
+        return ce.get_operand(),
+    elif isinstance(ce, (OWLObjectIntersectionOf, OWLObjectUnionOf)):
+        return ce.operands()
+    elif isinstance(ce, HasFiller) and isinstance(ce.get_filler(), OWLClassExpression):
+        return ce.get_filler(),
+    return ()
+
+
+def shared_subexpressions(ces: Iterable[OWLClassExpression]) -> List[OWLClassExpression]:
+    """The complex class expressions that occur more than once in a batch of class expressions
+
+    The batch is seen as a DAG of its distinct subexpressions. A subexpression is shared if it is a class expression
+    of the batch or an operand or filler of another distinct subexpression more than once.
+
+    Args:
+        ces: class expressions
+
+    Returns:
+        the shared subexpressions, every one after the shared subexpressions it contains
+    """
+    counts: Dict[OWLClassExpression, int] = dict()
+    post_order: List[OWLClassExpression] = []
+    for ce in ces:
+        stack = [(ce, False)]
+        while stack:
+            o, expanded = stack.pop()
+            if expanded:
+                post_order.append(o)
+            elif o in counts:
+                counts[o] += 1
+            else:
+                counts[o] = 1
+                stack.append((o, True))
+                stack.extend((op, False) for op in reversed(list(_class_expression_operands(o))))
+    return [o for o in post_order if counts[o] > 1 and not isinstance(o, OWLClass)]
+
+
+class _HashConsed:
+    """Mixin of the interned class expressions created by `hash_cons`
+
+    Structurally equal interned expressions are the same object, so equality is identity and the structural hash is
+    computed once.
+    """
+    __slots__ = ()
+
+    _hash: int
+    _base: type
+    _fields: Tuple[str, ...]
+
+    # the components are set by hash_cons, calling the class (e.g. with type(ce)(...)) interns a new expression
+    def __new__(cls, *args, **kwargs):
+        return hash_cons(cls._base(*args, **kwargs))
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if isinstance(other, _HashConsed):
+            return False
+        if type(other) is self._base:
+            return all(getattr(self, f) == getattr(other, f) for f in self._fields)
+        return NotImplemented
+
+    def __hash__(self):
+        return self._hash
+
+    def __repr__(self):
+        return repr(self._base(*self._args()))
+
+    def __reduce__(self):
+        # the cached hash is not valid in another interpreter
+        return hash_cons, (self._base(*self._args()),)
+
+    def _args(self):
+        return tuple(getattr(self, f) for f in self._fields)
+
+
+class _HashConsedObjectIntersectionOf(_HashConsed, OWLObjectIntersectionOf):
+    __slots__ = '_hash',
+    _base = OWLObjectIntersectionOf
+    _fields = '_operands',
+
+
+class _HashConsedObjectUnionOf(_HashConsed, OWLObjectUnionOf):
+    __slots__ = '_hash',
+    _base = OWLObjectUnionOf
+    _fields = '_operands',
+
+
+class _HashConsedObjectComplementOf(_HashConsed, OWLObjectComplementOf):
+    __slots__ = '_hash',
+    _base = OWLObjectComplementOf
+    _fields = '_operand',
+
+
+class _HashConsedObjectSomeValuesFrom(_HashConsed, OWLObjectSomeValuesFrom):
+    __slots__ = '_hash',
+    _base = OWLObjectSomeValuesFrom
+    _fields = '_property', '_filler'
+
+
+class _HashConsedObjectAllValuesFrom(_HashConsed, OWLObjectAllValuesFrom):
+    __slots__ = '_hash',
+    _base = OWLObjectAllValuesFrom
+    _fields = '_property', '_filler'
+
+
+class _HashConsedObjectHasValue(_HashConsed, OWLObjectHasValue):
+    __slots__ = '_hash',
+    _base = OWLObjectHasValue
+    _fields = '_property', '_v'
+
+
+class _HashConsedObjectMinCardinality(_HashConsed, OWLObjectMinCardinality):
+    __slots__ = '_hash',
+    _base = OWLObjectMinCardinality
+    _fields = '_cardinality', '_property', '_filler'
+
+
+class _HashConsedObjectMaxCardinality(_HashConsed, OWLObjectMaxCardinality):
+    __slots__ = '_hash',
+    _base = OWLObjectMaxCardinality
+    _fields = '_cardinality', '_property', '_filler'
+
+
+class _HashConsedObjectExactCardinality(_HashConsed, OWLObjectExactCardinality):
+    __slots__ = '_hash',
+    _base = OWLObjectExactCardinality
+    _fields = '_cardinality', '_property', '_filler'
+
+
+_hash_consed_types: Dict[type, type] = {t._base: t for t in (
+    _HashConsedObjectIntersectionOf, _HashConsedObjectUnionOf, _HashConsedObjectComplementOf,
+    _HashConsedObjectSomeValuesFrom, _HashConsedObjectAllValuesFrom, _HashConsedObjectHasValue,
+    _HashConsedObjectMinCardinality, _HashConsedObjectMaxCardinality, _HashConsedObjectExactCardinality)}
+# (type, components) => interned expression. The components of an interned expression are interned, so the key is
+# hashed and compared in the number of its direct components
+_hash_consed: 'WeakValueDictionary[Tuple, OWLClassExpression]' = WeakValueDictionary()
+
+
+def hash_cons(ce: _O) -> _O:
+    """Intern a class expression: structurally equal interned expressions are the same object
+
+    The interned expressions cache their hash and compare by identity with each other, so that looking them up in
+    dictionaries does not depend on their depth. They are equal to (and hash like) the corresponding plain expressions.
+    Named classes, data restrictions and other OWL objects are returned as they are.
+
+    Args:
+        ce: class expression
+
+    Returns:
+        the interned class expression
+    """
+    t = type(ce)
+    consed_type = _hash_consed_types.get(t)
+    if consed_type is None:
+        return ce
+    args = tuple(tuple(map(hash_cons, v)) if type(v) is tuple else hash_cons(v)
+                 for v in map(ce.__getattribute__, consed_type._fields))
+    key = (t,) + args
+    ret = _hash_consed.get(key)
+    if ret is None:
+        ret = object.__new__(consed_type)
+        for f, v in zip(consed_type._fields, args):
+            setattr(ret, f, v)
+        ret._hash = t.__hash__(ret)
+        _hash_consed[key] = ret
+    return ret
+
+
 def as_index(o: OWLObject) -> HasIndex:
     """Cast OWL Object to HasIndex"""
     i = cast(HasIndex, o)
@@ -298,7 +508,7 @@ class LRUCache(Generic[_K, _V]):
         from _thread import RLock
 
         self.cache = {}
-        self.hits = self.misses = 0
+        self.hits = self.misses = self.evictions = 0
         self.full = False
         self.cache_get = self.cache.get  # bound method to lookup a key or return None
         self.cache_len = self.cache.__len__  # get cache size without calling len()
@@ -355,6 +565,8 @@ class LRUCache(Generic[_K, _V]):
                 self.root[LRUCache.KEY] = self.root[LRUCache.RESULT] = None
                 # Now update the cache dictionary.
                 del self.cache[oldkey]
+                self.evictions += 1
+                self._removed(oldkey)
                 # Save the potentially reentrant cache[key] assignment
                 # for last, after the root and links have been put in
                 # a consistent state.
@@ -369,17 +581,240 @@ class LRUCache(Generic[_K, _V]):
                 if self.maxsize is not None:
                     self.full = (self.cache_len() >= self.maxsize)
 
+    def discard_if(self, predicate: Callable[[_K], bool]) -> int:
+        """Remove all entries whose key satisfies a predicate
+
+        Args:
+            predicate: function of the key
+
+        Returns:
+            number of removed entries
+        """
+        with self.lock:
+            keys = [key for key in self.cache if predicate(key)]
+            for key in keys:
+                self.discard(key)
+            return len(keys)
+
+    def discard(self, key: _K) -> bool:
+        """Remove an entry
+
+        Args:
+            key: key of the entry
+
+        Returns:
+            whether the entry was cached
+        """
+        with self.lock:
+            link = self.cache.pop(key, None)
+            if link is None:
+                return False
+            link_prev, link_next, _key, _result = link
+            link_prev[LRUCache.NEXT] = link_next
+            link_next[LRUCache.PREV] = link_prev
+            self.full = False
+            self._removed(key)
+            return True
+
+    def _removed(self, key: _K):
+        """Called after the entry of key was evicted or discarded"""
+        pass
+
+    def items(self) -> List[Tuple[_K, _V]]:
+        """The entries of the cache, from the least to the most recently used one, so that adding them to an empty
+        cache in this order restores it"""
+        with self.lock:
+            items = []
+            link = self.root[LRUCache.NEXT]
+            while link is not self.root:
+                items.append((link[LRUCache.KEY], link[LRUCache.RESULT]))
+                link = link[LRUCache.NEXT]
+            return items
+
     def cache_info(self):
         """Report cache statistics"""
         with self.lock:
             from collections import namedtuple
-            return namedtuple("CacheInfo", ["hits", "misses", "maxsize", "currsize"])(
-                self.hits, self.misses, self.maxsize, self.cache_len())
+            return namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxsize", "currsize"])(
+                self.hits, self.misses, self.evictions, self.maxsize, self.cache_len())
 
     def cache_clear(self):
         """Clear the cache and cache statistics"""
         with self.lock:
             self.cache.clear()
             self.root[:] = [self.root, self.root, None, None]
-            self.hits = self.misses = 0
+            self.hits = self.misses = self.evictions = 0
             self.full = False
+
+
+class SignatureLRUCache(LRUCache[OWLClassExpression, _V]):
+    """LRU cache keyed by class expressions that indexes its entries by the entities in their signature, so that the
+    entries depending on an entity can be dropped without clearing the whole cache"""
+
+    def __init__(self, maxsize: Optional[int] = None):
+        super().__init__(maxsize)
+        self.dependents: Dict[OWLEntity, Set[OWLClassExpression]] = {}  # entity => keys using the entity
+
+    def __setitem__(self, key: OWLClassExpression, value: _V):
+        with self.lock:
+            if key not in self.cache:
+                for entity in class_expression_signature(key):
+                    self.dependents.setdefault(entity, set()).add(key)
+            super().__setitem__(key, value)
+
+    def _removed(self, key: OWLClassExpression):
+        for entity in class_expression_signature(key):
+            keys = self.dependents.get(entity)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self.dependents[entity]
+
+    def discard_dependents(self, entities: Iterable[OWLEntity]) -> int:
+        """Remove all entries whose class expression uses one of the entities
+
+        Args:
+            entities: classes, properties, individuals or datatypes
+
+        Returns:
+            number of removed entries
+        """
+        with self.lock:
+            keys = set()
+            for entity in entities:
+                keys.update(self.dependents.get(entity, ()))
+            for key in keys:
+                self.discard(key)
+            return len(keys)
+
+    def cache_clear(self):
+        with self.lock:
+            super().cache_clear()
+            self.dependents.clear()
+
+
+class CostAwareCache(Generic[_K, _V]):
+    """Cache that is bounded by the total size of its values and evicts by cost (GreedyDual-Size-Frequency)
+
+    Every entry has the priority L + frequency * cost / size, where L is the priority of the last evicted entry. The
+    entry with the lowest priority is evicted first, so that big, cheap to recompute and rarely used entries go before
+    small and expensive ones, while L ages out entries that are no longer used.
+    """
+    sentinel = object()  # unique object used to signal cache misses
+    PRIORITY, FREQUENCY, COST, SIZE, RESULT = 0, 1, 2, 3, 4  # names for the entry fields
+
+    def __init__(self, maxbytes: int, sizeof: Callable[[_V], int] = sys.getsizeof):
+        """Create a new cache
+
+        Args:
+            maxbytes: upper bound on the sum of the sizes of all cached values
+            sizeof: function to estimate the retained size of a value in bytes
+        """
+        from _thread import RLock
+
+        self.cache: Dict[_K, list] = {}
+        self.heap: List[Tuple[float, int, _K]] = []  # (priority, counter, key), may contain outdated priorities
+        self.counter = 0
+        self.age = 0.0  # L
+        self.hits = self.misses = self.evictions = 0
+        self.currbytes = 0
+        self.maxbytes = maxbytes
+        self.sizeof = sizeof
+        self.lock = RLock()
+
+    def __contains__(self, item: _K) -> bool:
+        with self.lock:
+            if item in self.cache:
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def __getitem__(self, item: _K) -> _V:
+        with self.lock:
+            entry = self.cache.get(item)
+            if entry is not None:
+                entry[CostAwareCache.FREQUENCY] += 1
+                self._push(item, entry)
+                return entry[CostAwareCache.RESULT]
+
+    def __setitem__(self, key: _K, value: _V):
+        self.put(key, value)
+
+    def __len__(self) -> int:
+        return len(self.cache)
+
+    def put(self, key: _K, value: _V, cost: float = 1.0):
+        """Store a value
+
+        Args:
+            key: key of the value
+            value: the value
+            cost: cost to recompute the value, for example the time it took
+        """
+        size = max(1, self.sizeof(value))
+        if size > self.maxbytes:
+            return
+        with self.lock:
+            if key in self.cache:
+                return
+            while self.currbytes + size > self.maxbytes:
+                self._evict()
+            entry = [0.0, 1, cost, size, value]
+            self.cache[key] = entry
+            self.currbytes += size
+            self._push(key, entry)
+
+    def _push(self, key: _K, entry: list):
+        entry[CostAwareCache.PRIORITY] = self.age + \
+            entry[CostAwareCache.FREQUENCY] * entry[CostAwareCache.COST] / entry[CostAwareCache.SIZE]
+        self.counter += 1
+        heapq.heappush(self.heap, (entry[CostAwareCache.PRIORITY], self.counter, key))
+        if len(self.heap) > 2 * len(self.cache) + 64:
+            # drop outdated heap items
+            self.heap = [item for item in self.heap
+                         if item[2] in self.cache and self.cache[item[2]][CostAwareCache.PRIORITY] == item[0]]
+            heapq.heapify(self.heap)
+
+    def _evict(self):
+        while True:
+            priority, _, key = heapq.heappop(self.heap)
+            entry = self.cache.get(key)
+            if entry is not None and entry[CostAwareCache.PRIORITY] == priority:
+                break
+        del self.cache[key]
+        self.currbytes -= entry[CostAwareCache.SIZE]
+        self.age = priority
+        self.evictions += 1
+
+    def discard_if(self, predicate: Callable[[_K], bool]) -> int:
+        """Remove all entries whose key satisfies a predicate
+
+        Args:
+            predicate: function of the key
+
+        Returns:
+            number of removed entries
+        """
+        with self.lock:
+            keys = [key for key in self.cache if predicate(key)]
+            for key in keys:
+                # the heap items of the key are outdated now and skipped on eviction
+                self.currbytes -= self.cache.pop(key)[CostAwareCache.SIZE]
+            return len(keys)
+
+    def cache_info(self):
+        """Report cache statistics"""
+        with self.lock:
+            from collections import namedtuple
+            return namedtuple("CacheInfo", ["hits", "misses", "evictions", "maxbytes", "currbytes", "currsize"])(
+                self.hits, self.misses, self.evictions, self.maxbytes, self.currbytes, len(self.cache))
+
+    def cache_clear(self):
+        """Clear the cache and cache statistics"""
+        with self.lock:
+            self.cache.clear()
+            self.heap.clear()
+            self.age = 0.0
+            self.hits = self.misses = self.evictions = 0
+            self.currbytes = 0
@@ -1,7 +1,14 @@
 """ Test the base module"""
-# import os
+import os
 
 from ontolearn.knowledge_base import KnowledgeBase
+from ontolearn.learning_problem import EncodedPosNegLPStandard, PosNegLPStandard
+from ontolearn.metrics import Accuracy, F1
+from owlapy.abox_index import IndividualBitSet
+from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
+from owlapy.owlready2 import OWLOntologyManager_Owlready2, OWLReasoner_Owlready2
+from owlapy.model import IRI, OWLClass, OWLClassAssertionAxiom, OWLNamedIndividual, OWLObjectProperty, \
+    OWLObjectPropertyAssertionAxiom, OWLObjectSomeValuesFrom, OWLObjectIntersectionOf, OWLObjectUnionOf
 from ontolearn.utils import setup_logging
 
 setup_logging("ontolearn/logging_test.conf")
@@ -29,6 +36,124 @@ def test_multiple_knowledge_bases():
     # (that refers to the family ontology)
 
 
+def test_knowledge_base_index(tmp_path):
+    index_path = os.path.join(tmp_path, 'father.idx')
+    kb = KnowledgeBase(path=PATH_FATHER, index_path=index_path)
+    assert os.path.exists(index_path)
+    kb_loaded = KnowledgeBase(path=PATH_FATHER, index_path=index_path)
+    for c in kb.ontology().classes_in_signature():
+        assert kb.individuals_set(c) == kb_loaded.individuals_set(c)
+
+
+def test_knowledge_base_update_assertions():
+    NS = "http://example.com/father#"
+    kb = KnowledgeBase(path=PATH_FATHER)
+    female = OWLClass(IRI(NS, 'female'))
+    has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+    mother = OWLObjectSomeValuesFrom(has_child, OWLClass(IRI(NS, 'person')))
+    heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+    anna = OWLNamedIndividual(IRI(NS, 'anna'))
+    assert heinz not in kb.individuals_set(mother)
+    kb.individuals_set(female)
+
+    kb.add_assertions([OWLObjectPropertyAssertionAxiom(heinz, has_child, anna)])
+    assert heinz in kb.individuals_set(mother)
+    # the instances of female are still cached
+    assert female in kb._ind_cache.cache
+
+    tom = OWLNamedIndividual(IRI(NS, 'tom'))
+    kb.add_assertions([OWLClassAssertionAxiom(tom, female)])
+    assert tom in kb.individuals_set(female)
+    assert tom in kb.all_individuals_set()
+
+    kb.remove_assertions([OWLClassAssertionAxiom(tom, female)])
+    assert tom not in kb.individuals_set(female)
+
+    # removing assertions about an unknown individual neither adds it nor drops all cached instances
+    individuals = frozenset(kb.individuals())
+    kb.individuals_set(female)
+    ghost = OWLNamedIndividual(IRI(NS, 'ghost'))
+    kb.remove_assertions([OWLClassAssertionAxiom(ghost, OWLClass(IRI(NS, 'male'))),
+                          OWLObjectPropertyAssertionAxiom(ghost, has_child, anna)])
+    assert frozenset(kb.individuals()) == individuals
+    assert female in kb._ind_cache.cache
+
+def test_knowledge_base_copy_individuals_cache():
+    NS = "http://example.com/father#"
+    kb = KnowledgeBase(path=PATH_FATHER)
+    female = OWLClass(IRI(NS, 'female'))
+    male = OWLClass(IRI(NS, 'male'))
+    heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+    kb.individuals_set(female)
+    kb.individuals_set(male)
+
+    copy = kb.ignore_and_copy(ignored_classes=[male])
+    # the copy starts with the entries of kb that do not use ignored classes, in its own cache
+    assert copy._ind_cache is not kb._ind_cache
+    assert female in copy._ind_cache.cache
+    assert male not in copy._ind_cache.cache
+    copy.clean()
+    assert female in kb._ind_cache.cache
+
+    copy.individuals_set(female)
+    copy.add_assertions([OWLClassAssertionAxiom(heinz, female)])
+    assert female not in kb._ind_cache.cache
+    assert female not in copy._ind_cache.cache
+    assert heinz in kb.individuals_set(female)
+    assert heinz in copy.individuals_set(female)
+
+
+def test_score_bitsets():
+    NS = "http://example.com/father#"
+    onto = OWLOntologyManager_Owlready2().load_ontology(IRI.create('file://' + PATH_FATHER))
+    base_reasoner = OWLReasoner_Owlready2(onto)
+    kb = KnowledgeBase(ontology=onto, reasoner=OWLReasoner_FastInstanceChecker(onto, base_reasoner))
+    kb_bits = KnowledgeBase(ontology=onto, reasoner=OWLReasoner_FastInstanceChecker(onto, base_reasoner,
+                                                                                    bitsets=True))
+    pos = {OWLNamedIndividual(IRI(NS, name)) for name in ('stefan', 'markus', 'martin')}
+    neg = {OWLNamedIndividual(IRI(NS, name)) for name in ('heinz', 'anna', 'michelle')}
+    lp = PosNegLPStandard(pos=pos, neg=neg)
+    encoded = kb.encode_learning_problem(lp)
+    encoded_bits = kb_bits.encode_learning_problem(lp)
+
+    for c in onto.classes_in_signature():
+        instances = kb_bits.individuals_set(c)
+        assert isinstance(instances, IndividualBitSet)
+        assert encoded.coverage(kb.individuals_set(c)) == encoded_bits.coverage(instances)
+        for quality_func in (F1(), Accuracy()):
+            assert quality_func.score_elp(kb.individuals_set(c), encoded) == \
+                quality_func.score_elp(instances, encoded_bits)
+
+    # examples that are not individuals of the index are counted on sets, without interning them
+    index = kb_bits.reasoner()._ind_index
+    size = len(index)
+    ghost = OWLNamedIndividual(IRI(NS, 'ghost'))
+    male = OWLClass(IRI(NS, 'male'))
+    kb_pos = encoded_bits.kb_pos | {ghost}
+    encoded_ghost = EncodedPosNegLPStandard(kb_pos, encoded_bits.kb_neg, encoded_bits.kb_diff, encoded_bits.kb_all,
+                                            index)
+    assert len(index) == size
+    assert encoded_ghost.coverage(kb_bits.individuals_set(male)) == encoded_bits.coverage(kb.individuals_set(male))
+    assert encoded_ghost.coverage(frozenset(kb_bits.individuals_set(male)) | {ghost}) == (4, 1)
+
+
+def test_evaluate_concepts():
+    NS = "http://example.com/father#"
+    kb = KnowledgeBase(path=PATH_FATHER)
+    pos = {OWLNamedIndividual(IRI(NS, name)) for name in ('stefan', 'markus', 'martin')}
+    neg = {OWLNamedIndividual(IRI(NS, name)) for name in ('heinz', 'anna', 'michelle')}
+    encoded = kb.encode_learning_problem(PosNegLPStandard(pos=pos, neg=neg))
+    male = OWLClass(IRI(NS, 'male'))
+    has_child = OWLObjectSomeValuesFrom(OWLObjectProperty(IRI(NS, 'hasChild')), male)
+    concepts = [male, OWLObjectIntersectionOf((male, has_child)), OWLObjectUnionOf((male, has_child)), has_child,
+                OWLObjectIntersectionOf((male, has_child))]
+    evaluated = kb.evaluate_concepts(concepts, F1(), encoded)
+    assert len(evaluated) == len(concepts)
+    for c, e in zip(concepts, evaluated):
+        expected = kb.evaluate_concept(c, F1(), encoded)
+        assert (e.q, e.ic, e.inds) == (expected.q, expected.ic, expected.inds)
+
+
 # def test_knowledge_base_save():
 #     kb = KnowledgeBase(path=PATH_FAMILY)
 #     kb.save('test_kb_save', rdf_format='nt')
@@ -1,5 +1,7 @@
 """ Test the default pipeline for structured machine learning"""
 import json
+import os
+import tempfile
 import unittest
 
 from ontolearn.knowledge_base import KnowledgeBase
@@ -9,6 +11,7 @@ from ontolearn.model_adapter import ModelAdapter
 from ontolearn.utils import setup_logging
 from owlapy.model import OWLNamedIndividual, OWLClass, IRI
 from owlapy.render import DLSyntaxObjectRenderer
+from owlapy.util import hash_cons
 
 setup_logging("ontolearn/logging_test.conf")
 
@@ -147,6 +150,117 @@ class Celoe_Test(unittest.TestCase):
         self.assertEqual(q, q2)
         self.assertEqual(str_concept, str_concept2)
 
+    def test_celoe_parallel(self):
+        kb = KnowledgeBase(path=PATH_FAMILY)
+
+        pos = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['positive_examples'])))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['negative_examples'])))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        results = []
+        for n_jobs in (1, 2):
+            model = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=500, n_jobs=n_jobs)
+            model.fit(learning_problem=lp)
+            hypotheses = [(h.concept, h.quality, h.heuristic) for h in model.best_hypotheses(n=5)]
+            results.append((model.number_of_tested_concepts, hypotheses, list(model.search_tree)))
+        # the parallel run gives the same result as the serial one
+        self.assertEqual(results[0], results[1])
+
+    def test_celoe_eliminate_equivalent(self):
+        kb = KnowledgeBase(path=PATH_FAMILY)
+
+        pos = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Aunt']['positive_examples'])))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Aunt']['negative_examples'])))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        model = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=500)
+        model.fit(learning_problem=lp)
+        model_eq = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=500,
+                         eliminate_equivalent=True)
+        model_eq.fit(learning_problem=lp)
+
+        def expanded_with_shorter_equivalent(m: CELOE):
+            shortest = dict()
+            for concept in m.search_tree:
+                inds = kb.individuals_set(concept)
+                shortest[inds] = min(shortest.get(inds, kb.concept_len(concept)), kb.concept_len(concept))
+            return [tn.node for tn in m.search_tree.values()
+                    if tn.node.h_exp > tn.node.len and shortest[kb.individuals_set(tn.node.concept)] < tn.node.len]
+        # the longer equivalent concepts are only expanded as refinements of the shortest one
+        redundant = expanded_with_shorter_equivalent(model_eq)
+        self.assertLess(len(redundant), len(expanded_with_shorter_equivalent(model)))
+        for node in redundant:
+            self.assertTrue(model_eq._is_expanded_equivalent(node))
+            self.assertIn(node, model_eq.heuristic_queue)
+
+        extensions = [kb.individuals_set(h.concept) for h in model_eq.best_hypotheses(n=10)]
+        self.assertEqual(len(extensions), len(set(extensions)))
+        self.assertTrue(model_eq.equivalent_concepts)
+        for concept in model_eq.equivalent_concepts:
+            representative = model_eq.representative_concept(concept)
+            self.assertEqual(kb.individuals_set(concept), kb.individuals_set(representative))
+            self.assertLessEqual(kb.concept_len(representative), kb.concept_len(concept))
+
+    def test_celoe_hash_consing(self):
+        pos = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['positive_examples'])))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['negative_examples'])))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        results = []
+        for hash_consing in (False, True):
+            kb = KnowledgeBase(path=PATH_FAMILY, hash_consing=hash_consing)
+            model = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=500)
+            model.fit(learning_problem=lp)
+            hypotheses = [(h.concept, h.quality, h.heuristic) for h in model.best_hypotheses(n=5)]
+            results.append((model.number_of_tested_concepts, hypotheses, list(model.search_tree)))
+        self.assertEqual(results[0], results[1])
+        # the concepts of the search are interned
+        self.assertTrue(all(hash_cons(c) is c for c in results[1][2]))
+
+    def test_celoe_checkpoint(self):
+        kb = KnowledgeBase(path=PATH_FAMILY)
+
+        pos = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['positive_examples'])))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, settings['problems']['Uncle']['negative_examples'])))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        def state(model):
+            return (model.number_of_tested_concepts, list(model.search_tree),
+                    [(h.concept, h.quality, h.heuristic) for h in model.best_hypotheses(n=10)],
+                    [(n.concept, n.heuristic, n.h_exp) for n in model.heuristic_queue])
+
+        model = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=1000)
+        model.fit(learning_problem=lp)
+        interrupted = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=300)
+        interrupted.fit(learning_problem=lp)
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'checkpoint')
+            interrupted.checkpoint(path)
+            resumed = CELOE(knowledge_base=kb, max_runtime=1, max_num_of_concepts_tested=1000)
+            resumed.resume(path, extra_runtime=1000)
+        # the resumed search continues exactly where the interrupted one stopped
+        self.assertEqual(state(model), state(resumed))
+
+    def test_celoe_fit_many(self):
+        kb = KnowledgeBase(path=PATH_FAMILY)
+
+        problems = []
+        for examples in settings['problems'].values():
+            pos = set(map(OWLNamedIndividual, map(IRI.create, examples['positive_examples'])))
+            neg = set(map(OWLNamedIndividual, map(IRI.create, examples['negative_examples'])))
+            problems.append(PosNegLPStandard(pos=pos, neg=neg))
+
+        model = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=300)
+        expected = []
+        for lp in problems:
+            model.fit(learning_problem=lp)
+            expected.append((lp, [(h.concept, h.quality) for h in model.best_hypotheses(n=3)]))
+
+        self.assertEqual(expected, list(model.fit_many(problems, n=3)))
+        # the workers can not fork their own workers, the refinements are evaluated serially there
+        parallel = CELOE(knowledge_base=kb, max_runtime=1000, max_num_of_concepts_tested=300, n_jobs=2)
+        self.assertEqual(expected, list(parallel.fit_many(iter(problems), n_jobs=2, n=3)))
+
 
 if __name__ == '__main__':
     unittest.main()
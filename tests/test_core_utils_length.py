@@ -98,6 +98,32 @@ class Core_OWLClassExpressionLengthMetric_Test(unittest.TestCase):
         # = 1 hasAge.xsd:integer
         self.assertEqual(le, 4)
 
+    def test_incremental_length(self):
+        NS = "http://example.com/father#"
+
+        cl = OWLClassExpressionLengthMetric.get_default()
+
+        male = OWLClass(IRI.create(NS, 'male'))
+        female = OWLClass(IRI.create(NS, 'female'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+
+        some = OWLObjectSomeValuesFrom(property=has_child, filler=female)
+        self.assertEqual(3, cl.restriction_length(some, 1))
+        # male ⊔ female ⊔ (∃ hasChild.female), built from male ⊔ female and the restriction
+        union = OWLObjectUnionOf((male, female, some))
+        self.assertEqual(7, cl.nary_length(union, (3, 3)))
+        self.assertEqual(7, cl.length(union))
+        inter = OWLObjectIntersectionOf((male, union))
+        self.assertEqual(9, cl.nary_length(inter, (1, 7)))
+
+        fresh = OWLClassExpressionLengthMetric.get_default()
+        for ce in (some, union, inter):
+            self.assertEqual(fresh.length(ce), cl.length(ce))
+        # lengths are memoised, also for equal expressions
+        cl.cache_clear()
+        self.assertEqual(9, cl.length(inter))
+        self.assertEqual(7, cl._lengths[OWLObjectUnionOf((male, female, some))])
+
 
 if __name__ == '__main__':
     unittest.main()
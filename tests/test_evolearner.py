@@ -1,11 +1,15 @@
 import json
 import random
 import unittest
+from unittest import mock
 from ontolearn.learning_problem import PosNegLPStandard
-from owlapy.model import OWLNamedIndividual, IRI
+from deap import creator
+from owlapy.model import OWLClassExpression, OWLNamedIndividual, IRI
 
 from ontolearn.knowledge_base import KnowledgeBase
 from ontolearn.concept_learner import EvoLearner
+from ontolearn.ea_algorithms import MultiPopulation
+from ontolearn.ea_utils import OperatorVocabulary, compile_tree
 from ontolearn.utils import setup_logging
 
 random.seed(1)
@@ -36,6 +40,137 @@ class TestEvoLearner(unittest.TestCase):
             self.assertGreaterEqual(hypotheses[0].quality, hypotheses[1].quality)
             self.assertGreaterEqual(hypotheses[1].quality, hypotheses[2].quality)
 
+    def test_parallel_fitness(self):
+        with open('examples/synthetic_problems.json') as json_file:
+            settings = json.load(json_file)
+        kb = KnowledgeBase(path=settings['data_path'][3:])
+        examples = settings['problems']['Uncle']
+        pos = set(map(OWLNamedIndividual, map(IRI.create, set(examples['positive_examples']))))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, set(examples['negative_examples']))))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        results = []
+        for n_jobs in (1, 2):
+            random.seed(1)
+            model = EvoLearner(knowledge_base=kb, max_runtime=1000, population_size=100, num_generations=5,
+                               n_jobs=n_jobs)
+            model.fit(learning_problem=lp)
+            population = [(str(ind), ind.quality.values, ind.fitness.values) for ind in model._result_population]
+            results.append((model.number_of_tested_concepts, population))
+        # the individuals get the same fitness as in a serial run
+        self.assertEqual(results[0], results[1])
+
+    def test_parallel_fitness_timeout(self):
+        with open('examples/synthetic_problems.json') as json_file:
+            settings = json.load(json_file)
+        kb = KnowledgeBase(path=settings['data_path'][3:])
+        examples = settings['problems']['Uncle']
+        pos = set(map(OWLNamedIndividual, map(IRI.create, set(examples['positive_examples']))))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, set(examples['negative_examples']))))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        fitness_batch = EvoLearner._fitness_batch
+
+        def timed_out_batch(learner, individuals):
+            # every batch exceeds max_runtime after its first chunk, the generations themselves are not timed out
+            start_time, learner.start_time = learner.start_time, 0
+            try:
+                fitness_batch(learner, individuals)
+            finally:
+                learner.start_time = start_time
+
+        random.seed(1)
+        with mock.patch.object(EvoLearner, '_FITNESS_CHUNK_SIZE', 4), \
+                mock.patch.object(EvoLearner, '_fitness_batch', autospec=True, side_effect=timed_out_batch):
+            model = EvoLearner(knowledge_base=kb, max_runtime=1000, population_size=100, num_generations=5,
+                               n_jobs=2)
+            model.fit(learning_problem=lp)
+        # the individuals left over by the workers get the worst quality, the generations keep their size
+        self.assertEqual(100, len(model._result_population))
+        self.assertTrue(all(ind.fitness.valid for ind in model._result_population))
+        self.assertTrue(any(ind.quality.values[0] == 0.0 for ind in model._result_population))
+        # only the concepts that were evaluated are cached
+        self.assertEqual(model.number_of_tested_concepts, model.fitness_cache_info().currsize)
+
+    def test_parallel_islands(self):
+        with open('examples/synthetic_problems.json') as json_file:
+            settings = json.load(json_file)
+        kb = KnowledgeBase(path=settings['data_path'][3:])
+        examples = settings['problems']['Uncle']
+        pos = set(map(OWLNamedIndividual, map(IRI.create, set(examples['positive_examples']))))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, set(examples['negative_examples']))))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        algorithm = MultiPopulation(num_populations=4, boost=0.1, parallel_islands=True)
+        model = EvoLearner(knowledge_base=kb, max_runtime=1000, population_size=200, num_generations=10,
+                           algorithm=algorithm)
+        # the islands must not silently fall back to the serial evolution
+        with mock.patch.object(MultiPopulation, '_evolve_islands', autospec=True,
+                               side_effect=MultiPopulation._evolve_islands) as evolve_islands:
+            model.fit(learning_problem=lp)
+        evolve_islands.assert_called_once()
+        self.assertEqual(200, len(model._result_population))
+        # the evaluations of the islands are merged back into the learner, they can evaluate the same concepts
+        self.assertGreaterEqual(model.number_of_tested_concepts, model.fitness_cache_info().currsize)
+        for ind in model._result_population:
+            self.assertEqual(model._cache[model._cache_key(ind)], ind.quality.values[0])
+
+    def test_fitness_cache(self):
+        with open('examples/synthetic_problems.json') as json_file:
+            settings = json.load(json_file)
+        kb = KnowledgeBase(path=settings['data_path'][3:])
+        examples = settings['problems']['Aunt']
+        pos = set(map(OWLNamedIndividual, map(IRI.create, set(examples['positive_examples']))))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, set(examples['negative_examples']))))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        model = EvoLearner(knowledge_base=kb, max_runtime=1000, population_size=50, num_generations=2,
+                           fitness_cache_size=100)
+        model.fit(learning_problem=lp)
+        info = model.fitness_cache_info()
+        self.assertEqual(model.number_of_tested_concepts, info.misses)
+        self.assertLessEqual(info.currsize, 100)
+        self.assertEqual(info.evictions, info.misses - info.currsize)
+
+        # a tree intersected with ⊤ and with commuted operands shares the entry of the tree
+        intersection = next(p for p in model.pset.primitives[OWLClassExpression]
+                            if p.name == OperatorVocabulary.INTERSECTION)
+        thing = next(t for t in model.pset.terminals[OWLClassExpression] if t.name == 'Thing')
+        ind = model._result_population[0]
+        tree = creator.Individual([intersection, thing] + list(ind))
+        tested = model.number_of_tested_concepts
+        model.toolbox.apply_fitness(tree)
+        self.assertEqual(tested, model.number_of_tested_concepts)
+        self.assertEqual(ind.quality.values, tree.quality.values)
+        # the fitness of the longer tree is penalised
+        self.assertLess(tree.fitness.values, ind.fitness.values)
+
+    def test_subtree_individuals(self):
+        with open('examples/synthetic_problems.json') as json_file:
+            settings = json.load(json_file)
+        kb = KnowledgeBase(path=settings['data_path'][3:])
+        examples = settings['problems']['Uncle']
+        pos = set(map(OWLNamedIndividual, map(IRI.create, set(examples['positive_examples']))))
+        neg = set(map(OWLNamedIndividual, map(IRI.create, set(examples['negative_examples']))))
+        lp = PosNegLPStandard(pos=pos, neg=neg)
+
+        model = EvoLearner(knowledge_base=kb, max_runtime=1000, population_size=50, num_generations=2)
+        model.fit(learning_problem=lp)
+        for ind in model._result_population:
+            exprs, children = model._normalised_subtrees(ind)
+            self.assertEqual(kb.individuals_set(compile_tree(ind, model.pset)),
+                             model._subtree_individuals(exprs, children, 0))
+
+        # only the new root of a tree from two evaluated subtrees is retrieved
+        union = next(p for p in model.pset.primitives[OWLClassExpression] if p.name == OperatorVocabulary.UNION)
+        first, second = model._result_population[:2]
+        tree = creator.Individual([union] + list(first) + list(second))
+        misses = model._subtree_cache.cache_info().misses
+        model.toolbox.apply_fitness(tree)
+        self.assertLessEqual(model._subtree_cache.cache_info().misses - misses, 1)
+        self.assertEqual(kb.evaluate_concept(compile_tree(tree, model.pset), model.quality_func,
+                                             model._learning_problem).q, tree.quality.values[0])
+
     def test_regression_mutagenesis(self):
         kb = KnowledgeBase(path='KGs/Mutagenesis/mutagenesis.owl')
 
@@ -1,8 +1,13 @@
+import pickle
 import unittest
 
 from owlapy import namespaces
 from owlapy.namespaces import Namespaces
-from owlapy.model import OWLClass, OWLObjectUnionOf, IRI
+from owlapy.model import OWLClass, OWLObjectUnionOf, IRI, OWLObjectProperty, OWLObjectAllValuesFrom, \
+    OWLObjectComplementOf, OWLNamedIndividual, OWLObjectHasValue, OWLDataProperty, OWLDataSomeValuesFrom, \
+    IntegerOWLDatatype, OWLObjectIntersectionOf, OWLObjectSomeValuesFrom, OWLObjectMinCardinality
+from owlapy.util import CostAwareCache, LRUCache, SignatureLRUCache, class_expression_signature, \
+    shared_subexpressions, hash_cons
 
 base = Namespaces("ex", "http://example.org/")
 
@@ -41,6 +46,105 @@ class Owlapy_Test(unittest.TestCase):
         self.assertEqual(set(), frozenset())
         self.assertSequenceEqual(list([IRI.create(base, "C1")]), [IRI.create(base, "C1")])
 
+    def test_cost_aware_cache(self):
+        cache = CostAwareCache(maxbytes=10, sizeof=len)
+        cache.put('cheap', 'aaaa', cost=1.0)
+        cache.put('expensive', 'bbbb', cost=100.0)
+        self.assertIn('cheap', cache)
+        self.assertEqual('bbbb', cache['expensive'])
+        cache.put('new', 'cccc', cost=10.0)
+        # the cheap entry is evicted first
+        self.assertNotIn('cheap', cache)
+        self.assertIn('expensive', cache)
+        self.assertIn('new', cache)
+        cache.put('too big', 'x' * 11)
+        self.assertNotIn('too big', cache)
+        info = cache.cache_info()
+        self.assertEqual((3, 2, 1, 8, 2), (info.hits, info.misses, info.evictions, info.currbytes, info.currsize))
+        self.assertEqual(1, cache.discard_if(lambda key: key.startswith('new')))
+        self.assertEqual(4, cache.cache_info().currbytes)
+        cache.cache_clear()
+        self.assertEqual(0, len(cache))
+
+    def test_lru_cache_discard(self):
+        cache = LRUCache(maxsize=2)
+        cache['a'] = 1
+        cache['b'] = 2
+        self.assertEqual(1, cache.discard_if(lambda key: key == 'a'))
+        cache['c'] = 3
+        self.assertIn('b', cache)
+        self.assertIn('c', cache)
+        cache['d'] = 4
+        self.assertNotIn('b', cache)
+        self.assertEqual(4, cache['d'])
+        self.assertEqual([('c', 3), ('d', 4)], cache.items())
+        # discarded entries are not counted as evictions
+        self.assertEqual(1, cache.cache_info().evictions)
+
+    def test_signature_lru_cache(self):
+        c1 = OWLClass(IRI(base, "C1"))
+        c2 = OWLClass(IRI(base, "C2"))
+        p = OWLObjectProperty(IRI(base, "p"))
+        ce = OWLObjectAllValuesFrom(p, c2)
+        cache = SignatureLRUCache(maxsize=2)
+        cache[c1] = 1
+        cache[ce] = 2
+        self.assertEqual({c1, c2, p}, set(cache.dependents))
+        self.assertEqual(1, cache.discard_dependents([c2]))
+        self.assertNotIn(ce, cache)
+        self.assertIn(c1, cache)
+        self.assertEqual({c1}, set(cache.dependents))
+        # evicted entries are removed from the index
+        cache[c2] = 3
+        cache[ce] = 4
+        self.assertNotIn(c1, cache)
+        self.assertEqual({c2, p}, set(cache.dependents))
+        self.assertEqual(2, cache.discard_dependents([c2, p]))
+        self.assertEqual({}, cache.dependents)
+
+    def test_class_expression_signature(self):
+        c1 = OWLClass(IRI(base, "C1"))
+        p = OWLObjectProperty(IRI(base, "p"))
+        d = OWLDataProperty(IRI(base, "d"))
+        i = OWLNamedIndividual(IRI(base, "i"))
+        ce = OWLObjectUnionOf((OWLObjectComplementOf(c1),
+                               OWLObjectAllValuesFrom(p.get_inverse_property(), OWLObjectHasValue(p, i)),
+                               OWLDataSomeValuesFrom(d, IntegerOWLDatatype)))
+        self.assertEqual(frozenset({c1, p, d, i, IntegerOWLDatatype}), class_expression_signature(ce))
+
+    def test_shared_subexpressions(self):
+        c1 = OWLClass(IRI(base, "C1"))
+        c2 = OWLClass(IRI(base, "C2"))
+        p = OWLObjectProperty(IRI(base, "p"))
+        some = OWLObjectSomeValuesFrom(p, OWLObjectComplementOf(c1))
+        inter = OWLObjectIntersectionOf((c2, some))
+        ces = [inter, OWLObjectUnionOf((c1, some)), OWLObjectAllValuesFrom(p, inter), some]
+        # named classes are not returned, and the operands of a shared expression are only counted once
+        self.assertEqual([some, inter], shared_subexpressions(ces))
+        self.assertEqual([], shared_subexpressions([OWLObjectUnionOf((c1, c2)), OWLObjectIntersectionOf((c1, c2))]))
+
+    def test_hash_cons(self):
+        c1 = OWLClass(IRI(base, "C1"))
+        c2 = OWLClass(IRI(base, "C2"))
+        p = OWLObjectProperty(IRI(base, "p"))
+
+        def make():
+            return OWLObjectIntersectionOf((c1, OWLObjectSomeValuesFrom(p, OWLObjectComplementOf(c2))))
+        ce = hash_cons(make())
+        self.assertIs(ce, hash_cons(make()))
+        self.assertIs(ce, hash_cons(ce))
+        self.assertIs(c1, hash_cons(c1))
+        # interned expressions are interchangeable with the plain ones
+        self.assertEqual(make(), ce)
+        self.assertEqual(ce, make())
+        self.assertEqual(hash(make()), hash(ce))
+        self.assertEqual(1, {make(): 1}[ce])
+        self.assertIsInstance(ce, OWLObjectIntersectionOf)
+        self.assertEqual(repr(make()), repr(ce))
+        self.assertNotEqual(ce, hash_cons(OWLObjectIntersectionOf((c1, OWLObjectSomeValuesFrom(p, c2)))))
+        self.assertEqual(OWLObjectMinCardinality(2, p, c1), hash_cons(OWLObjectMinCardinality(2, p, c1)))
+        self.assertIs(ce, pickle.loads(pickle.dumps(ce)))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -1,19 +1,26 @@
 from datetime import date, datetime
+import os
+import tempfile
 import unittest
 
 from owlready2.prop import DataProperty
+import numpy as np
 from pandas import Timedelta
 
+from owlapy.abox_index import CSRAdjacency, DataPropertyValueIndex, IndividualBitSet, IndividualIndex
 from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
 from owlapy.model import DurationOWLDatatype, OWLObjectOneOf, OWLObjectProperty, OWLNamedIndividual, \
     OWLObjectSomeValuesFrom, OWLThing, OWLObjectComplementOf, IRI, OWLObjectAllValuesFrom, OWLNothing, \
     OWLObjectHasValue, DoubleOWLDatatype, OWLClass, OWLDataAllValuesFrom, OWLDataComplementOf, \
     OWLDataHasValue, OWLDataIntersectionOf, OWLDataOneOf, OWLDataProperty, OWLDataSomeValuesFrom, \
     OWLDataUnionOf, OWLLiteral, OWLObjectExactCardinality, OWLObjectMaxCardinality, OWLObjectMinCardinality, \
-    OWLObjectIntersectionOf
+    OWLObjectIntersectionOf, OWLObjectUnionOf, IntegerOWLDatatype, OWLClassAssertionAxiom, \
+    OWLObjectPropertyAssertionAxiom, OWLDataPropertyAssertionAxiom
 from owlapy.model.providers import OWLDatatypeMinExclusiveRestriction, OWLDatatypeMinMaxInclusiveRestriction, \
-    OWLDatatypeMinMaxExclusiveRestriction, OWLDatatypeMaxExclusiveRestriction, OWLDatatypeMaxInclusiveRestriction
+    OWLDatatypeMinMaxExclusiveRestriction, OWLDatatypeMaxExclusiveRestriction, OWLDatatypeMaxInclusiveRestriction, \
+    OWLDatatypeMinInclusiveRestriction
 from owlapy.owlready2 import OWLOntologyManager_Owlready2, OWLReasoner_Owlready2
+from owlapy.vocab import OWLFacet
 from pytest import mark
 
 # @TODO:CD: Why does test_complement2 fails ?
@@ -120,6 +127,250 @@ class Owlapy_FastInstanceChecker_Test(unittest.TestCase):
         self.assertEqual(no_child, target_inst)
         print(no_child)
 
+        # the dedicated evaluation agrees with the rewriting to a complement
+        reasoner_rewrite = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True,
+                                                           property_cache=False)
+        reasoner_bits = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True,
+                                                        bitsets=True)
+        for filler, inst in ((male, only_male_child), (female, only_female_child), (OWLNothing, no_child)):
+            for ce in (OWLObjectAllValuesFrom(property=has_child, filler=filler),
+                       OWLObjectAllValuesFrom(property=has_child.get_inverse_property(), filler=filler)):
+                target = frozenset(reasoner_rewrite.instances(ce))
+                self.assertEqual(target, frozenset(reasoner_nd.instances(ce)))
+                self.assertEqual(target, reasoner_bits._find_instances(ce))
+            self.assertEqual(inst, target_inst | frozenset(reasoner_nd.instances(
+                OWLObjectAllValuesFrom(property=has_child, filler=filler))))
+
+    def test_bitsets(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+
+        male = OWLClass(IRI.create(NS, 'male'))
+        female = OWLClass(IRI.create(NS, 'female'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+        anna = OWLNamedIndividual(IRI(NS, 'anna'))
+        heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+
+        base_reasoner = OWLReasoner_Owlready2(onto)
+        reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True)
+        reasoner_bits = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True,
+                                                        bitsets=True)
+
+        expressions = (male,
+                       OWLObjectUnionOf((female, OWLObjectSomeValuesFrom(property=has_child, filler=male))),
+                       OWLObjectIntersectionOf((male, OWLObjectSomeValuesFrom(property=has_child, filler=female))),
+                       OWLObjectComplementOf(female),
+                       OWLObjectAllValuesFrom(property=has_child, filler=male),
+                       OWLObjectMinCardinality(cardinality=2, property=has_child, filler=OWLThing),
+                       OWLObjectMaxCardinality(cardinality=1, property=has_child, filler=OWLThing),
+                       OWLObjectHasValue(property=has_child, individual=heinz),
+                       OWLObjectExactCardinality(cardinality=1, property=has_child, filler=female),
+                       OWLObjectSomeValuesFrom(property=has_child.get_inverse_property(), filler=female),
+                       OWLObjectOneOf((anna, heinz)))
+        for ce in expressions:
+            inst = reasoner_bits._find_instances(ce)
+            self.assertIsInstance(inst, IndividualBitSet)
+            self.assertEqual(frozenset(reasoner.instances(ce)), inst)
+            self.assertEqual(frozenset(reasoner.instances(ce)), frozenset(reasoner_bits.instances(ce)))
+
+        males = reasoner_bits._find_instances(male)
+        females = reasoner_bits._find_instances(female)
+        self.assertEqual(len(males) + len(females), len(males | females))
+        self.assertEqual(frozenset(), males & females)
+        self.assertTrue(males.isdisjoint(females))
+        self.assertEqual(males, reasoner_bits._find_instances(OWLThing).difference(females))
+        self.assertEqual(males, females.complement())
+        self.assertIn(heinz, males)
+        self.assertNotIn(anna, males)
+        self.assertEqual(frozenset({anna}), females & {anna, heinz})
+        self.assertEqual(hash(frozenset(males)), hash(males))
+
+        # set algebra with individuals that are not in the index does not intern them
+        tom = OWLNamedIndividual(IRI(NS, 'tom'))
+        num_individuals = len(males.index)
+        self.assertEqual(frozenset({anna}), females & {anna, tom})
+        self.assertEqual(frozenset(females) | {tom}, females | {tom})
+        self.assertEqual(frozenset(females) ^ {anna, tom}, females ^ {anna, tom})
+        self.assertEqual(frozenset({tom}), {anna, tom} - females)
+        self.assertEqual(females, females - {tom})
+        self.assertNotEqual(females, frozenset(females) | {tom})
+        self.assertFalse(females >= {anna, tom})
+        self.assertFalse(frozenset({anna, tom}) <= females)
+        self.assertEqual(num_individuals, len(males.index))
+        self.assertEqual(males, females.complement())
+        self.assertEqual(frozenset({heinz}), frozenset(reasoner_bits.object_property_values(anna, has_child)))
+
+    def test_retrieval_cache(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+
+        male = OWLClass(IRI.create(NS, 'male'))
+        female = OWLClass(IRI.create(NS, 'female'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+
+        base_reasoner = OWLReasoner_Owlready2(onto)
+        reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True)
+        ce = OWLObjectUnionOf((female, OWLObjectSomeValuesFrom(property=has_child, filler=male)))
+        inst = frozenset(reasoner.instances(ce))
+        self.assertEqual(inst, frozenset(reasoner.instances(ce)))
+        info = reasoner.retrieval_cache_info()
+        self.assertEqual(1, info.hits)
+        self.assertEqual(2, info.misses)
+        self.assertEqual(2, info.currsize)
+
+        reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True,
+                                                   retrieval_cache_bytes=0)
+        self.assertEqual(inst, frozenset(reasoner.instances(ce)))
+        self.assertEqual(0, reasoner.retrieval_cache_info().currsize)
+
+    def test_update_assertions(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+        with onto._onto:
+            class weight(DataProperty):
+                range = [float]
+        onto._onto.anna.weight = [60.5]
+
+        male = OWLClass(IRI.create(NS, 'male'))
+        female = OWLClass(IRI.create(NS, 'female'))
+        person = OWLClass(IRI.create(NS, 'person'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+        weight_ = OWLDataProperty(IRI(NS, 'weight'))
+        anna = OWLNamedIndividual(IRI(NS, 'anna'))
+        heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+        michelle = OWLNamedIndividual(IRI(NS, 'michelle'))
+        stefan = OWLNamedIndividual(IRI(NS, 'stefan'))
+        expressions = (male, person,
+                       OWLObjectSomeValuesFrom(property=has_child, filler=male),
+                       OWLObjectSomeValuesFrom(property=has_child.get_inverse_property(), filler=female),
+                       OWLObjectAllValuesFrom(property=has_child, filler=female),
+                       OWLObjectComplementOf(female),
+                       OWLDataSomeValuesFrom(property=weight_, filler=OWLDatatypeMinInclusiveRestriction(70.0)))
+
+        base_reasoner = OWLReasoner_Owlready2(onto)
+        reasoners = [OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True,
+                                                     bitsets=bitsets, property_cache=property_cache)
+                     for bitsets, property_cache in ((False, True), (True, True), (False, False))]
+        for reasoner in reasoners:
+            for ce in expressions:
+                reasoner.instances(ce)
+
+        changes = (([OWLClassAssertionAxiom(heinz, female)], []),
+                   ([OWLObjectPropertyAssertionAxiom(michelle, has_child, heinz),
+                     OWLDataPropertyAssertionAxiom(stefan, weight_, OWLLiteral(80.0))],
+                    [OWLObjectPropertyAssertionAxiom(heinz, has_child.get_inverse_property(), stefan)]),
+                   ([], [OWLClassAssertionAxiom(heinz, female),
+                         OWLDataPropertyAssertionAxiom(anna, weight_, OWLLiteral(60.5))]))
+        for added, removed in changes:
+            for axiom in added:
+                mgr.add_axiom(onto, axiom)
+            for axiom in removed:
+                mgr.remove_axiom(onto, axiom)
+            for reasoner in reasoners:
+                changed = reasoner.update_assertions(added=added, removed=removed)
+                fresh = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, negation_default=True)
+                for ce in expressions:
+                    self.assertEqual(frozenset(fresh.instances(ce)), frozenset(reasoner.instances(ce)))
+        self.assertEqual(frozenset({female, person, OWLThing}), changed - {weight_})
+
+        # the instances of expressions that do not use a changed entity stay memoised
+        reasoner = reasoners[1]
+        axiom = OWLObjectPropertyAssertionAxiom(heinz, has_child, anna)
+        mgr.add_axiom(onto, axiom)
+        self.assertEqual(frozenset({has_child}), reasoner.update_assertions(added=[axiom]))
+        # the complement of female and the restriction on weight
+        self.assertEqual(2, reasoner.retrieval_cache_info().currsize)
+
+        # new individuals invalidate all memoised instances
+        tom = OWLNamedIndividual(IRI(NS, 'tom'))
+        axiom = OWLClassAssertionAxiom(tom, male)
+        mgr.add_axiom(onto, axiom)
+        self.assertIsNone(reasoner.update_assertions(added=[axiom]))
+        self.assertIn(tom, frozenset(reasoner.instances(OWLObjectComplementOf(female))))
+        self.assertIn(tom, frozenset(reasoner.instances(male)))
+
+        # removed assertions about unknown individuals do not intern them
+        ghost = OWLNamedIndividual(IRI(NS, 'ghost'))
+        size = len(reasoner._ind_index)
+        changed = reasoner.update_assertions(removed=[OWLClassAssertionAxiom(ghost, male),
+                                                      OWLObjectPropertyAssertionAxiom(ghost, has_child, tom)])
+        self.assertEqual(frozenset({male, person, OWLThing, has_child}), changed)
+        self.assertEqual(size, len(reasoner._ind_index))
+        self.assertNotIn(ghost, frozenset(reasoner.instances(OWLObjectComplementOf(female))))
+
+    def test_csr_adjacency(self):
+        adj = CSRAdjacency.from_edges(5, [0, 0, 2, 0, 3], [1, 2, 4, 1, 1])
+        self.assertEqual(4, len(adj))
+        self.assertEqual([1, 2], adj.successors(0).tolist())
+        self.assertEqual([], adj.successors(1).tolist())
+        self.assertEqual([2, 0, 1, 1, 0], adj.degrees().tolist())
+        self.assertEqual([1, 2, 4], adj.successors_of_all(np.array([0, 1, 2])).tolist())
+
+        mask = np.array([False, True, True, False, False])
+        self.assertEqual([2, 0, 0, 1, 0], adj.count_in(mask).tolist())
+
+        inv = adj.transpose()
+        self.assertEqual([0, 3], inv.successors(1).tolist())
+        self.assertEqual([0, 2, 3], inv.successors_of_all(np.array([1, 2, 4])).tolist())
+
+    def test_save_load_index(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+        with onto._onto:
+            class weight(DataProperty):
+                range = [float]
+        onto._onto.anna.weight = [60.5]
+        onto._onto.markus.weight = [80.0, 81.5]
+
+        male = OWLClass(IRI.create(NS, 'male'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+        weight_ = OWLDataProperty(IRI(NS, 'weight'))
+        heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+        expressions = (male,
+                       OWLObjectSomeValuesFrom(property=has_child, filler=male),
+                       OWLObjectSomeValuesFrom(property=has_child.get_inverse_property(), filler=OWLThing),
+                       OWLObjectHasValue(property=has_child, individual=heinz),
+                       OWLDataSomeValuesFrom(property=weight_, filler=OWLDatatypeMinInclusiveRestriction(70.0)),
+                       OWLDataHasValue(property=weight_, value=OWLLiteral(60.5)))
+
+        base_reasoner = OWLReasoner_Owlready2(onto)
+        with tempfile.TemporaryDirectory() as tmp:
+            for bitsets in (False, True):
+                path = os.path.join(tmp, f'index{bitsets}')
+                reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, bitsets=bitsets)
+                target = [frozenset(reasoner.instances(ce)) for ce in expressions]
+                reasoner.save_index(path)
+
+                for bitsets_load in (False, True):
+                    loaded = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, bitsets=bitsets_load)
+                    self.assertTrue(loaded.load_index(path))
+                    self.assertIn(male, loaded._cls_to_ind)
+                    self.assertIn(weight_, loaded._data_prop)
+                    self.assertEqual(reasoner._ind_set, loaded._ind_set)
+                    self.assertEqual(target, [frozenset(loaded.instances(ce)) for ce in expressions])
+
+            # changing the ontology invalidates the index
+            onto._onto.heinz.weight = [70.0]
+            reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner)
+            self.assertFalse(reasoner.load_index(path))
+
+            reasoner.materialise()
+            self.assertEqual(set(onto.classes_in_signature()), set(reasoner._cls_to_ind))
+            reasoner.save_index(path)
+            # other ontologies in the same world do not, but adding or removing an assertion does
+            mgr.load_ontology(IRI.create("file://KGs/Family/family-benchmark_rich_background.owl"))
+            reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner)
+            self.assertTrue(reasoner.load_index(path))
+            axiom = OWLClassAssertionAxiom(heinz, OWLClass(IRI.create(NS, 'female')))
+            mgr.add_axiom(onto, axiom)
+            self.assertFalse(reasoner.load_index(path))
+            mgr.remove_axiom(onto, axiom)
+            self.assertTrue(reasoner.load_index(path))
+
     @mark.xfail
     def test_complement2(self):
         NS = "http://example.com/father#"
@@ -318,6 +569,39 @@ class Owlapy_FastInstanceChecker_Test(unittest.TestCase):
         target_inst = frozenset({anna, martin})
         self.assertEqual(inst, target_inst)
 
+        reasoner_bits = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner, bitsets=True)
+        inst = reasoner_bits._find_instances(OWLDataSomeValuesFrom(property=age_, filler=filler))
+        self.assertIsInstance(inst, IndividualBitSet)
+        self.assertEqual(inst, target_inst)
+        inst = reasoner_bits._find_instances(OWLDataHasValue(property=birth_date,
+                                                             value=OWLLiteral(date(year=1999, month=3, day=1))))
+        self.assertEqual(frozenset({martin}), inst)
+
+    def test_data_property_value_index(self):
+        NS = "http://example.com/father#"
+        a, b, c = (OWLNamedIndividual(IRI(NS, n)) for n in ('a', 'b', 'c'))
+        values = DataPropertyValueIndex(IndividualIndex(), [(a, OWLLiteral(1.5)), (b, OWLLiteral(2.0)),
+                                                            (c, OWLLiteral(2.0)), (c, OWLLiteral(3)),
+                                                            (a, OWLLiteral('x'))])
+        index = values.index
+
+        def individuals(ids):
+            return {index.individual(i) for i in ids}
+
+        self.assertEqual({a, b, c}, individuals(values.subjects()))
+        self.assertEqual({b, c}, individuals(values.subjects_with_value(OWLLiteral(2.0))))
+        self.assertEqual(set(), individuals(values.subjects_with_value(OWLLiteral(2))))
+        self.assertEqual({a, c}, individuals(values.subjects_with_values([OWLLiteral(3), OWLLiteral('x')])))
+        self.assertEqual({b, c}, individuals(values.subjects_in_range(DoubleOWLDatatype,
+                                                                      [(OWLFacet.MIN_EXCLUSIVE, 1.5),
+                                                                       (OWLFacet.MAX_INCLUSIVE, 2.0)])))
+        self.assertEqual({a}, individuals(values.subjects_in_range(DoubleOWLDatatype,
+                                                                   [(OWLFacet.MAX_EXCLUSIVE, 2.0)])))
+        self.assertEqual(set(), individuals(values.subjects_in_range(DoubleOWLDatatype,
+                                                                     [(OWLFacet.MIN_INCLUSIVE, 2.5)])))
+        self.assertEqual({c}, individuals(values.subjects_in_range(IntegerOWLDatatype,
+                                                                   [(OWLFacet.MIN_INCLUSIVE, 3)])))
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -13,9 +13,12 @@ from owlapy.model import OWLObjectProperty, OWLNamedIndividual, OWLThing, OWLCla
     OWLDataUnionOf, OWLLiteral, BooleanOWLDatatype, DoubleOWLDatatype, IntegerOWLDatatype, OWLDataOneOf, \
     OWLDataExactCardinality, OWLDataMaxCardinality, OWLDataMinCardinality, OWLObjectExactCardinality, \
     OWLObjectMaxCardinality, OWLObjectMinCardinality, OWLObjectHasValue, OWLObjectAllValuesFrom, \
-    OWLObjectOneOf, DateOWLDatatype, DateTimeOWLDatatype, DurationOWLDatatype
+    OWLObjectOneOf, DateOWLDatatype, DateTimeOWLDatatype, DurationOWLDatatype, OWLClassAssertionAxiom, \
+    OWLObjectPropertyAssertionAxiom, OWLDataPropertyAssertionAxiom, OWLSubClassOfAxiom
 
+from owlapy.abox_index import IndividualIndex
 from owlapy.owlready2 import OWLOntologyManager_Owlready2, OWLReasoner_Owlready2
+from owlapy.owlready2.bulk import BulkLoader_Owlready2
 from owlapy.owlready2.temp_classes import OWLReasoner_Owlready2_TempClasses
 
 
@@ -92,6 +95,78 @@ class Owlapy_Owlready2_Test(unittest.TestCase):
         no_kids = frozenset(reasoner.object_property_values(heinz, has_child))
         self.assertEqual(frozenset(), no_kids)
 
+    def test_add_remove_assertions(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+        with onto._onto:
+            class age(owlready2.DataProperty):
+                range = [int]
+                functional = True
+        reasoner = OWLReasoner_Owlready2(onto)
+
+        male = OWLClass(IRI(NS, 'male'))
+        has_child = OWLObjectProperty(IRI(NS, 'hasChild'))
+        age_ = OWLDataProperty(IRI(NS, 'age'))
+        heinz = OWLNamedIndividual(IRI(NS, 'heinz'))
+        tom = OWLNamedIndividual(IRI(NS, 'tom'))
+        axioms = (OWLClassAssertionAxiom(tom, male),
+                  OWLObjectPropertyAssertionAxiom(heinz, has_child.get_inverse_property(), tom),
+                  OWLDataPropertyAssertionAxiom(tom, age_, OWLLiteral(30)))
+        for axiom in axioms:
+            mgr.add_axiom(onto, axiom)
+        self.assertIn(tom, frozenset(onto.individuals_in_signature()))
+        self.assertIn(tom, frozenset(reasoner.instances(male)))
+        self.assertEqual({heinz}, set(reasoner.object_property_values(tom, has_child)))
+        self.assertEqual({OWLLiteral(30)}, set(reasoner.data_property_values(tom, age_)))
+
+        for axiom in axioms:
+            mgr.remove_axiom(onto, axiom)
+        self.assertNotIn(tom, frozenset(reasoner.instances(male)))
+        self.assertEqual(set(), set(reasoner.object_property_values(tom, has_child)))
+        self.assertEqual(set(), set(reasoner.data_property_values(tom, age_)))
+
+        # removing assertions about unknown individuals does not create them
+        jerry = OWLNamedIndividual(IRI(NS, 'jerry'))
+        for axiom in (OWLClassAssertionAxiom(jerry, male),
+                      OWLObjectPropertyAssertionAxiom(heinz, has_child, jerry),
+                      OWLObjectPropertyAssertionAxiom(jerry, has_child.get_inverse_property(), heinz),
+                      OWLDataPropertyAssertionAxiom(jerry, age_, OWLLiteral(30))):
+            mgr.remove_axiom(onto, axiom)
+        self.assertNotIn(jerry, frozenset(onto.individuals_in_signature()))
+        self.assertEqual(set(), set(reasoner.object_property_values(heinz, has_child)))
+        with self.assertRaisesRegex(NotImplementedError, 'OWLSubClassOfAxiom'):
+            mgr.remove_axiom(onto, OWLSubClassOfAxiom(male, OWLClass(IRI(NS, 'person'))))
+
+    def test_bulk_loader(self):
+        NS = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+        with onto._onto:
+            class age(owlready2.DataProperty):
+                range = [int]
+        onto._onto.anna.age = [30]
+        onto._onto.markus.age = [30, 31]
+
+        stefan = OWLNamedIndividual(IRI.create(NS, 'stefan'))
+        markus = OWLNamedIndividual(IRI.create(NS, 'markus'))
+        anna = OWLNamedIndividual(IRI.create(NS, 'anna'))
+        has_child = OWLObjectProperty(IRI.create(NS, 'hasChild'))
+
+        index = IndividualIndex([stefan])
+        loader = BulkLoader_Owlready2(onto, index)
+        subjects, objects = loader.object_property_edges(has_child)
+        edges = {(index.individual(s), index.individual(o)) for s, o in zip(subjects.tolist(), objects.tolist())}
+        self.assertEqual(4, len(edges))
+        self.assertIn((stefan, markus), edges)
+        self.assertEqual(0, index.id_of(stefan))
+        self.assertEqual(5, len(index))
+
+        literals, literal_ids, subject_ids = loader.data_property_assertions(OWLDataProperty(IRI(NS, 'age')))
+        assertions = {(index.individual(s), literals[i]) for s, i in zip(subject_ids.tolist(), literal_ids.tolist())}
+        self.assertEqual({(anna, OWLLiteral(30)), (markus, OWLLiteral(30)), (markus, OWLLiteral(31))}, assertions)
+        self.assertEqual(2, len(literals))
+
     def test_mapping(self):
         NS = "http://example.com/father#"
         mgr = OWLOntologyManager_Owlready2()
@@ -122,6 +122,29 @@ class ModifiedCELOERefinementTest(unittest.TestCase):
             self.assertFalse(isinstance(i, OWLObjectIntersectionOf))
             self.assertFalse(isinstance(i, OWLObjectUnionOf))
 
+    def test_atomic_refinements_memo(self):
+        rho = ModifiedCELOERefinement(self.kb)
+        fresh = ModifiedCELOERefinement(self.kb)
+        for max_length in range(1, 7):
+            # the refinements of larger max_length are computed from those of the previous length
+            refs = list(rho.refine(self.kb.thing, max_length=max_length, current_domain=self.kb.thing))
+            fresh._refinement_cache.cache_clear()
+            self.assertCountEqual(fresh.refine(self.kb.thing, max_length=max_length, current_domain=self.kb.thing),
+                                  refs)
+            self.assertEqual(refs, list(rho.refine(self.kb.thing, max_length=max_length,
+                                                   current_domain=self.kb.thing)))
+
+    def test_atomic_refinements_pruned(self):
+        rho = ModifiedCELOERefinement(self.kb)
+        for i in rho.refine(self.kb.thing, max_length=4, current_domain=self.kb.thing):
+            if isinstance(i, OWLObjectUnionOf):
+                # a union is not generated if the extension of an operand contains the other, at least if they
+                # are equal
+                first, second = map(self.kb.individuals_set, i.operands())
+                self.assertNotEqual(first, second)
+            elif isinstance(i, OWLObjectIntersectionOf):
+                self.assertTrue(self.kb.individuals_count(i))
+
     def test_atomic_refinements_data_properties(self):
         rho = ModifiedCELOERefinement(self.kb, use_numeric_datatypes=True, use_boolean_datatype=True)
         # Just set some static splits
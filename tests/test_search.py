@@ -0,0 +1,43 @@
+import random
+import unittest
+
+from ontolearn.search import IndexedHeap
+
+
+class IndexedHeap_Test(unittest.TestCase):
+    def test_indexed_heap(self):
+        priority = {c: random.random() for c in 'abcdefghijklmnopqrstuvwxyz'}
+        heap = IndexedHeap(key=priority.__getitem__)
+        for c in priority:
+            heap.add(c)
+        self.assertEqual(sorted(priority, key=priority.__getitem__), list(heap))
+
+        # update in place, the heap does not grow
+        priority['z'] = -1.0
+        heap.update('z')
+        priority['a'] = 2.0
+        heap.add('a')
+        self.assertEqual(26, len(heap))
+        self.assertEqual('z', heap.peek())
+
+        heap.discard('m')
+        heap.discard('m')
+        self.assertNotIn('m', heap)
+        del priority['m']
+        popped = [heap.pop() for _ in range(len(heap))]
+        self.assertEqual(sorted(priority, key=priority.__getitem__), popped)
+        self.assertEqual('a', popped[-1])
+        self.assertEqual(0, len(heap))
+
+    def test_indexed_heap_reverse(self):
+        heap = IndexedHeap(key=len, reverse=True)
+        for s in ('aa', 'a', 'aaaa', 'aaa'):
+            heap.add(s)
+        self.assertEqual(['aaaa', 'aaa', 'aa', 'a'], list(heap))
+        self.assertEqual('aaaa', heap.pop())
+        heap.clear()
+        self.assertEqual([], list(heap))
+
+
+if __name__ == '__main__':
+    unittest.main()
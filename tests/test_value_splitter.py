@@ -2,9 +2,9 @@ from datetime import date
 import unittest
 
 from owlready2.prop import DataProperty
-from ontolearn.value_splitter import BinningValueSplitter
+from ontolearn.value_splitter import BinningValueSplitter, EntropyValueSplitter
 from owlapy.fast_instance_checker import OWLReasoner_FastInstanceChecker
-from owlapy.model import OWLDataProperty, OWLLiteral, IRI
+from owlapy.model import OWLDataProperty, OWLLiteral, OWLNamedIndividual, IRI
 from owlapy.owlready2 import OWLOntologyManager_Owlready2, OWLReasoner_Owlready2
 
 
@@ -68,5 +68,42 @@ class BinningValueSplitter_Test(unittest.TestCase):
         self.assertEqual(splits, results)
 
 
+
+class EntropyValueSplitter_Test(unittest.TestCase):
+
+    def test_entropy_splitter_numeric(self):
+        namespace_ = "http://example.com/father#"
+        mgr = OWLOntologyManager_Owlready2()
+        onto = mgr.load_ontology(IRI.create("file://KGs/father.owl"))
+
+        with onto._onto:
+            class test_int(DataProperty):
+                range = [int]
+
+            class test_float(DataProperty):
+                range = [float]
+
+        values = {'markus': (50, 1.5), 'martin': (20, 0.5), 'stefan': (45, 2.25), 'heinz': (80, 0.75),
+                  'anna': (48, 1.5), 'michelle': (15, 3.0)}
+        for name, (value_int, value_float) in values.items():
+            ind = getattr(onto._onto, name)
+            ind.test_int = [value_int]
+            ind.test_float = [value_float]
+
+        base_reasoner = OWLReasoner_Owlready2(onto)
+        reasoner = OWLReasoner_FastInstanceChecker(onto, base_reasoner=base_reasoner)
+
+        test_int_dp = OWLDataProperty(IRI(namespace_, 'test_int'))
+        test_float_dp = OWLDataProperty(IRI(namespace_, 'test_float'))
+        pos = {OWLNamedIndividual(IRI.create(namespace_, name)) for name in ('markus', 'stefan', 'heinz')}
+        neg = {OWLNamedIndividual(IRI.create(namespace_, name)) for name in ('anna', 'michelle', 'martin')}
+
+        splitter = EntropyValueSplitter(max_nr_splits=3)
+        splits = splitter.compute_splits_properties(reasoner, [test_int_dp, test_float_dp], pos, neg)
+        results = {test_int_dp: [OWLLiteral(49)],
+                   test_float_dp: [OWLLiteral(2.625), OWLLiteral(1.875)]}
+        self.assertEqual(splits, results)
+
+
 if __name__ == '__main__':
     unittest.main()